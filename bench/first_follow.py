@@ -0,0 +1,46 @@
+import argparse
+import time
+
+from bin.first_follow import compute_first_follow
+from bin.table import build_ll1_table
+from .grammars import synthetic_grammar
+
+# Mede FIRST/FOLLOW + tabela LL(1) em gramáticas sintéticas de tamanho crescente.
+#   python -m bench.first_follow --sizes 50 100 200 400 800
+
+def measure(levels: int, stmts: int, repeat: int):
+    G, NONTERMS, TERMS, start = synthetic_grammar(levels, stmts)
+    terms = [t for t in TERMS if t != 'EOF']
+    best_ff = best_tab = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        FIRST, FOLLOW, fos = compute_first_follow(G, NONTERMS, terms, start)
+        t1 = time.perf_counter()
+        TABLE, conflicts = build_ll1_table(G, NONTERMS, terms, FIRST, FOLLOW, fos)
+        t2 = time.perf_counter()
+        best_ff = min(best_ff, t1 - t0)
+        best_tab = min(best_tab, t2 - t1)
+    assert not conflicts, conflicts[:3]
+    nprods = sum(len(G[A]) for A in NONTERMS)
+    # tamanho da saída: FOLLOW cresce ~quadrático nesta família de gramáticas
+    nsets = sum(len(FIRST[A]) + len(FOLLOW[A]) for A in NONTERMS)
+    return len(NONTERMS), len(TERMS), nprods, nsets, best_ff, best_tab
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 200, 400],
+                    help="níveis de precedência (a lista de comandos usa o mesmo número)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'não-term.':>10} {'terminais':>10} {'produções':>10} {'|FIRST|+|FOLLOW|':>17}"
+          f" {'FIRST/FOLLOW':>14} {'tabela':>10} {'ns/elemento':>12}")
+    for n in args.sizes:
+        nts, ts, nprods, nsets, ff, tab = measure(n, n, args.repeat)
+        print(f"{nts:>10} {ts:>10} {nprods:>10} {nsets:>17} {ff * 1e3:>12.2f}ms {tab * 1e3:>8.2f}ms"
+              f" {ff / nsets * 1e9:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from collections import defaultdict
+from bin.grammar import EPS
+
+# Gramáticas sintéticas no mesmo formato de bin/grammar.py (G, NONTERMS, TERMS),
+# com o mesmo estilo da gramática real: cadeia de precedência com *Tail anuláveis
+# e uma lista de comandos, cada um com sua palavra-chave. São LL(1) por construção.
+
+def synthetic_grammar(levels: int, stmts: int):
+    G = defaultdict(list)
+    NONTERMS = ['Program', 'StmtList', 'Statement']
+    TERMS = ['ID', 'NUM', 'ABRE', 'FECHA', 'PONTOVIR', 'ATRIB']
+
+    G['Program'].append(['StmtList', 'EOF'])
+    G['StmtList'].append(['Statement', 'StmtList'])
+    G['StmtList'].append([EPS])
+
+    for s in range(stmts):
+        kw, A, tail = f'KW{s}', f'Stmt{s}', f'Stmt{s}Tail'
+        TERMS.append(kw)
+        NONTERMS += [A, tail]
+        G['Statement'].append([A])
+        G[A].append([kw, 'ID', tail, 'PONTOVIR'])
+        G[tail].append(['ATRIB', 'E0'])
+        G[tail].append([EPS])
+
+    for i in range(levels):
+        E, nxt, tail, op = f'E{i}', f'E{i + 1}', f'T{i}', f'OP{i}'
+        TERMS.append(op)
+        NONTERMS += [E, tail]
+        G[E].append([nxt, tail])
+        G[tail].append([op, nxt, tail])
+        G[tail].append([EPS])
+
+    last = f'E{levels}'
+    NONTERMS.append(last)
+    G[last].append(['ABRE', 'E0', 'FECHA'])
+    G[last].append(['ID'])
+    G[last].append(['NUM'])
+
+    TERMS.append('EOF')
+    return G, NONTERMS, TERMS, 'Program'
@@ -0,0 +1,267 @@
+import argparse
+import compileall
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from bin.artifact import build_artifact, grammar_fingerprint
+from bin.bytes_lexer import BytesLexer, SourceBuffer
+from bin.generator import parse_size
+from bin.lexer import Lexer
+from bin.parser import LL1Parser
+from bin.tree import ParseTree
+
+# Benchmark por fase (léxico, tabela, parser, memória) com entradas de KB a
+# centenas de MB, salvo em JSON e comparado com um baseline:
+#
+#   python -m bench.run --sizes 64K 1M 256M -o bench/atual.json
+#   python -m bench.run --baseline bench/baseline.json --threshold 0.10
+#
+# A entrada é exemplos/04_mistura.lbx repetido até o tamanho pedido (repetir um
+# programa válido continua válido). O parser é medido sobre os tokens de uma
+# repetição reaproveitados N vezes, então não precisa guardar milhões de tokens.
+# Memória (tracemalloc, lexer + parser em streaming como no main) só é medida
+# até --mem-max, porque o tracemalloc deixa tudo várias vezes mais lento.
+# A partida do CLI (processo novo num arquivo trivial, e a soma do
+# `python -X importtime`) também entra na comparação; `--sizes` sem tamanhos
+# mede só ela e a tabela.
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+UNIT_FILE = os.path.join(ROOT, "exemplos", "04_mistura.lbx")
+# arquivo trivial para medir a partida do CLI (o script chama o CLI milhares de vezes)
+STARTUP_FILE = os.path.join(ROOT, "exemplos", "01_data_type.lbx")
+
+# métricas em que maior é melhor; as demais (tempos, memória) são o contrário
+HIGHER_IS_BETTER = {"lex_tok_s", "lex_mmap_tok_s", "parse_steps_s"}
+
+# o pico do tracemalloc inclui tuplas paradas nas free lists do CPython e varia
+# bastante entre execuções, por isso a memória tem um limite próprio, mais folgado
+MEMORY = {"peak_kb"}
+
+
+def fmt_size(n: int) -> str:
+    for unit, m in (("G", 1 << 30), ("M", 1 << 20), ("K", 1 << 10)):
+        if n >= m and n % m == 0:
+            return f"{n // m}{unit}"
+    return str(n)
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def count_steps(grammar, tokens) -> int:
+    # cada nó da árvore completa é um símbolo empilhado e desempilhado uma vez
+    tree = ParseTree(grammar)
+    LL1Parser(grammar).parse(tokens, tree=tree)
+    return len(tree)
+
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Partida do CLI num processo novo: tempo total (melhor de N) e a soma dos
+# tempos de import do `python -X importtime`, em ms.
+def bench_startup(repeat: int) -> Dict[str, float]:
+    cmd = [sys.executable, "-m", "bin.main", STARTUP_FILE]
+    run_cli = lambda *flags: subprocess.run(cmd[:1] + list(flags) + cmd[1:], cwd=ROOT, check=True,
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    # .pyc em dia (com PYTHONDONTWRITEBYTECODE a medida incluiria a compilação)
+    # e a primeira execução pode ter que gerar o artefato da tabela
+    compileall.compile_dir(os.path.join(ROOT, "bin"), quiet=1)
+    run_cli()
+    wall = best_of(max(repeat, 5), run_cli)
+
+    imports = float("inf")
+    for _ in range(max(repeat, 5)):
+        total = 0
+        for line in run_cli("-X", "importtime").stderr.splitlines():
+            # "import time:  self [us] | cumulative | nome"
+            if line.startswith("import time:") and "|" in line:
+                self_us = line.split(":", 1)[1].split("|")[0].strip()
+                if self_us.isdigit():
+                    total += int(self_us)
+        imports = min(imports, total / 1e3)
+    return {"startup_ms": wall * 1e3, "import_ms": imports}
+
+
+def bench_size(grammar, unit: str, size: int, repeat: int, mem_max: int) -> Dict[str, Any]:
+    reps = max(1, size // len(unit.encode("utf-8")))
+    text = unit * reps
+    res: Dict[str, Any] = {"bytes": len(text.encode("utf-8")), "reps": reps}
+
+    # léxico (str)
+    ntok = 0
+
+    def lex():
+        nonlocal ntok
+        ntok = 0
+        for _ in Lexer(text).tokens():
+            ntok += 1
+
+    t = best_of(repeat, lex)
+    res["tokens"] = ntok
+    res["lex_s"] = t
+    res["lex_tok_s"] = ntok / t
+
+    # léxico (mmap/bytes)
+    fd, path = tempfile.mkstemp(suffix=".lbx")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+
+        def lex_mmap():
+            with SourceBuffer.open(path) as src:
+                for _ in BytesLexer(src).tokens():
+                    pass
+
+        res["lex_mmap_tok_s"] = ntok / best_of(repeat, lex_mmap)
+    finally:
+        os.unlink(path)
+
+    # parser: tokens de uma repetição, reaproveitados `reps` vezes
+    unit_toks = list(Lexer(unit).tokens())
+    eof, body = unit_toks[-1], unit_toks[:-1]
+    one = count_steps(grammar, unit_toks)
+    two = count_steps(grammar, body + unit_toks)
+    steps = one + (reps - 1) * (two - one)
+    parser = LL1Parser(grammar)
+
+    def parse():
+        parser.parse(itertools.chain(itertools.chain.from_iterable(itertools.repeat(body, reps)), (eof,)))
+
+    t = best_of(repeat, parse)
+    res["parse_steps"] = steps
+    res["parse_s"] = t
+    res["parse_steps_s"] = steps / t
+
+    # memória de pico do pipeline completo
+    if res["bytes"] <= mem_max:
+        res["peak_kb"] = peak_memory(lambda: parser.parse(Lexer(text).tokens())) / 1024
+    return res
+
+
+def run(sizes: List[int], repeat: int, mem_max: int) -> Dict[str, Any]:
+    with open(UNIT_FILE, encoding="utf-8") as f:
+        unit = f.read().rstrip("\n") + "\n"
+
+    fp = grammar_fingerprint()
+    art = None
+
+    def build():
+        nonlocal art
+        art = build_artifact(fp)
+
+    # ~1 ms: aquece (imports preguiçosos) e usa mais repetições para não oscilar
+    build()
+    build_ms = best_of(max(repeat, 5), build) * 1e3
+
+    out: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "fingerprint": fp[:16],
+        },
+        "table_build_ms": build_ms,
+        **bench_startup(repeat),
+        "sizes": {},
+    }
+    for size in sizes:
+        out["sizes"][fmt_size(size)] = bench_size(art["grammar"], unit, size, repeat, mem_max)
+    return out
+
+
+def flatten(res: Dict[str, Any]) -> Dict[str, float]:
+    flat = {k: res[k] for k in ("table_build_ms", "startup_ms", "import_ms") if k in res}
+    for name, r in res.get("sizes", {}).items():
+        for key in ("lex_tok_s", "lex_mmap_tok_s", "parse_steps_s", "peak_kb"):
+            if key in r:
+                flat[f"{name}.{key}"] = r[key]
+    return flat
+
+
+def compare(cur: Dict[str, Any], base: Dict[str, Any], threshold: float, mem_threshold: float) -> List[str]:
+    failures = []
+    a, b = flatten(cur), flatten(base)
+    print(f"\n{'métrica':<28} {'baseline':>14} {'atual':>14} {'variação':>9}")
+    for key in sorted(a.keys() & b.keys()):
+        old, new = b[key], a[key]
+        if not old:
+            continue
+        change = (new - old) / old
+        metric = key.rsplit(".", 1)[-1]
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > (mem_threshold if metric in MEMORY else threshold):
+            flag = "  REGRESSÃO"
+            failures.append(key)
+        print(f"{key:<28} {old:>14.1f} {new:>14.1f} {change * 100:>+8.1f}%{flag}")
+    return failures
+
+
+def print_results(res: Dict[str, Any]) -> None:
+    print(f"tabela (FIRST/FOLLOW + LL(1) + compilação): {res['table_build_ms']:.2f} ms")
+    print(f"partida do CLI: {res['startup_ms']:.1f} ms (imports: {res['import_ms']:.1f} ms)")
+    print(f"{'entrada':>8} {'tokens':>11} {'léxico tok/s':>13} {'mmap tok/s':>12} {'parse passos/s':>15}"
+          f" {'pico KB':>9}")
+    for name, r in res["sizes"].items():
+        peak = f"{r['peak_kb']:>9.0f}" if "peak_kb" in r else f"{'-':>9}"
+        print(f"{name:>8} {r['tokens']:>11} {r['lex_tok_s']:>13.0f} {r['lex_mmap_tok_s']:>12.0f}"
+              f" {r['parse_steps_s']:>15.0f} {peak}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="benchmark do léxico, da tabela e do parser")
+    ap.add_argument("--sizes", nargs="*", default=["64K", "1M", "8M"],
+                    help="tamanhos de entrada (sufixos K, M, G), ex.: 64K 1M 256M; sem nenhum, mede só tabela e partida")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições por medida (vale a melhor)")
+    ap.add_argument("--mem-max", default="4M", help="maior entrada em que a memória de pico é medida")
+    ap.add_argument("-o", "--output", help="salva o resultado em JSON")
+    ap.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="piora relativa tolerada antes de falhar (0.10 = 10%%)")
+    ap.add_argument("--mem-threshold", type=float, default=1.0,
+                    help="piora relativa tolerada na memória de pico (1.0 = 100%%)")
+    args = ap.parse_args()
+
+    res = run([parse_size(s) for s in args.sizes], args.repeat, parse_size(args.mem_max))
+    print_results(res)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        failures = compare(res, base, args.threshold, args.mem_threshold)
+        if failures:
+            print(f"\n{len(failures)} métrica(s) pioraram mais de {args.threshold:.0%}: {', '.join(failures)}",
+                  file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
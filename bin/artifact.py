@@ -0,0 +1,121 @@
+import hashlib
+import os
+import pickle
+import sys
+from contextlib import nullcontext
+from typing import Any, Dict
+
+from .grammar import G, NONTERMS, START_SYMBOL
+from .tokens import TERMS
+from .lexer import TOKEN_SPECS
+
+# Artefato em disco com FIRST/FOLLOW, conflitos e a gramática compilada.
+# O nome do arquivo carrega o hash da gramática, de TERMS, de TOKEN_SPECS e do
+# código que monta o artefato: qualquer mudança gera outro hash e o artefato é
+# reconstruído sozinho.
+
+ARTIFACT_VERSION = 3
+
+# módulos cujo código define o conteúdo do artefato (lidos como texto: importar
+# aqui custaria o tempo de carga que o cache existe para evitar)
+_BUILD_SOURCES = ("first_follow.py", "table.py", "compiled.py", "optimize.py")
+
+
+def grammar_fingerprint() -> str:
+    h = hashlib.sha256()
+    here = os.path.dirname(__file__)
+    for name in _BUILD_SOURCES:
+        with open(os.path.join(here, name), "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    h.update(repr((
+        ARTIFACT_VERSION,
+        START_SYMBOL,
+        list(NONTERMS),
+        [(A, G[A]) for A in NONTERMS],
+        list(TERMS),
+        list(TOKEN_SPECS),
+    )).encode("utf-8"))
+    return h.hexdigest()
+
+
+def cache_dir() -> str:
+    return os.environ.get("LOCKBIXO_CACHE_DIR") or os.path.join(os.path.dirname(__file__), "__pycache__")
+
+
+def artifact_path(fingerprint: str) -> str:
+    return os.path.join(cache_dir(), f"ll1-{fingerprint[:16]}.pickle")
+
+
+# Com `stats` (um ParseStats), o tempo de cada etapa é anotado nele.
+def build_artifact(fingerprint: str, stats=None) -> Dict[str, Any]:
+    from .first_follow import compute_first_follow
+    from .table import build_ll1_table
+    from .compiled import compile_grammar
+    from .optimize import build_optimized
+
+    phase = stats.phase if stats is not None else lambda name: nullcontext()
+    terms_no_eof = [t for t in TERMS if t != "EOF"]
+    with phase("FIRST/FOLLOW"):
+        FIRST, FOLLOW, first_of_sequence = compute_first_follow(G, NONTERMS, terms_no_eof, START_SYMBOL)
+    with phase("tabela LL(1)"):
+        TABLE, conflicts = build_ll1_table(G, NONTERMS, terms_no_eof, FIRST, FOLLOW, first_of_sequence)
+    with phase("compilação"):
+        grammar = compile_grammar(G, NONTERMS, TERMS, START_SYMBOL, TABLE, FOLLOW)
+    optimized = None
+    if not conflicts:
+        with phase("otimização"):
+            optimized = build_optimized(G, NONTERMS, TERMS, START_SYMBOL, TABLE, grammar)
+    return {
+        "fingerprint": fingerprint,
+        "FIRST": FIRST,
+        "FOLLOW": FOLLOW,
+        "conflicts": conflicts,
+        "grammar": grammar,
+        # gramática otimizada (None se não deu para otimizar sem conflito)
+        "optimized": optimized,
+    }
+
+
+def save_artifact(art: Dict[str, Any], path: str) -> None:
+    import tempfile
+
+    # escreve num temporário e renomeia: leitores nunca veem arquivo pela metade
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(art, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load_artifact(rebuild: bool = False, stats=None) -> Dict[str, Any]:
+    fp = grammar_fingerprint()
+    path = artifact_path(fp)
+
+    if not rebuild:
+        try:
+            with stats.phase("artefato (cache)") if stats is not None else nullcontext():
+                with open(path, "rb") as f:
+                    art = pickle.load(f)
+            if art.get("fingerprint") == fp:
+                return art
+        except Exception:
+            # artefato ausente, corrompido ou de outra versão: reconstrói
+            pass
+
+    if stats is not None:
+        # reconstruído: o tempo que conta é o das fases do build
+        stats.times.pop("artefato (cache)", None)
+    art = build_artifact(fp, stats)
+    try:
+        save_artifact(art, path)
+    except OSError as e:
+        # diretório sem permissão de escrita: segue com o artefato em memória
+        print(f"aviso: não foi possível salvar {path}: {e}", file=sys.stderr)
+    return art
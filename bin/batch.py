@@ -0,0 +1,183 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .lexer import Lexer, LexerError
+from .parser import LL1Parser, ParserError
+
+# Modo lote: valida muitos .lbx de uma vez. A tabela é carregada uma vez no
+# processo principal e enviada a cada worker só na inicialização; os arquivos
+# são distribuídos num ProcessPoolExecutor e o resultado sai em JSON Lines,
+# sempre na ordem da entrada (a mesma para qualquer número de workers).
+#
+#   python -m bin.batch exemplos/ 'testes/**/*.lbx' -j 8
+
+_parse = None
+_cache = None
+
+
+def _init_worker(grammar, fingerprint: str, engine: str, cache: Optional[Tuple[str, int]] = None) -> None:
+    global _parse, _cache
+    _cache = None
+    if cache is not None:
+        from .result_cache import ResultCache
+        _cache = ResultCache(cache[0], cache[1], fingerprint)
+    if engine == "generated":
+        from .codegen import load_generated_parser
+        _parse = load_generated_parser(grammar, fingerprint).parse
+    else:
+        parser = LL1Parser(grammar)
+        _parse = lambda toks: parser.parse(toks)[0]
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    out: List[str] = []
+    seen = set()
+
+    def add(path: str) -> None:
+        if path not in seen:
+            seen.add(path)
+            out.append(path)
+
+    for pat in patterns:
+        if os.path.isdir(pat):
+            found = []
+            for root, dirs, files in os.walk(pat):
+                dirs.sort()
+                found += [os.path.join(root, f) for f in files if f.endswith(".lbx")]
+            for path in sorted(found):
+                add(path)
+        elif glob.has_magic(pat):
+            for path in sorted(glob.glob(pat, recursive=True)):
+                if os.path.isfile(path):
+                    add(path)
+        else:
+            add(pat)
+    return out
+
+
+# Tokens passados adiante sem guardar a lista; next(counter) dá quantos foram
+# lidos (o zip só avança o contador depois de receber um token)
+def _counting(toks: Iterator) -> Tuple[Iterator, Iterator[int]]:
+    counter = count()
+    return map(itemgetter(0), zip(toks, counter)), counter
+
+
+# tokens=True guarda também a lista de tokens (tipo, lexema, linha, coluna);
+# sem ela, lexer e parser rodam juntos e "tokens" conta os lidos pelo parser
+def check_text(code: str, tokens: bool = False) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {"status": "ok", "line": None, "col": None, "message": None, "tokens": None}
+    toks, counter = _counting(Lexer(code).tokens())
+    try:
+        if tokens:
+            toks = list(toks)
+            rec["token_list"] = [(t.kind, t.lexeme, t.line, t.col) for t in toks]
+        if not _parse(toks):
+            rec["status"] = "rejected"
+        rec["tokens"] = next(counter)
+    except LexerError as e:
+        rec.update(status="lex_error", line=e.line, col=e.col, message=str(e))
+    except ParserError as e:
+        rec.update(status="syntax_error", line=e.line, col=e.col, message=str(e), tokens=next(counter))
+    return rec
+
+
+def _record(path: str, res: Dict[str, Any], t0: float) -> Dict[str, Any]:
+    rec = {"path": path, **{k: res[k] for k in ("status", "line", "col", "message", "tokens")}}
+    rec["time_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    return rec
+
+
+def check_file(path: str) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    try:
+        if _cache is not None:
+            res = _cache.check(check_text, path=path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                res = check_text(f.read())
+    except (OSError, UnicodeDecodeError) as e:
+        res = {"status": "io_error", "line": None, "col": None, "message": str(e), "tokens": None}
+    return _record(path, res, t0)
+
+
+# Com `cache` (um ResultCache), os arquivos inalterados são resolvidos aqui
+# mesmo, só pelo stat; os workers recebem apenas o resto.
+def run_batch(paths: List[str], workers: int = 1, engine: str = "table",
+              art: Optional[Dict[str, Any]] = None, cache=None) -> Iterator[Dict[str, Any]]:
+    if art is None:
+        from .artifact import load_artifact
+        art = load_artifact()
+    init = (art["grammar"], art["fingerprint"], engine,
+            (cache.dir, cache.max_bytes) if cache is not None else None)
+
+    hits: Dict[int, Dict[str, Any]] = {}
+    todo = paths
+    if cache is not None:
+        for i, path in enumerate(paths):
+            t0 = time.perf_counter()
+            res = cache.lookup(path)
+            if res is not None:
+                hits[i] = _record(path, res, t0)
+        todo = [p for i, p in enumerate(paths) if i not in hits]
+
+    if workers <= 1 or len(todo) <= 1:
+        _init_worker(*init)
+        yield from _merge(len(paths), hits, map(check_file, todo))
+        return
+
+    # lotes por tarefa para não pagar um IPC por arquivo pequeno
+    chunksize = max(1, len(todo) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as ex:
+        yield from _merge(len(paths), hits, ex.map(check_file, todo, chunksize=chunksize))
+
+
+def _merge(n: int, hits: Dict[int, Dict[str, Any]], results: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for i in range(n):
+        yield hits[i] if i in hits else next(results)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="analisa vários arquivos .lbx em paralelo (saída em JSON Lines)")
+    ap.add_argument("paths", nargs="+", help="arquivos, diretórios (busca *.lbx recursivamente) ou globs")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="número de processos")
+    ap.add_argument("--engine", choices=("table", "generated"), default="table")
+    ap.add_argument("--no-time", action="store_true", help="omite time_ms (saída idêntica entre execuções)")
+    ap.add_argument("--cache", action="store_true",
+                    help="guarda/reaproveita resultados num cache em disco (arquivos inalterados nem são lidos)")
+    ap.add_argument("--cache-dir", help="diretório do cache de resultados (padrão: results/ no cache da tabela)")
+    ap.add_argument("--cache-max", type=int, default=256, help="tamanho máximo do cache de resultados, em MB")
+    args = ap.parse_args()
+
+    cache = None
+    if args.cache or args.cache_dir:
+        from .result_cache import ResultCache
+        cache = ResultCache(args.cache_dir, args.cache_max * 1024 * 1024)
+
+    paths = expand_paths(args.paths)
+    counts: Dict[str, int] = {}
+    out = sys.stdout
+    t0 = time.perf_counter()
+    for rec in run_batch(paths, args.workers, args.engine, cache=cache):
+        if args.no_time:
+            del rec["time_ms"]
+        counts[rec["status"]] = counts.get(rec["status"], 0) + 1
+        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    out.flush()
+
+    summary = ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    if cache is not None:
+        summary += f" ({cache.hits} pelo cache, sem ler o arquivo)"
+    print(f"{len(paths)} arquivo(s) em {time.perf_counter() - t0:.2f}s: {summary or 'nada'}", file=sys.stderr)
+    sys.exit(0 if counts.get("ok", 0) == len(paths) else 1)
+
+
+if __name__ == "__main__":
+    main()
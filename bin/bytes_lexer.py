@@ -0,0 +1,157 @@
+import mmap
+import re
+from typing import Iterator, Optional, Tuple
+
+from .lexer import TOKEN_SPECS, LexerError, invalid_char_error
+from .tokens import TERMS, TERM_IDS
+
+# Lexer sobre bytes (mmap do arquivo), para fontes muito grandes.
+#
+# Diferenças para o Lexer normal:
+#   - o texto nunca é decodificado inteiro: o regex roda direto no mmap;
+#   - espaços e comentários são consumidos dentro do MESMO match do token
+#     seguinte (prefixo possessivo), então não geram objeto nenhum;
+#   - cada token guarda só (kid, início, fim); lexema, linha e coluna são
+#     calculados quando alguém pede (mensagem de erro, --tokens, trace).
+#
+# As colunas continuam contadas em caracteres, como no Lexer de str.
+
+_TRIVIA = [p for n, p in TOKEN_SPECS if n not in TERM_IDS]
+
+# num char literal, um caractere não-ASCII ocupa de 2 a 4 bytes em UTF-8
+_BYTES_OVERRIDES = {
+    'CHAR_LIT': r"'(?:[^\\\n\x80-\xff]|[\xc2-\xf4][\x80-\xbf]{1,3})'",
+}
+
+_SKIP = '(?:' + '|'.join(_TRIVIA) + ')*+'
+_BYTES_RE = re.compile(
+    (_SKIP + '(?:' + '|'.join(
+        f'(?P<{n}>{_BYTES_OVERRIDES.get(n, p)})' for n, p in TOKEN_SPECS if n in TERM_IDS
+    ) + r'|(?P<_END>\Z))').encode('ascii'),
+    re.DOTALL,
+)
+_SKIP_RE = re.compile(_SKIP.encode('ascii'), re.DOTALL)
+
+_EOF = TERM_IDS['EOF']
+_GROUP_KID = [-1] * (_BYTES_RE.groups + 1)
+for _name, _idx in _BYTES_RE.groupindex.items():
+    _GROUP_KID[_idx] = TERM_IDS.get(_name, _EOF)
+
+
+class SourceBuffer:
+    # Bytes do fonte (bytes, bytearray ou mmap) + conversão offset -> linha/coluna.
+    # As consultas costumam vir em ordem crescente (tokens, erro no fim), então
+    # guardamos a última posição convertida e só contamos dali para frente.
+    def __init__(self, data):
+        self.data = data
+        self._mm: Optional[mmap.mmap] = None
+        self._cursor = (0, 1, 1)
+
+    @classmethod
+    def open(cls, path: str) -> "SourceBuffer":
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # arquivo vazio não pode ser mapeado
+                return cls(b"")
+        buf = cls(mm)
+        buf._mm = mm
+        return buf
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def text(self, start: int, end: int) -> str:
+        return self.data[start:end].decode("utf-8", "replace")
+
+    def line_col(self, pos: int) -> Tuple[int, int]:
+        cur, line, col = self._cursor
+        if pos < cur:
+            cur, line, col = 0, 1, 1
+        seg = self.data[cur:pos]
+        nl = seg.rfind(b"\n")
+        if nl < 0:
+            col += len(seg.decode("utf-8", "replace"))
+        else:
+            line += seg.count(b"\n")
+            col = len(seg[nl + 1:].decode("utf-8", "replace")) + 1
+        self._cursor = (pos, line, col)
+        return line, col
+
+
+class SpanToken:
+    # Mesma interface de Token (kind, lexeme, line, col, kid), mas preguiçosa
+    __slots__ = ("kid", "start", "end", "src", "_lc")
+
+    def __init__(self, kid: int, start: int, end: int, src: SourceBuffer):
+        self.kid = kid
+        self.start = start
+        self.end = end
+        self.src = src
+        self._lc: Optional[Tuple[int, int]] = None
+
+    @property
+    def kind(self) -> str:
+        return TERMS[self.kid]
+
+    @property
+    def lexeme(self) -> str:
+        return self.src.text(self.start, self.end)
+
+    @property
+    def line(self) -> int:
+        if self._lc is None:
+            self._lc = self.src.line_col(self.start)
+        return self._lc[0]
+
+    @property
+    def col(self) -> int:
+        if self._lc is None:
+            self._lc = self.src.line_col(self.start)
+        return self._lc[1]
+
+    def __repr__(self) -> str:
+        return f"SpanToken({self.kind}, {self.start}, {self.end})"
+
+
+class BytesLexer:
+    def __init__(self, src: SourceBuffer):
+        self.src = src
+
+    # `start` precisa ser uma fronteira entre tokens (ou 0): o lexer retoma dali
+    def tokens(self, start: int = 0) -> Iterator[SpanToken]:
+        src = self.src
+        data = src.data
+        n = len(data)
+        match = _BYTES_RE.match
+        kids = _GROUP_KID
+        pos = start
+        while True:
+            m = match(data, pos)
+            if m is None:
+                raise self._error(pos)
+            g = m.lastindex
+            kid = kids[g]
+            if kid == _EOF:
+                yield SpanToken(_EOF, n, n, src)
+                return
+            pos = m.end()
+            yield SpanToken(kid, m.start(g), pos, src)
+
+    def _error(self, pos: int) -> LexerError:
+        pos = _SKIP_RE.match(self.src.data, pos).end()
+        line, col = self.src.line_col(pos)
+        text = self.src.text(pos, pos + 80)
+        return invalid_char_error(text, 0, line, col)
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+# Cliente do servidor de parse (bin/server.py). Sem --socket, sobe o próprio
+# servidor como subprocesso falando por stdin/stdout, então dá para testar tudo
+# localmente:
+#
+#   python -m bin.client exemplos/*.lbx
+#   python -m bin.main --serve --socket /tmp/lbx.sock &
+#   python -m bin.client --socket /tmp/lbx.sock --lex exemplos/04_mistura.lbx
+#
+# Em código:
+#   with Client() as c:
+#       c.request(op="parse", text="int x;")       # {"id": 1, "status": "ok", ...}
+#       a = c.send(op="parse", path="grande.lbx")   # vários pedidos em paralelo
+#       c.cancel(a); c.wait(a)                      # {"id": a, "status": "cancelled"}
+
+
+class Client:
+    def __init__(self, socket_path: Optional[str] = None, workers: Optional[int] = None):
+        self.proc = None
+        self.sock = None
+        if socket_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(socket_path)
+            self.rfile = self.sock.makefile("rb")
+            self.wfile = self.sock.makefile("wb")
+        else:
+            cmd = [sys.executable, "-m", "bin.main", "--serve"]
+            if workers is not None:
+                cmd += ["--workers", str(workers)]
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=root)
+            self.rfile, self.wfile = self.proc.stdout, self.proc.stdin
+        self.next_id = 1
+        self.pending: Dict[Any, Dict[str, Any]] = {}
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.proc is not None:
+            try:
+                self.wfile.close()
+            except BrokenPipeError:
+                pass
+            self.proc.wait()
+            self.proc = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def send(self, **req: Any) -> Any:
+        if "id" not in req:
+            req["id"] = self.next_id
+            self.next_id += 1
+        self.wfile.write(json.dumps(req, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+        return req["id"]
+
+    def recv(self) -> Dict[str, Any]:
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("o servidor fechou a conexão")
+        return json.loads(line)
+
+    # resposta do pedido `rid`; as de outros pedidos que chegarem antes ficam guardadas
+    def wait(self, rid: Any) -> Dict[str, Any]:
+        while rid not in self.pending:
+            resp = self.recv()
+            self.pending[resp.get("id")] = resp
+        return self.pending.pop(rid)
+
+    def request(self, **req: Any) -> Dict[str, Any]:
+        return self.wait(self.send(**req))
+
+    def cancel(self, rid: Any) -> None:
+        self.send(op="cancel", target=rid, id=f"cancel-{rid}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="cliente do servidor de parse (JSON Lines)")
+    ap.add_argument("paths", nargs="*", help="arquivos .lbx a analisar (todos enviados de uma vez)")
+    ap.add_argument("--socket", help="socket Unix do servidor; sem ele, sobe um servidor por stdin/stdout")
+    ap.add_argument("-j", "--workers", type=int, help="workers do servidor subido pelo cliente")
+    ap.add_argument("--lex", action="store_true", help="só o léxico (devolve os tokens)")
+    ap.add_argument("--timeout", type=float, help="prazo de cada pedido, em segundos")
+    ap.add_argument("--ping", action="store_true", help="só confere se o servidor responde")
+    ap.add_argument("--shutdown", action="store_true", help="encerra o servidor depois dos pedidos")
+    args = ap.parse_args()
+
+    ok = True
+    with Client(args.socket, args.workers) as c:
+        if args.ping:
+            print(json.dumps(c.request(op="ping"), ensure_ascii=False))
+        extra = {"timeout": args.timeout} if args.timeout else {}
+        ids: List[Any] = [c.send(op="lex" if args.lex else "parse", path=os.path.abspath(p), **extra)
+                          for p in args.paths]
+        for p, rid in zip(args.paths, ids):
+            resp = c.wait(rid)
+            resp["path"] = p
+            ok &= resp["status"] == "ok"
+            sys.stdout.write(json.dumps(resp, ensure_ascii=False) + "\n")
+        if args.shutdown:
+            c.request(op="shutdown")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import argparse
+import importlib.util
+import os
+import sys
+import types
+from typing import Dict, List
+
+from .compiled import CompiledGrammar
+
+# Gera da tabela LL(1) um módulo Python com um parser descendente recursivo
+# (uma função por não-terminal; A → α A vira laço). Aceita as mesmas entradas
+# que LL1Parser, com as mesmas mensagens de erro. Aninhamento fundo demais para
+# o limite de recursão termina num laço de tabela embutido no módulo.
+
+CODEGEN_VERSION = 3
+
+# quadros de folga no orçamento (lexer, montagem da mensagem de erro, ...)
+STACK_MARGIN = 64
+
+_HEADER = '''\
+# Gerado por bin/codegen.py (gramática {fingerprint}). Não editar à mão.
+import sys
+
+try:
+    from bin.parser import ParserError
+except ImportError:
+    class ParserError(Exception):
+        def __init__(self, message, line=None, col=None):
+            super().__init__(message)
+            self.line = line
+            self.col = col
+
+
+class _Accept(Exception):
+    pass
+
+
+class _Unwind(Exception):
+    # pendências de cada chamada interrompida, da mais interna para fora
+    def __init__(self, rest):
+        self.rest = [rest]
+
+
+EOF = {eof}
+T = {nterms}
+# chamadas por nível de aninhamento, no pior caso
+LEVEL_FRAMES = {level_frames}
+STACK_MARGIN = {margin}
+TABLE = {table!r}
+RPRODS = {rprods!r}
+
+# "{{ ... }}" esperado por terminal e por não-terminal, no formato do LL1Parser
+EXPECTED = {expected!r}
+
+'''
+
+_FOOTER = '''
+
+# Laço da tabela, a partir da pilha deixada por um _Unwind
+def _run_table(p, stack):
+    look = p.look
+    k = look.kid
+    while stack:
+        X = stack.pop()
+        if X < T:
+            if X != k:
+                raise p._eof() if X == EOF else p._mismatch(X)
+            if X == EOF:
+                return True
+            look = p.look = p.nxt()
+            k = look.kid
+            continue
+        q = TABLE[(X - T) * T + k]
+        if q < 0:
+            raise p._expected(X)
+        stack.extend(RPRODS[q])
+    return False
+
+
+def parse(tokens):
+    p = _Parser()
+    p.nxt = iter(tokens).__next__
+    used = 0
+    f = sys._getframe()
+    while f is not None:
+        used += 1
+        f = f.f_back
+    p.room = max(0, (sys.getrecursionlimit() - used - STACK_MARGIN) // LEVEL_FRAMES - 1)
+    try:
+        p.look = p.nxt()
+        try:
+            p.{start}()
+        except _Unwind as u:
+            stack = [EOF]
+            for rest in reversed(u.rest):
+                stack.extend(reversed(rest))
+            return _run_table(p, stack)
+        if p.look.kid != EOF:
+            raise p._eof()
+        return True
+    except _Accept:
+        return True
+    except StopIteration:
+        raise ParserError("fim inesperado da entrada (sem token EOF)") from None
+'''
+
+
+def _fn(g: CompiledGrammar, A: int) -> str:
+    name = g.names[A]
+    return "p_" + name if name.isidentifier() else f"p_{A}"
+
+
+def _gen_seq(g: CompiledGrammar, A: int, rhs, loop: bool, known_first: bool, ind: str, back) -> List[str]:
+    out: List[str] = []
+    for n, X in enumerate(rhs):
+        last = n == len(rhs) - 1
+        if X == g.eof:
+            out.append(f"{ind}if self.look.kid != EOF:")
+            out.append(f"{ind}    raise self._eof()")
+            out.append(f"{ind}raise _Accept()")
+            return out
+        if g.is_terminal(X):
+            # o primeiro terminal já foi conferido na escolha da produção
+            if not (n == 0 and known_first):
+                out.append(f"{ind}if self.look.kid != {X}:")
+                out.append(f"{ind}    raise self._mismatch({X})")
+            out.append(f"{ind}self.look = self.nxt()  # {g.names[X]}")
+        elif loop and last and X == A:
+            out.append(f"{ind}continue")
+            return out
+        else:
+            rest = tuple(rhs[n + 1:])
+            if (A, X) in back:
+                # um nível a mais de aninhamento: sem orçamento, desiste daqui
+                out.append(f"{ind}if not self.room:")
+                out.append(f"{ind}    raise _Unwind({(X,) + rest!r})")
+                out.append(f"{ind}self.room -= 1")
+            out.append(f"{ind}try:")
+            out.append(f"{ind}    self.{_fn(g, X)}()")
+            out.append(f"{ind}except _Unwind as u:")
+            out.append(f"{ind}    u.rest.append({rest!r})")
+            out.append(f"{ind}    raise")
+            if (A, X) in back:
+                out.append(f"{ind}self.room += 1")
+    out.append(f"{ind}return")
+    return out
+
+
+# Grafo de chamadas (sem as auto-chamadas que viram laço): arestas de volta de
+# uma DFS a partir do símbolo inicial (todo ciclo tem uma) e o maior caminho
+# sem elas, em chamadas
+def _call_graph(g: CompiledGrammar):
+    calls: Dict[int, List[int]] = {A: [] for A in range(g.nterms, len(g.names))}
+    for A, rhs in g.prods:
+        for n, X in enumerate(rhs):
+            if not g.is_terminal(X) and not (n == len(rhs) - 1 and X == A) and X not in calls[A]:
+                calls[A].append(X)
+    back = set()
+    state: Dict[int, int] = {}  # 1 = na pilha da DFS, 2 = terminado
+    order: List[int] = []
+    for root in [g.start] + list(calls):
+        if root in state:
+            continue
+        state[root] = 1
+        work = [(root, iter(calls[root]))]
+        while work:
+            A, it = work[-1]
+            X = next(it, None)
+            if X is None:
+                state[A] = 2
+                order.append(A)
+                work.pop()
+            elif state.get(X) == 1:
+                back.add((A, X))
+            elif X not in state:
+                state[X] = 1
+                work.append((X, iter(calls[X])))
+    longest: Dict[int, int] = {}
+    for A in order:  # pós-ordem: os chamados vêm antes
+        longest[A] = 1 + max((longest[X] for X in calls[A] if (A, X) not in back), default=0)
+    return back, max(longest.values(), default=1)
+
+
+def _gen_nonterminal(g: CompiledGrammar, A: int, back) -> List[str]:
+    T = g.nterms
+    by_prod: Dict[int, List[int]] = {}
+    for a in range(T):
+        p = g.lookup(A, a)
+        if p >= 0:
+            by_prod.setdefault(p, []).append(a)
+
+    # produções A → α A no fim: o corpo vira laço em vez de chamada recursiva
+    loop = any(g.prods[p][1] and g.prods[p][1][-1] == A for p in by_prod)
+    ind = "            " if loop else "        "
+    lines = [f"    def {_fn(g, A)}(self):"]
+    if loop:
+        lines.append("        while True:")
+    lines.append(f"{ind}k = self.look.kid")
+
+    # produções não-anuláveis primeiro; a de ε (escolhida por FOLLOW) por último
+    order = sorted(by_prod, key=lambda p: (not g.prods[p][1], p))
+    for n, p in enumerate(order):
+        terms = by_prod[p]
+        kw = "if" if n == 0 else "elif"
+        cond = f"k == {terms[0]}" if len(terms) == 1 else f"k in _SEL_{p}"
+        lines.append(f"{ind}{kw} {cond}:  # {g.fmt_prod(p)}")
+        rhs = g.prods[p][1]
+        known_first = len(terms) == 1 and bool(rhs) and rhs[0] == terms[0]
+        lines += _gen_seq(g, A, rhs, loop, known_first, ind + "    ", back)
+    lines.append(f"{ind}raise self._expected({A})")
+    return lines
+
+
+def generate_parser_source(g: CompiledGrammar, fingerprint: str = "") -> str:
+    T = g.nterms
+    expected: Dict[int, str] = {}
+    for X in range(T):
+        expected[X] = "{ " + g.names[X] + " }"
+    sets: List[str] = []
+    for A in range(T, len(g.names)):
+        row = sorted(g.names[a] for a in g.expected(A))
+        expected[A] = "{ " + ", ".join(row) + " }" if row else "{ }"
+        seen: Dict[int, List[int]] = {}
+        for a in range(T):
+            p = g.lookup(A, a)
+            if p >= 0:
+                seen.setdefault(p, []).append(a)
+        for p, terms in seen.items():
+            if len(terms) > 1:
+                sets.append(f"_SEL_{p} = frozenset({terms!r})")
+
+    back, level_frames = _call_graph(g)
+    out = [_HEADER.format(fingerprint=fingerprint or "?", eof=g.eof, nterms=T,
+                          level_frames=level_frames + 1, margin=STACK_MARGIN,
+                          table=list(g.table), rprods=g.rprods, expected=expected)]
+    out += sets
+    out += [
+        "",
+        "",
+        "class _Parser:",
+        "    __slots__ = ('look', 'nxt', 'room')",
+        "",
+        "    def _fail(self, expected):",
+        "        look = self.look",
+        "        return ParserError(",
+        "            f\"{look.line}:{look.col}: O parser esperava {expected}, \"",
+        "            f\"mas veio {look.kind} '{look.lexeme}'\",",
+        "            look.line, look.col,",
+        "        )",
+        "",
+        "    def _eof(self):",
+        "        look = self.look",
+        "        return ParserError(",
+        "            f\"{look.line}:{look.col}: esperado EOF, mas veio {look.kind} '{look.lexeme}'\",",
+        "            look.line, look.col,",
+        "        )",
+        "",
+        "    def _mismatch(self, t):",
+        "        return self._fail(EXPECTED[t])",
+        "",
+        "    def _expected(self, A):",
+        "        return self._fail(EXPECTED[A])",
+    ]
+    for A in range(T, len(g.names)):
+        out.append("")
+        out += _gen_nonterminal(g, A, back)
+    out.append(_FOOTER.format(start=_fn(g, g.start)))
+    return "\n".join(out)
+
+
+def load_generated_parser(g: CompiledGrammar, fingerprint: str):
+    # O módulo gerado fica em cache ao lado do artefato da tabela, com o mesmo hash
+    from .artifact import cache_dir
+
+    name = f"parser_gen_{fingerprint[:16]}_v{CODEGEN_VERSION}"
+    path = os.path.join(cache_dir(), name + ".py")
+    if not os.path.exists(path):
+        try:
+            write_parser_module(g, path, fingerprint)
+        except OSError as e:
+            # cache inutilizável: segue com o módulo gerado só em memória
+            print(f"aviso: não foi possível salvar {path}: {e}", file=sys.stderr)
+            module = types.ModuleType(name)
+            exec(compile(generate_parser_source(g, fingerprint), path, "exec"), module.__dict__)
+            return module
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_parser_module(g: CompiledGrammar, path: str, fingerprint: str = "") -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(generate_parser_source(g, fingerprint))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def main():
+    from .artifact import load_artifact
+
+    ap = argparse.ArgumentParser(description="gera um parser descendente recursivo a partir da tabela LL(1)")
+    ap.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    args = ap.parse_args()
+
+    art = load_artifact()
+    if args.output:
+        write_parser_module(art["grammar"], args.output, art["fingerprint"])
+    else:
+        sys.stdout.write(generate_parser_source(art["grammar"], art["fingerprint"]))
+
+
+if __name__ == "__main__":
+    main()
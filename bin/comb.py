@@ -0,0 +1,200 @@
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .compiled import CompiledGrammar
+
+# Tabela LL(1) comprimida (LL1Parser(grammar, comb=True)): só as células
+# válidas, com as linhas encaixadas num vetor único (comb vector). Consulta:
+#   b = base[r]; i = b + k
+#   p = value[i] if check[i] == b else -1
+# Relatório contra a matriz plana: python -m bin.comb [--copies 8] [arquivo.lbx]
+
+ERROR = -1
+
+
+class CombTable:
+    # `table`: matriz plana de linhas de T células (-1 = erro; outros negativos,
+    # como o PRATT do LL1Parser, são tratados como produções)
+    def __init__(self, table: array, T: int):
+        self.nterms = T
+        nrows = len(table) // T if T else 0
+        self.nrows = nrows
+        rows: Dict[Tuple[Tuple[int, int], ...], List[int]] = {}
+        for r in range(nrows):
+            cells = tuple((k, table[r * T + k]) for k in range(T) if table[r * T + k] != ERROR)
+            rows.setdefault(cells, []).append(r)
+
+        # first fit: a linha mais cheia primeiro, cada uma no menor deslocamento
+        # livre que não seja base de outra linha
+        base = array('i', [0]) * nrows
+        used: Dict[int, int] = {}
+        bases = set()
+        empty: List[int] = []
+        low = 0  # antes de `low` não há posição livre
+        for cells, rs in sorted(rows.items(), key=lambda item: (-len(item[0]), item[1][0])):
+            if not cells:
+                empty = rs
+                continue
+            b = max(0, low - cells[0][0])
+            while b in bases or any(b + k in used for k, _ in cells):
+                b += 1
+            bases.add(b)
+            for k, p in cells:
+                used[b + k] = p
+            for r in rs:
+                base[r] = b
+            while low in used:
+                low += 1
+
+        # folga de T no fim: base[r] + k nunca sai do vetor; as linhas sem
+        # nenhuma célula válida apontam para a folga, onde check é -1
+        top = max(max(used) + 1 if used else 0, max(bases, default=-1) + 1)
+        for r in empty:
+            base[r] = top
+        size = top + T
+        self.value = array(table.typecode, [ERROR]) * size
+        self.check = array('h' if size < 2 ** 15 else 'i', [-1]) * size
+        for r in range(nrows):
+            b = base[r]
+            for k in range(T):
+                p = table[r * T + k]
+                if p != ERROR:
+                    self.value[b + k] = p
+                    self.check[b + k] = b
+        self.base = base
+        self.entries = len(used)
+        self.distinct_rows = len(bases)
+
+    def lookup(self, r: int, k: int) -> int:
+        b = self.base[r]
+        i = b + k
+        return self.value[i] if self.check[i] == b else ERROR
+
+    # bytes dos vetores (sem o cabeçalho dos objetos)
+    def nbytes(self) -> int:
+        return sum(len(a) * a.itemsize for a in (self.base, self.value, self.check))
+
+    def sizeof(self) -> int:
+        return sum(map(sys.getsizeof, (self.base, self.value, self.check)))
+
+
+# ---------------------------------------------------------------- relatório
+
+# `copies` cópias disjuntas da tabela (bloco-diagonal): simula uma gramática
+# com copies x N não-terminais e copies x T terminais
+def _replicate(table: array, T: int, nprods: int, copies: int) -> Tuple[array, int]:
+    N = len(table) // T
+    big = array('i' if nprods * copies >= 2 ** 15 else table.typecode, [ERROR]) * (N * copies * T * copies)
+    for c in range(copies):
+        for r in range(N):
+            row = (c * N + r) * T * copies + c * T
+            for k in range(T):
+                p = table[r * T + k]
+                if p != ERROR:
+                    big[row + k] = p + c * nprods
+    return big, T * copies
+
+
+# a mesma tabela no formato de build_ll1_table: {A: {a: produção}}
+def _as_dicts(table: array, T: int, prods: List[List[str]]) -> Dict[str, Dict[str, List[str]]]:
+    out: Dict[str, Dict[str, List[str]]] = {}
+    for r in range(len(table) // T):
+        out[f"N{r}"] = {f"t{k}": prods[table[r * T + k] % len(prods)]
+                        for k in range(T) if table[r * T + k] != ERROR}
+    return out
+
+
+def _dicts_size(d: Dict[str, Dict[str, List[str]]]) -> int:
+    # chaves e listas de produção são compartilhadas com a gramática: só os dicts contam
+    return sys.getsizeof(d) + sum(sys.getsizeof(row) for row in d.values())
+
+
+def _best(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def report(g: CompiledGrammar, copies: int = 1, source: Optional[str] = None) -> List[str]:
+    T = g.nterms
+    table, TT = _replicate(g.table, T, len(g.prods), copies) if copies > 1 else (g.table, T)
+    N = len(table) // TT
+    dicts = _as_dicts(table, TT, g.prod_text)
+    comb = CombTable(table, TT)
+    cells = sum(p != ERROR for p in table)
+    for r in range(N):
+        for k in range(TT):
+            assert comb.lookup(r, k) == table[r * TT + k]
+
+    lines = [f"tabela: {N} não-terminais x {TT} terminais, {cells} células válidas "
+             f"({100 * cells / max(len(table), 1):.1f}%), {comb.distinct_rows} linhas distintas, "
+             f"{len(comb.value)} posições no vetor comb"]
+    flat_raw = len(table) * table.itemsize
+    lines.append(f"  {'formato':<14}{'bytes (dados)':>15}{'getsizeof':>12}{'consulta':>12}")
+
+    # consultas: as células válidas em ordem aleatória (é o que o parser consulta)
+    rnd = random.Random(0)
+    pairs = [(r, k) for r in range(N) for k in range(TT) if table[r * TT + k] != ERROR]
+    pairs = (pairs * (200000 // max(len(pairs), 1) + 1))[:200000]
+    rnd.shuffle(pairs)
+    named = [(f"N{r}", f"t{k}") for r, k in pairs]
+
+    def by_dicts():
+        for A, a in named:
+            dicts[A].get(a)
+
+    def by_flat():
+        for r, k in pairs:
+            table[r * TT + k]
+
+    def by_comb():
+        base, check, value = comb.base, comb.check, comb.value
+        for r, k in pairs:
+            b = base[r]
+            i = b + k
+            value[i] if check[i] == b else -1
+
+    n = len(pairs)
+    for name, raw, size, fn in (("dict-de-dicts", None, _dicts_size(dicts), by_dicts),
+                                ("matriz plana", flat_raw, sys.getsizeof(table), by_flat),
+                                ("comb", comb.nbytes(), comb.sizeof(), by_comb)):
+        ns = _best(fn) / n * 1e9
+        lines.append(f"  {name:<14}{raw if raw is not None else '-':>15}{size:>12}{ns:>9.1f} ns")
+
+    if source is not None and copies == 1:
+        from .lexer import Lexer
+        from .parser import LL1Parser
+
+        with open(source, "r", encoding="utf-8") as f:
+            toks = list(Lexer(f.read()).tokens())
+        lines.append(f"parse de {source} ({len(toks)} tokens):")
+        for name, parser in (("matriz plana", LL1Parser(g)), ("comb", LL1Parser(g, comb=True))):
+            t = _best(lambda: parser.parse(toks), 3)
+            lines.append(f"  {name:<14}{len(toks) / t / 1e6:>8.2f} Mtok/s")
+    return lines
+
+
+def main():
+    from .artifact import load_artifact
+
+    ap = argparse.ArgumentParser(description="memória e velocidade da tabela LL(1) comprimida (comb)")
+    ap.add_argument("source", nargs="?", help="arquivo .lbx para medir também o parse")
+    ap.add_argument("--copies", type=int, default=1,
+                    help="mede numa tabela com N cópias disjuntas da gramática (simula gramáticas maiores)")
+    ap.add_argument("--optimize", action="store_true", help="usa a gramática otimizada")
+    args = ap.parse_args()
+
+    art = load_artifact()
+    g = art["optimized"] if args.optimize and art["optimized"] is not None else art["grammar"]
+    print("\n".join(report(g, max(1, args.copies), args.source)))
+
+
+if __name__ == "__main__":
+    main()
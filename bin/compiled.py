@@ -0,0 +1,89 @@
+from array import array
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from .grammar import EPS
+
+# Forma compilada da gramática: todos os símbolos viram inteiros pequenos.
+#   terminais      -> 0 .. T-1     (mesma ordem de TERMS, a mesma usada pelo Lexer)
+#   não-terminais  -> T .. T+N-1   (ordem de NONTERMS)
+# Assim "X < T" já diz se o símbolo é terminal, e a tabela LL(1) é uma matriz
+# plana N x T de ids de produção (-1 = erro).
+
+
+class CompiledGrammar:
+    def __init__(self, terms: List[str], nonterms: List[str], prods: List[Tuple[int, Tuple[int, ...]]],
+                 prod_text: List[List[str]], table: array, start: int,
+                 follow: Optional[List[FrozenSet[int]]] = None):
+        self.terms = list(terms)
+        self.nonterms = list(nonterms)
+        self.names = self.terms + self.nonterms
+        self.nterms = len(self.terms)
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.eof = self.ids['EOF']
+        self.start = start
+
+        # prods[p] = (A, rhs) sem ε; rprods[p] = rhs invertido, pronto para empilhar
+        self.prods = prods
+        self.rprods = [tuple(reversed(rhs)) for _, rhs in prods]
+        # lado direito original (com ε), usado só em trace/impressão
+        self.prod_text = prod_text
+        self.table = table
+        # FOLLOW(A) em ids de terminais, indexado por A - T (conjuntos de sincronização)
+        self.follow = follow if follow is not None else [frozenset()] * len(self.nonterms)
+        # gramática otimizada (bin/optimize.py): a gramática de origem e, por
+        # não-terminal (A - T), a sequência de símbolos originais que ele representa
+        self.original: Optional["CompiledGrammar"] = None
+        self.origin: Optional[List[Tuple[int, ...]]] = None
+
+    def is_terminal(self, sym: int) -> bool:
+        return sym < self.nterms
+
+    def lookup(self, A: int, a: int) -> int:
+        return self.table[(A - self.nterms) * self.nterms + a]
+
+    def expected(self, A: int) -> List[int]:
+        T = self.nterms
+        base = (A - T) * T
+        row = self.table
+        return [a for a in range(T) if row[base + a] >= 0]
+
+    def fmt_prod(self, p: int) -> str:
+        A = self.prods[p][0]
+        return f"{self.names[A]} → {' '.join(self.prod_text[p])}"
+
+    # Tabela de volta no formato dict-de-dicts (para os dumps do main)
+    def table_dict(self) -> Dict[str, Dict[str, List[str]]]:
+        out: Dict[str, Dict[str, List[str]]] = {}
+        for A in range(self.nterms, len(self.names)):
+            base = (A - self.nterms) * self.nterms
+            out[self.names[A]] = {
+                self.terms[a]: self.prod_text[self.table[base + a]]
+                for a in range(self.nterms) if self.table[base + a] >= 0
+            }
+        return out
+
+
+def compile_grammar(G, NONTERMS: List[str], TERMS: List[str], START_SYMBOL: str, TABLE,
+                    FOLLOW=None) -> CompiledGrammar:
+    T = len(TERMS)
+    ids = {name: i for i, name in enumerate(list(TERMS) + list(NONTERMS))}
+
+    prods: List[Tuple[int, Tuple[int, ...]]] = []
+    prod_text: List[List[str]] = []
+    prod_id: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+    for A in NONTERMS:
+        for prod in G[A]:
+            prod_id[(A, tuple(prod))] = len(prods)
+            prods.append((ids[A], tuple(ids[s] for s in prod if s != EPS)))
+            prod_text.append(list(prod))
+
+    typecode = 'h' if len(prods) < 2 ** 15 else 'i'
+    table = array(typecode, [-1]) * (len(NONTERMS) * T)
+    for n, A in enumerate(NONTERMS):
+        for a, prod in TABLE.get(A, {}).items():
+            table[n * T + ids[a]] = prod_id[(A, tuple(prod))]
+
+    follow = None
+    if FOLLOW is not None:
+        follow = [frozenset(ids[a] for a in FOLLOW.get(A, ()) if a in ids) for A in NONTERMS]
+
+    return CompiledGrammar(TERMS, NONTERMS, prods, prod_text, table, ids[START_SYMBOL], follow)
@@ -0,0 +1,396 @@
+import argparse
+import re
+import time
+from array import array
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .lexer import TOKEN_SPECS, invalid_char_error
+from .tokens import TERMS, TERM_IDS, Token
+
+# Lexer por DFA (--lexer dfa): TOKEN_SPECS compilado numa tabela de transições
+# sobre classes de caracteres, com a regra do maior casamento. Palavras-chave
+# ficam num dict consultado depois de ler um ID inteiro, então `integer` é um
+# ID (o MASTER_RE lê `int` + `eger`); fora isso, os tokens são os do Lexer.
+# Comparação com Lexer.tokens: python -m bin.dfa [arquivo.lbx ...]
+
+_ANY = 128      # símbolo que representa todo caractere não-ASCII
+_ALPHABET = frozenset(range(_ANY + 1))
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+
+# ---------------------------------------------------------------- regex → NFA
+
+class _NFA:
+    def __init__(self):
+        self.eps: List[List[int]] = []
+        self.edges: List[List[Tuple[FrozenSet[int], int]]] = []
+
+    def state(self) -> int:
+        self.eps.append([])
+        self.edges.append([])
+        return len(self.eps) - 1
+
+
+class _Parser:
+    # Monta o fragmento (início, fim) do padrão dentro de `nfa`
+    def __init__(self, pattern: str, nfa: _NFA):
+        self.p = pattern
+        self.i = 0
+        self.nfa = nfa
+        self.lazy = False
+
+    def error(self, msg: str) -> ValueError:
+        return ValueError(f"padrão {self.p!r}, posição {self.i}: {msg}")
+
+    def parse(self) -> Tuple[int, int]:
+        frag = self.alt()
+        if self.i != len(self.p):
+            raise self.error("parêntese sem par")
+        return frag
+
+    def alt(self) -> Tuple[int, int]:
+        nfa = self.nfa
+        branches = [self.seq()]
+        while self.i < len(self.p) and self.p[self.i] == "|":
+            self.i += 1
+            branches.append(self.seq())
+        if len(branches) == 1:
+            return branches[0]
+        s, e = nfa.state(), nfa.state()
+        for a, b in branches:
+            nfa.eps[s].append(a)
+            nfa.eps[b].append(e)
+        return s, e
+
+    def seq(self) -> Tuple[int, int]:
+        nfa = self.nfa
+        s = e = nfa.state()
+        while self.i < len(self.p) and self.p[self.i] not in "|)":
+            a, b = self.quantified()
+            nfa.eps[e].append(a)
+            e = b
+        return s, e
+
+    def quantified(self) -> Tuple[int, int]:
+        nfa = self.nfa
+        a, b = self.atom()
+        if self.i < len(self.p) and self.p[self.i] in "*+?":
+            q = self.p[self.i]
+            self.i += 1
+            if self.i < len(self.p) and self.p[self.i] == "?":
+                self.i += 1
+                self.lazy = True
+            s, e = nfa.state(), nfa.state()
+            nfa.eps[s].append(a)
+            nfa.eps[b].append(e)
+            if q in "*?":
+                nfa.eps[s].append(e)
+            if q in "*+":
+                nfa.eps[b].append(a)
+            return s, e
+        return a, b
+
+    def atom(self) -> Tuple[int, int]:
+        p = self.p
+        c = p[self.i]
+        if c == "(":
+            self.i += 1
+            if p.startswith("?:", self.i):
+                self.i += 2
+            elif p.startswith("?", self.i):
+                raise self.error("grupo especial não suportado")
+            frag = self.alt()
+            if self.i >= len(p) or p[self.i] != ")":
+                raise self.error("falta )")
+            self.i += 1
+            return frag
+        if c == "[":
+            chars = self.char_class()
+        elif c == ".":
+            self.i += 1
+            chars = _ALPHABET  # DOTALL
+        elif c in "*+?{":
+            raise self.error(f"quantificador {c!r} sem operando")
+        else:
+            chars = frozenset((self.char(),))
+        s, e = self.nfa.state(), self.nfa.state()
+        self.nfa.edges[s].append((chars, e))
+        return s, e
+
+    def char(self) -> int:
+        c = self.p[self.i]
+        self.i += 1
+        if c == "\\":
+            c = self.p[self.i]
+            self.i += 1
+            if c.isalnum():
+                if c not in _ESCAPES:
+                    raise self.error(f"escape \\{c} não suportado")
+                c = _ESCAPES[c]
+        if ord(c) >= _ANY:
+            raise self.error("caractere não-ASCII no padrão")
+        return ord(c)
+
+    def char_class(self) -> FrozenSet[int]:
+        p = self.p
+        self.i += 1
+        neg = p.startswith("^", self.i)
+        if neg:
+            self.i += 1
+        chars = set()
+        first = True
+        while self.i < len(p) and (p[self.i] != "]" or first):
+            first = False
+            lo = self.char()
+            if p.startswith("-", self.i) and self.i + 1 < len(p) and p[self.i + 1] != "]":
+                self.i += 1
+                chars.update(range(lo, self.char() + 1))
+            else:
+                chars.add(lo)
+        if self.i >= len(p):
+            raise self.error("falta ]")
+        self.i += 1
+        return _ALPHABET - chars if neg else frozenset(chars)
+
+
+# ---------------------------------------------------------------- NFA → DFA
+
+_WORDS_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\|[A-Za-z_][A-Za-z0-9_]*)*")
+
+
+class DFAEngine:
+    def __init__(self, specs=TOKEN_SPECS):
+        ident = dict(specs).get("ID")
+        # palavras-chave: só palavras que o ID também casaria
+        self.keywords: Dict[str, int] = {}
+        rules = []
+        for name, pattern in specs:
+            if (name != "ID" and ident is not None and _WORDS_RE.fullmatch(pattern)
+                    and all(re.fullmatch(ident, w) for w in pattern.split("|"))):
+                for w in pattern.split("|"):
+                    self.keywords.setdefault(w, TERM_IDS[name])
+            else:
+                rules.append((name, pattern))
+        self.id_kid = TERM_IDS.get("ID", -1)
+
+        nfa = _NFA()
+        start = nfa.state()
+        accept: Dict[int, int] = {}   # estado final do NFA -> índice da regra
+        owner: List[int] = []
+        lazy = []
+        for r, (name, pattern) in enumerate(rules):
+            before = len(nfa.eps)
+            parser = _Parser(pattern, nfa)
+            a, b = parser.parse()
+            nfa.eps[start].append(a)
+            accept[b] = r
+            owner.extend([r] * (len(nfa.eps) - before))
+            lazy.append(parser.lazy)
+        owner.insert(0, -1)
+
+        # classes de caracteres: símbolos com a mesma pertinência em todos os conjuntos
+        sets = list({chars for out in nfa.edges for chars, _ in out})
+        sig: Dict[Tuple[bool, ...], int] = {}
+        cls = [sig.setdefault(tuple(c in s for s in sets), len(sig)) for c in range(_ANY + 1)]
+        ncls = len(sig) + 1   # + a classe sentinela do fim do texto (só leva ao estado morto)
+        members: List[List[int]] = [[] for _ in range(ncls)]
+        for c, k in enumerate(cls):
+            members[k].append(c)
+
+        def closure(states) -> FrozenSet[int]:
+            seen = set(states)
+            work = list(states)
+            while work:
+                for t in nfa.eps[work.pop()]:
+                    if t not in seen:
+                        seen.add(t)
+                        work.append(t)
+            # regra preguiçosa que já aceitou não continua
+            done = {accept[s] for s in seen if s in accept and lazy[accept[s]]}
+            if done:
+                seen = {s for s in seen if owner[s] not in done or s in accept}
+            return frozenset(seen)
+
+        def wins(S: FrozenSet[int]) -> int:
+            return min((accept[s] for s in S if s in accept), default=-1)
+
+        first = closure([start])
+        if wins(first) >= 0:
+            raise ValueError("algum padrão casa a string vazia")
+        ids: Dict[FrozenSet[int], int] = {first: 0}
+        order = [first]
+        moves: List[List[int]] = []
+        for S in order:
+            row = []
+            for k in range(ncls - 1):
+                c = members[k][0]
+                T = closure([t for s in S for chars, t in nfa.edges[s] if c in chars])
+                if not T:
+                    row.append(-1)
+                    continue
+                if T not in ids:
+                    ids[T] = len(order)
+                    order.append(T)
+                row.append(ids[T])
+            moves.append(row + [-1])
+
+        # numeração final: 0 = morto, depois os sem aceite, depois os de aceite
+        rule_of = [wins(S) for S in order]
+        final = sorted(range(len(order)), key=lambda d: (rule_of[d] >= 0, d))
+        num = {d: i + 1 for i, d in enumerate(final)}
+        nstates = len(order) + 1
+        self.ncls = ncls
+        self.nstates = nstates
+        self.start = num[0] * ncls
+        self.acc0 = (1 + sum(r < 0 for r in rule_of)) * ncls
+        trans = array('i' if nstates * ncls >= 2 ** 15 else 'h', [0]) * (nstates * ncls)
+        for d, row in enumerate(moves):
+            base = num[d] * ncls
+            for k, t in enumerate(row):
+                trans[base + k] = num[t] * ncls if t >= 0 else 0
+        self.trans = trans
+        # por estado (já multiplicado), o id do terminal aceito (-1: espaço/comentário)
+        kid = [-1] * (nstates * ncls)
+        for d, r in enumerate(rule_of):
+            if r >= 0:
+                kid[num[d] * ncls] = TERM_IDS.get(rules[r][0], -1)
+        self.kid = kid
+        # estados de aceite de regras que podem conter \n (só elas pedem contar linhas)
+        newline = ord("\n")
+        multiline = {r for r in range(len(rules))
+                     if any(newline in chars for s in range(len(owner)) if owner[s] == r
+                            for chars, _ in nfa.edges[s])}
+        self.multiline = [False] * (nstates * ncls)
+        for d, r in enumerate(rule_of):
+            if r in multiline:
+                self.multiline[num[d] * ncls] = True
+        self.rules = [name for name, _ in rules]
+
+        self.sentinel = bytes((ncls - 1,))
+        self.translate = {c: cls[c] for c in range(_ANY)}
+        self.other = chr(cls[_ANY])
+
+    def classes(self, text: str) -> bytes:
+        out = text.translate(self.translate)
+        if not text.isascii():
+            out = re.sub(r"[^\x00-\x7f]", self.other, out)
+        return out.encode("ascii") + self.sentinel
+
+
+_engine: Optional[DFAEngine] = None
+
+
+def engine() -> DFAEngine:
+    global _engine
+    if _engine is None:
+        _engine = DFAEngine()
+    return _engine
+
+
+class DFALexer:
+    def __init__(self, text: str):
+        self.text = text
+
+    def tokens(self):
+        E = engine()
+        text = self.text
+        cls = E.classes(text)
+        trans = E.trans
+        acc0 = E.acc0
+        start = E.start
+        kids = E.kid
+        multiline = E.multiline
+        keywords = E.keywords
+        id_kid = E.id_kid
+        names = TERMS
+        count = text.count
+        rfind = text.rfind
+        n = len(text)
+        pos = 0
+        line = 1
+        col = 1
+
+        while pos < n:
+            # maior casamento: anda até o estado morto
+            s = start
+            i = pos
+            while True:
+                t = trans[s + cls[i]]
+                if not t:
+                    break
+                s = t
+                i += 1
+            end = i
+            if s < acc0:
+                # parou num estado sem aceite ("1.", "/* ..." sem fim): volta
+                # ao último aceite, refazendo o caminho
+                s = start
+                i = pos
+                last = 0
+                end = -1
+                while True:
+                    s = trans[s + cls[i]]
+                    if not s:
+                        break
+                    i += 1
+                    if s >= acc0:
+                        last = s
+                        end = i
+                if end < 0:
+                    raise invalid_char_error(text, pos, line, col)
+                s = last
+
+            kid = kids[s]
+            start_line, start_col = line, col
+            nl = count("\n", pos, end) if multiline[s] else 0
+            if nl:
+                line += nl
+                col = end - rfind("\n", pos, end)
+            else:
+                col += end - pos
+
+            if kid >= 0:
+                lexeme = text[pos:end]
+                if kid == id_kid:
+                    kid = keywords.get(lexeme, id_kid)
+                yield Token(names[kid], lexeme, start_line, start_col, kid)
+            pos = end
+
+        yield Token('EOF', '', line, col, TERM_IDS['EOF'])
+
+
+def main():
+    from .lexer import Lexer, LexerError
+
+    ap = argparse.ArgumentParser(description="compara o lexer por DFA com o Lexer (regex): tokens e velocidade")
+    ap.add_argument("paths", nargs="+", help="arquivos .lbx")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale a melhor)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    E = engine()
+    print(f"DFA: {E.nstates} estados x {E.ncls} classes, {len(E.keywords)} palavras-chave, "
+          f"montado em {(time.perf_counter() - t0) * 1000:.1f} ms")
+    for path in args.paths:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        results = []
+        for lexer in (Lexer, DFALexer):
+            best = float("inf")
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                try:
+                    toks = list(lexer(text).tokens())
+                except LexerError as e:
+                    toks = str(e)
+                best = min(best, time.perf_counter() - t0)
+            results.append((toks, best))
+        (a, ta), (b, tb) = results
+        same = "idênticos" if a == b else "DIFERENTES"
+        ntok = len(a) if isinstance(a, list) else 0
+        print(f"{path}: {ntok} tokens, {same}; regex {ntok / ta / 1e6:.2f} Mtok/s, "
+              f"dfa {ntok / tb / 1e6:.2f} Mtok/s ({ta / tb:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
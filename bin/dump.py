@@ -0,0 +1,84 @@
+from .grammar import NONTERMS
+from .tokens import TERMS
+
+# Impressão de FIRST/FOLLOW e da tabela LL(1) (--dump-*). Fica fora do
+# main.py para só ser importado quando algum dump é pedido.
+
+TERMS_NO_EOF = [t for t in TERMS if t != "EOF"]
+
+
+def print_first_follow(FIRST, FOLLOW):
+    print("\nFIRST sets:")
+    for A in NONTERMS:
+        items = ", ".join(sorted(FIRST[A]))
+        print(f"  FIRST({A}) = {{ {items} }}")
+
+    print("\nFOLLOW sets:")
+    for A in NONTERMS:
+        items = ", ".join(sorted(FOLLOW[A]))
+        print(f"  FOLLOW({A}) = {{ {items} }}")
+
+
+def print_conflicts(conflicts):
+    if not conflicts:
+        print("\n✅ Sem conflitos: gramática OK para LL(1) (pelos terminais considerados).")
+        return
+    print("\n❌ *** CONFLITOS ENCONTRADOS (gramática NÃO é LL(1)): ***")
+    for (A, a, p1, p2) in conflicts:
+        rhs1 = " ".join(p1)
+        rhs2 = " ".join(p2)
+        print(f"  M[{A}, {a}]: {A} → {rhs1}   vs   {A} → {rhs2}")
+
+
+def print_table_list(TABLE):
+    print("\nTABELA LL(1) (lista):")
+    for A in NONTERMS:
+        row = TABLE.get(A, {})
+        if not row:
+            continue
+        print(f"\n{A}:")
+        for a in sorted(row.keys()):
+            rhs = " ".join(row[a])
+            print(f"  M[{A}, {a}] = {A} → {rhs}")
+
+
+def print_table_matrix(TABLE, *, max_cols=6, cell_w=34):
+    base_terms = list(TERMS_NO_EOF)
+
+    used_terms = set()
+    for A in NONTERMS:
+        used_terms.update(TABLE.get(A, {}).keys())
+
+    cols = [t for t in base_terms if t in used_terms]
+    if "EOF" in used_terms and "EOF" not in cols:
+        cols.append("EOF")
+
+    if not cols:
+        print("\nTABELA LL(1) (matriz):\n  (vazia) — nenhuma entrada foi gerada.")
+        return
+
+    def short_prod(A, prod):
+        rhs = " ".join(prod)
+        s = f"{A}→{rhs}"
+        if len(s) > cell_w - 1:
+            s = s[: cell_w - 2] + "…"
+        return s
+
+    print("\nTABELA LL(1) (matriz):")
+    for start in range(0, len(cols), max_cols):
+        chunk = cols[start : start + max_cols]
+        header = " " * 16 + "".join(f"{c:>{cell_w}s}" for c in chunk)
+        print("\n" + header)
+        print(" " * 16 + "-" * (cell_w * len(chunk)))
+
+        for A in NONTERMS:
+            row = TABLE.get(A, {})
+            if not row:
+                continue
+            if not any(c in row for c in chunk):
+                continue
+
+            line = f"{A:<16s}"
+            for c in chunk:
+                line += f"{short_prod(A, row[c]):>{cell_w}s}" if c in row else f"{'':>{cell_w}s}"
+            print(line)
@@ -1,82 +1,185 @@
-from typing import Dict, List, Set, Callable
+from typing import Dict, List, Set, FrozenSet, Tuple
 from .grammar import EPS
 
-def compute_first_follow(G, NONTERMS: List[str], TERMS: List[str], START_SYMBOL: str):
-    terms = [t for t in TERMS if t != 'EOF']
+# FIRST/FOLLOW com conjuntos representados como bitsets (int): cada terminal
+# ocupa um bit, mais um bit para EOF e outro para ε.
+#
+# Em vez de varrer a gramática inteira até nada mudar, as duas fases são
+# resolvidas como "F(x) = F'(x) ∪ ⋃ F(y) para x R y" sobre o grafo de
+# dependências entre não-terminais (algoritmo digraph de DeRemer & Pennello):
+# cada componente fortemente conexa é visitada uma vez, então o custo é linear
+# no tamanho da gramática (mais as operações de bitset).
+
+def _digraph(nodes: List[str], R: Dict[str, List[str]], F: Dict[str, int]) -> None:
+    # Versão iterativa (cadeias longas estourariam o limite de recursão).
+    # Atualiza F no lugar.
+    INF = len(nodes) + 1
+    N: Dict[str, int] = {x: 0 for x in nodes}
+    stack: List[str] = []
+    for root in nodes:
+        if N[root]:
+            continue
+        stack.append(root)
+        N[root] = len(stack)
+        work = [(root, len(stack), iter(R[root]))]
+        while work:
+            x, d, it = work[-1]
+            for y in it:
+                if N[y] == 0:
+                    stack.append(y)
+                    N[y] = len(stack)
+                    work.append((y, len(stack), iter(R[y])))
+                    break
+                if N[y] < N[x]:
+                    N[x] = N[y]
+                F[x] |= F[y]
+            else:
+                work.pop()
+                if N[x] == d:
+                    # x é raiz de uma componente: todos ficam com o mesmo conjunto
+                    while True:
+                        top = stack.pop()
+                        N[top] = INF
+                        F[top] = F[x]
+                        if top == x:
+                            break
+                if work:
+                    p = work[-1][0]
+                    if N[x] < N[p]:
+                        N[p] = N[x]
+                    F[p] |= F[x]
 
-    FIRST: Dict[str, Set[str]] = {A: set() for A in NONTERMS}
-    for t in terms:
-        FIRST[t] = {t}
-    FIRST[EPS] = {EPS}
-
-    def first_of_sequence(alpha: List[str]) -> Set[str]:
-        res: Set[str] = set()
-        if not alpha:
-            res.add(EPS)
-            return res
 
+def compute_first_follow(G, NONTERMS: List[str], TERMS: List[str], START_SYMBOL: str):
+    terms = [t for t in TERMS if t != 'EOF']
+    bit_names = terms + ['EOF', EPS]
+    bit = {name: 1 << i for i, name in enumerate(bit_names)}
+    EOF_BIT = bit['EOF']
+    EPS_BIT = bit[EPS]
+    nonterms = set(NONTERMS)
+
+    def names_of(b: int) -> Set[str]:
+        s = bin(b)[:1:-1]  # bit menos significativo primeiro
+        out: Set[str] = set()
+        i = s.find('1')
+        while i >= 0:
+            out.add(bit_names[i])
+            i = s.find('1', i + 1)
+        return out
+
+    prods: List[Tuple[str, List[str]]] = [(A, prod) for A in NONTERMS for prod in G[A]]
+
+    # 1) anuláveis: cada produção guarda quantos símbolos ainda impedem ε
+    nullable: Set[str] = set()
+    waiting: Dict[str, List[int]] = {A: [] for A in NONTERMS}
+    missing: List[int] = []
+    work: List[str] = []
+    for p, (A, prod) in enumerate(prods):
+        count = 0
+        for X in prod:
+            if X == EPS:
+                break
+            if X in nonterms:
+                waiting[X].append(p)
+                count += 1
+            else:  # terminal ou EOF: produção nunca deriva ε
+                count = -1
+                break
+        missing.append(count)
+        if count == 0 and A not in nullable:
+            nullable.add(A)
+            work.append(A)
+    while work:
+        B = work.pop()
+        for p in waiting[B]:
+            if missing[p] > 0:
+                missing[p] -= 1
+                if missing[p] == 0:
+                    A = prods[p][0]
+                    if A not in nullable:
+                        nullable.add(A)
+                        work.append(A)
+
+    # 2) FIRST: F'(A) = terminais no início das produções de A;
+    #    A R B quando B aparece depois de um prefixo anulável
+    first: Dict[str, int] = {A: 0 for A in NONTERMS}
+    R: Dict[str, List[str]] = {A: [] for A in NONTERMS}
+    for A, prod in prods:
+        for X in prod:
+            if X == EPS or X == 'EOF':
+                break
+            if X in nonterms:
+                R[A].append(X)
+                if X not in nullable:
+                    break
+            else:
+                first[A] |= bit[X]
+                break
+    _digraph(NONTERMS, R, first)
+    for A in nullable:
+        first[A] |= EPS_BIT
+
+    def first_bits(alpha) -> int:
+        # FIRST(α) já com FIRST dos não-terminais pronto; EOF encerra sem ε
+        res = 0
         for X in alpha:
             if X == EPS:
-                res.add(EPS)
-                return res
-
-            if X in terms:
-                res.add(X)
-                return res
-
-            if X == 'EOF':
-                return res
-
-            res.update(FIRST[X] - {EPS})
-
-            if EPS not in FIRST[X]:
+                return res | EPS_BIT
+            if X in nonterms:
+                f = first[X]
+                res |= f & ~EPS_BIT
+                if not f & EPS_BIT:
+                    return res
+            elif X == 'EOF':
                 return res
-
-        res.add(EPS)
-        return res
-
-    changed = True
-    while changed:
-        changed = False
-        for A in NONTERMS:
-            for prod in G[A]:
-                f = first_of_sequence(prod)
-                before = len(FIRST[A])
-                FIRST[A].update(f)
-                if len(FIRST[A]) != before:
-                    changed = True
-
-    FOLLOW: Dict[str, Set[str]] = {A: set() for A in NONTERMS}
-    FOLLOW[START_SYMBOL].add('EOF')
-
-    changed = True
-    while changed:
-        changed = False
-        for A in NONTERMS:
-            for prod in G[A]:
-                trailer = set(FOLLOW[A])
-                for X in reversed(prod):
-                    if X in NONTERMS:
-                        before = len(FOLLOW[X])
-                        FOLLOW[X].update(trailer)
-                        if len(FOLLOW[X]) != before:
-                            changed = True
-
-                        if EPS in FIRST[X]:
-                            trailer = trailer.union(FIRST[X] - {EPS})
-                        else:
-                            trailer = FIRST[X] - {EPS}
-
-                    elif X in terms:
-                        trailer = {X}
-
-                    elif X == EPS:
-                        continue
-
-                    elif X == 'EOF':
-                        trailer = {'EOF'}
-
-                    else:
-                        trailer = {X}
+            else:
+                return res | bit[X]
+        return res | EPS_BIT
+
+    # FIRST de cada produção: calculado uma vez e reaproveitado pela tabela
+    prod_first: Dict[Tuple[str, ...], FrozenSet[str]] = {}
+    for A, prod in prods:
+        key = tuple(prod)
+        if key not in prod_first:
+            prod_first[key] = frozenset(names_of(first_bits(prod)))
+
+    # 3) FOLLOW: F'(B) = FIRST do que vem depois de B;
+    #    B R A quando o sufixo depois de B é anulável (FOLLOW(A) ⊆ FOLLOW(B))
+    follow: Dict[str, int] = {A: 0 for A in NONTERMS}
+    follow[START_SYMBOL] |= EOF_BIT
+    R = {A: [] for A in NONTERMS}
+    for A, prod in prods:
+        trailer = 0
+        suffix_nullable = True
+        for X in reversed(prod):
+            if X in nonterms:
+                follow[X] |= trailer
+                if suffix_nullable and X != A:
+                    R[X].append(A)
+                f = first[X]
+                if f & EPS_BIT:
+                    trailer |= f & ~EPS_BIT
+                else:
+                    trailer = f & ~EPS_BIT
+                    suffix_nullable = False
+            elif X == EPS:
+                continue
+            else:
+                trailer = bit.get(X, 0)
+                suffix_nullable = False
+    _digraph(NONTERMS, R, follow)
+
+    FIRST: Dict[str, Set[str]] = {A: names_of(first[A]) for A in NONTERMS}
+    for t in terms:
+        FIRST[t] = {t}
+    FIRST[EPS] = {EPS}
+    FOLLOW: Dict[str, Set[str]] = {A: names_of(follow[A]) for A in NONTERMS}
+
+    def first_of_sequence(alpha: List[str]) -> FrozenSet[str]:
+        key = tuple(alpha)
+        f = prod_first.get(key)
+        if f is None:
+            f = prod_first[key] = frozenset(names_of(first_bits(alpha)))
+        return f
 
     return FIRST, FOLLOW, first_of_sequence
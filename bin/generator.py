@@ -0,0 +1,346 @@
+import argparse
+import bisect
+import json
+import random
+import re
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .compiled import CompiledGrammar
+from .lexer import TOKEN_SPECS
+
+# Gerador de programas .lbx aleatórios a partir da gramática, para testes de
+# carga e de escala:
+#
+#   python -m bin.generator --size 1G --seed 7 --shape deep-blocks -o grande.lbx
+#   python -m bin.generator --tokens 100000 --error-every 5000 --error-log erros.jsonl
+#
+# Anda em G a partir do símbolo inicial com uma pilha explícita (como o
+# parser), escolhendo produções por peso (o `shape`). Quando o tamanho pedido
+# é atingido, ou a profundidade passa de max_depth, passa a escolher sempre a
+# produção de menor derivação (em tokens), o que fecha o programa rápido. Listas
+# e *Tail (A → α A) contam como laço, não como aninhamento, e a pilha não cresce
+# com o tamanho do programa: a saída sai em streaming com memória limitada.
+#
+# Erros: antes do token escolhido, insere um terminal que o parser LL(1)
+# rejeitaria ali (simulando a tabela sobre os tokens já gerados). A posição
+# (índice do token, linha, coluna) de cada erro inserido é registrada.
+
+# IDs nunca começam com o prefixo de uma palavra-chave ("do", "if", ...): o
+# lexer não exige fronteira de palavra e "done" viraria FACA + ID.
+_ID_LETTERS = "xyzaghkmnpqu"
+
+# pesos por produção (texto de CompiledGrammar.fmt_prod); o que não aparece vale 1
+_EXPR_TAILS = {
+    "OrTail → ε": 12, "AndTail → ε": 10, "EqTail → ε": 8, "RelTail → ε": 12,
+    "AddTail → ε": 5, "MulTail → ε": 8, "PrimaryTail → ε": 6,
+    "Primary → DELIM_ABREP Expr DELIM_FECHAP": 0.3, "UnaryExpr → OP_NAO UnaryExpr": 0.1,
+    "UnaryExpr → Primary": 3, "ArgListTail → ε": 2, "ParamListTail → ε": 2,
+}
+
+SHAPES: Dict[str, Dict[str, float]] = {
+    "mixed": dict(_EXPR_TAILS, **{
+        "StmtList → ε": 1.5, "Statement → Block": 0.3,
+    }),
+    "deep-blocks": dict(_EXPR_TAILS, **{
+        "Statement → Block": 12, "Statement → WhileStmt": 3, "Statement → IfStmt": 3,
+        "StmtList → ε": 0.3, "Statement → DeclOrFunc": 0.2, "Statement → FunctionDeclVoid": 0,
+    }),
+    "long-stmtlist": dict(_EXPR_TAILS, **{
+        "Statement → Block": 0, "Statement → IfStmt": 0, "Statement → WhileStmt": 0,
+        "Statement → DoWhileStmt": 0, "Statement → ForStmt": 0, "Statement → FunctionDeclVoid": 0,
+        "DeclOrFuncTail → DELIM_ABREP ParamListOpt DELIM_FECHAP Block": 0,
+    }),
+    "long-expr": {
+        "OrTail → ε": 0.05, "AndTail → ε": 0.05, "EqTail → ε": 0.1, "RelTail → ε": 0.2,
+        "AddTail → ε": 0.05, "MulTail → ε": 0.05, "PrimaryTail → ε": 6,
+        "Primary → DELIM_ABREP Expr DELIM_FECHAP": 0, "UnaryExpr → Primary": 5,
+        "Statement → Block": 0, "Statement → FunctionDeclVoid": 0,
+    },
+    "many-funcs": dict(_EXPR_TAILS, **{
+        "Statement → DeclOrFunc": 6, "Statement → FunctionDeclVoid": 6,
+        "DeclOrFuncTail → DELIM_ABREP ParamListOpt DELIM_FECHAP Block": 4,
+        "StmtList → ε": 2, "Statement → Block": 0.2,
+    }),
+}
+
+# terminais com lexema variável, gerados em lexeme()
+_GENERATED = ("ID", "INT_LIT", "FLOAT_LIT", "STRING", "CHAR_LIT")
+
+# quebra de linha depois destes terminais (só para a saída ficar legível)
+_NEWLINE_AFTER = {"DELIM_PONTOVIR", "DELIM_ABRECHAVE", "DELIM_FECHACHAVE"}
+
+
+def parse_size(s: str) -> int:
+    # "64K", "1M", "2G" -> bytes
+    mult = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    s = s.strip().upper()
+    if s and s[-1] in mult:
+        return int(float(s[:-1]) * mult[s[-1]])
+    return int(s)
+
+
+def _literal_choices(pattern: str) -> Optional[List[str]]:
+    # r'\{' -> ['{'], r'int|real' -> ['int', 'real']; None se não for literal
+    alts = re.split(r"(?<!\\)\|", pattern)
+    out = []
+    for alt in alts:
+        if re.search(r"(?<!\\)[\[\]()*+?.^$]", alt):
+            return None
+        out.append(re.sub(r"\\(.)", r"\1", alt))
+    return out
+
+
+class ProgramGenerator:
+    def __init__(self, grammar: CompiledGrammar, seed: Optional[int] = None,
+                 shape: str = "mixed", max_depth: int = 40):
+        if shape not in SHAPES:
+            raise ValueError(f"shape desconhecido: {shape!r} (opções: {', '.join(SHAPES)})")
+        self.grammar = grammar
+        self.rng = random.Random(seed)
+        self.max_depth = max_depth
+        g = grammar
+        T = g.nterms
+
+        weights = SHAPES[shape]
+        known = {g.fmt_prod(p) for p in range(len(g.prods))}
+        unknown = set(weights) - known
+        if unknown:
+            raise ValueError(f"produções desconhecidas no shape {shape!r}: {sorted(unknown)}")
+
+        # menor número de tokens derivável por símbolo, e a produção que o atinge
+        # (só troca em melhora estrita, então seguir min_prod sempre termina)
+        INF = float("inf")
+        minlen = [1] * T + [INF] * len(g.nonterms)
+        minlen[g.eof] = 0
+        self.min_prod = [-1] * len(g.names)
+        changed = True
+        while changed:
+            changed = False
+            for p, (A, rhs) in enumerate(g.prods):
+                n = sum(minlen[X] for X in rhs)
+                if n < minlen[A]:
+                    minlen[A] = n
+                    self.min_prod[A] = p
+                    changed = True
+
+        # escolha ponderada: (produções, pesos acumulados), com e sem as de ε
+        self._choices: Dict[int, Tuple[List[int], List[float]]] = {}
+        self._choices_nonempty: Dict[int, Tuple[List[int], List[float]]] = {}
+        by_lhs: Dict[int, List[int]] = {}
+        for p, (A, _) in enumerate(g.prods):
+            by_lhs.setdefault(A, []).append(p)
+        for A, ps in by_lhs.items():
+            w = [float(weights.get(g.fmt_prod(p), 1.0)) for p in ps]
+            self._choices[A] = self._cumulative(ps, w, A)
+            ne = [(p, x) for p, x in zip(ps, w) if g.prods[p][1]]
+            if ne and len(ne) < len(ps):
+                self._choices_nonempty[A] = self._cumulative([p for p, _ in ne], [x for _, x in ne], A)
+
+        # lexemas por terminal
+        self._fixed: Dict[int, List[str]] = {}
+        for name, pattern in TOKEN_SPECS:
+            if name in g.ids and g.ids[name] < T:
+                choices = _literal_choices(pattern)
+                if choices is not None:
+                    self._fixed[g.ids[name]] = choices
+        self._newline = {g.ids[n] for n in _NEWLINE_AFTER if n in g.ids}
+        # lexema fixo de um só valor ("{", "while", ...) ou None
+        self._fixed1 = [None] * T
+        for k, choices in self._fixed.items():
+            if len(choices) == 1:
+                self._fixed1[k] = choices[0]
+        # produção única (sem sorteio) ou -1
+        self._single = [-1] * len(g.names)
+        for A, ps in by_lhs.items():
+            if len(ps) == 1:
+                self._single[A] = ps[0]
+        # o que empilhar por produção: rhs invertido, cada símbolo com o
+        # acréscimo de profundidade nos 16 bits de cima (0 no A de A → α A)
+        self._push = []
+        for A, rhs in g.prods:
+            last = len(rhs) - 1
+            self._push.append(tuple(
+                Y | ((0 if n == last and Y == A else 1) << 16) for n, Y in reversed(list(enumerate(rhs)))
+            ))
+        # terminais que o lexer consegue produzir (candidatos a erro inserido)
+        self._lexable = sorted(set(self._fixed) | {g.ids[n] for n in _GENERATED if n in g.ids})
+
+    def _cumulative(self, ps: List[int], w: List[float], A: int) -> Tuple[List[int], List[float]]:
+        if sum(w) <= 0:
+            # shape zerou tudo: volta para a produção mínima
+            return [self.min_prod[A]], [1.0]
+        acc, total = [], 0.0
+        for x in w:
+            total += x
+            acc.append(total)
+        return ps, acc
+
+    def lexeme(self, kid: int) -> str:
+        rng = self.rng
+        fixed = self._fixed.get(kid)
+        if fixed is not None:
+            return fixed[0] if len(fixed) == 1 else rng.choice(fixed)
+        name = self.grammar.names[kid]
+        if name == "ID":
+            return f"{rng.choice(_ID_LETTERS)}{rng.randrange(1000)}"
+        if name == "INT_LIT":
+            return str(rng.randrange(10000))
+        if name == "FLOAT_LIT":
+            return f"{rng.randrange(1000)}.{rng.randrange(100)}"
+        if name == "STRING":
+            return f'"s{rng.randrange(1000)}"'
+        if name == "CHAR_LIT":
+            return f"'{rng.choice('abcxyz0123')}'"
+        raise ValueError(f"não sei gerar lexema para {name}")
+
+    # Terminais que o parser aceitaria como próximo token, dado o estado `pstack`
+    def _viable(self, pstack: List[int], k: int) -> bool:
+        g = self.grammar
+        T = g.nterms
+        stack = list(pstack)
+        while stack:
+            X = stack.pop()
+            if X < T:
+                return X == k
+            p = g.table[(X - T) * T + k]
+            if p < 0:
+                return False
+            stack.extend(g.rprods[p])
+        return False
+
+    def generate(self, tokens: Optional[int] = None, size: Optional[int] = None,
+                 error_at: Iterable[int] = (), error_every: int = 0,
+                 on_error: Optional[Callable[[Dict[str, object]], None]] = None) -> Iterator[str]:
+        # Gera o texto em pedaços. `tokens`/`size` (bytes) limitam o tamanho;
+        # cada erro inserido é passado a `on_error` assim que sai (para
+        # juntá-los numa lista: on_error=erros.append).
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table, rprods = g.table, g.rprods
+        names = g.names
+        rng = self.rng.random
+        bisect_right = bisect.bisect_right
+        max_depth = self.max_depth
+        min_prod, single, push = self.min_prod, self._single, self._push
+        choices, nonempty = self._choices, self._choices_nonempty
+        fixed1, newline = self._fixed1, self._newline
+        error_at = sorted(set(error_at), reverse=True)
+        inject = bool(error_at) or error_every > 0
+
+        ntok = nbytes = 0
+        line, col = 1, 1
+        finishing = tokens is not None and tokens <= 0 or size is not None and size <= 0
+
+        # pilha de (símbolo | profundidade << 16), como no parser
+        stack = [g.start]
+        pop = stack.pop
+        pstack = [eof, g.start]
+        while stack:
+            v = pop()
+            X = v & 0xFFFF
+            if X >= T:
+                d = v >> 16
+                if finishing or d >= max_depth:
+                    p = min_prod[X]
+                else:
+                    p = single[X]
+                    if p < 0:
+                        # a lista do nível de fora só termina quando o tamanho é atingido
+                        ps, acc = d <= 1 and nonempty.get(X) or choices[X]
+                        p = ps[bisect_right(acc, rng() * acc[-1])]
+                tmpl = push[p]
+                if tmpl:
+                    base = d << 16
+                    stack.extend([e + base for e in tmpl])
+                continue
+            if X == eof:
+                return
+
+            if inject and (error_at and error_at[-1] == ntok or error_every and ntok and ntok % error_every == 0):
+                if error_at and error_at[-1] == ntok:
+                    error_at.pop()
+                bad = [t for t in self._lexable if not self._viable(pstack, t)]
+                t = self.rng.choice(bad)
+                text = self.lexeme(t)
+                if on_error is not None:
+                    on_error({"token": ntok, "line": line, "col": col, "kind": names[t],
+                                   "expected": names[X]})
+                yield text + " "
+                ntok += 1
+                nbytes += len(text) + 1
+                col += len(text) + 1
+
+            text = fixed1[X] or self.lexeme(X)
+            if X in newline:
+                yield text + "\n"
+                line, col = line + 1, 1
+            else:
+                yield text + " "
+                col += len(text) + 1
+            ntok += 1
+            nbytes += len(text) + 1
+            if not finishing:
+                finishing = tokens is not None and ntok >= tokens or size is not None and nbytes >= size
+
+            if inject:
+                # o parser simulado segue só os tokens válidos
+                while True:
+                    Y = pstack.pop()
+                    if Y < T:
+                        break
+                    pstack.extend(rprods[table[(Y - T) * T + X]])
+
+    def write(self, out: TextIO, chunk: int = 1 << 16, **kwargs) -> int:
+        buf: List[str] = []
+        n = written = 0
+        for piece in self.generate(**kwargs):
+            buf.append(piece)
+            n += len(piece)
+            if n >= chunk:
+                out.write("".join(buf))
+                written += n
+                buf.clear()
+                n = 0
+        out.write("".join(buf))
+        return written + n
+
+
+def main():
+    from .artifact import load_artifact
+
+    ap = argparse.ArgumentParser(description="gera programas .lbx aleatórios a partir da gramática")
+    ap.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--shape", choices=sorted(SHAPES), default="mixed",
+                    help="formato do programa (pesos das produções)")
+    ap.add_argument("--tokens", type=int, help="tamanho aproximado em tokens")
+    ap.add_argument("--size", help="tamanho aproximado em bytes (sufixos K, M, G)")
+    ap.add_argument("--max-depth", type=int, default=40,
+                    help="profundidade máxima na árvore de derivação (listas contam como laço)")
+    ap.add_argument("--error-at", type=int, nargs="*", default=[], help="índices de token onde inserir um erro")
+    ap.add_argument("--error-every", type=int, default=0, help="insere um erro a cada N tokens")
+    ap.add_argument("--error-log", help="grava as posições dos erros inseridos (JSON Lines)")
+    args = ap.parse_args()
+
+    if args.tokens is None and args.size is None:
+        args.tokens = 1000
+
+    gen = ProgramGenerator(load_artifact()["grammar"], args.seed, args.shape, args.max_depth)
+    # o log é gravado durante a geração: nada se acumula em memória
+    log = open(args.error_log, "w", encoding="utf-8") if args.error_log else None
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        gen.write(out, tokens=args.tokens, size=parse_size(args.size) if args.size else None,
+                  error_at=args.error_at, error_every=args.error_every,
+                  on_error=(lambda e: log.write(json.dumps(e) + "\n")) if log else None)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if log is not None:
+            log.close()
+
+
+if __name__ == "__main__":
+    main()
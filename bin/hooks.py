@@ -0,0 +1,101 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .compiled import CompiledGrammar
+
+# Ações semânticas durante o parse: LL1Parser(grammar).parse(tokens, hooks=hooks).
+#
+#   hooks = Hooks().on_enter("Block", abre).at("DeclOrFunc", 2, declara).on_token("ID", usa)
+#
+# A callback recebe o último token casado (None se nenhum ainda). Cada ação
+# vira um símbolo da gramática, tratado pelo parser no mesmo `if p < 0` do erro.
+
+ACTION = -3   # tabela: ACTION - a dispara a ação a (-1 é erro, -2 é o PRATT)
+END = -1      # posição de on_exit: depois do último símbolo
+
+Callback = Callable[[object], None]
+
+
+class Hooks:
+    def __init__(self):
+        # (não-terminal, lado direito ou None, posição, callback); terminal: (None, termo, None, callback)
+        self._rules: List[Tuple[Optional[str], Optional[Tuple[str, ...]], Optional[int], Callback]] = []
+        self.grammar: Optional[CompiledGrammar] = None
+        self.table: Optional[array] = None
+        self.rprods: List[Tuple[int, ...]] = []
+        self.actions: List[Callback] = []
+
+    # depois do `pos`-ésimo símbolo das produções de A (0 = ao expandir,
+    # END = no fim); `rhs` escolhe uma produção pelos símbolos do lado direito
+    def at(self, A: str, pos: int, fn: Callback, rhs: Optional[Tuple[str, ...]] = None) -> "Hooks":
+        self._rules.append((A, tuple(rhs) if rhs is not None else None, pos, fn))
+        self.grammar = None
+        return self
+
+    def on_enter(self, A: str, fn: Callback, rhs: Optional[Tuple[str, ...]] = None) -> "Hooks":
+        return self.at(A, 0, fn, rhs)
+
+    def on_exit(self, A: str, fn: Callback, rhs: Optional[Tuple[str, ...]] = None) -> "Hooks":
+        return self.at(A, END, fn, rhs)
+
+    def on_token(self, term: str, fn: Callback) -> "Hooks":
+        self._rules.append((None, (term,), None, fn))
+        self.grammar = None
+        return self
+
+    # Monta a tabela e os lados direitos com os símbolos de ação
+    def bind(self, g: CompiledGrammar) -> None:
+        if self.grammar is g:
+            return
+        T = g.nterms
+        first_action = len(g.names)
+        # ações por produção e posição, na ordem de registro
+        slots: Dict[Tuple[int, int], List[int]] = {}
+        actions: List[Callback] = []
+
+        def add(p: int, pos: int, fn: Callback) -> None:
+            slots.setdefault((p, pos), []).append(first_action + len(actions))
+            actions.append(fn)
+
+        for A, rhs, pos, fn in self._rules:
+            if A is None:
+                t = rhs[0]
+                if t not in g.ids or g.ids[t] >= T:
+                    raise ValueError(f"terminal desconhecido: {t!r}")
+                for p, (_, body) in enumerate(g.prods):
+                    for i, X in enumerate(body):
+                        if X == g.ids[t]:
+                            add(p, i + 1, fn)
+                continue
+            if A not in g.ids or g.ids[A] < T:
+                raise ValueError(f"não-terminal desconhecido: {A!r}")
+            want = tuple(g.ids.get(s, -1) for s in rhs) if rhs is not None else None
+            found = False
+            for p, (lhs, body) in enumerate(g.prods):
+                if lhs != g.ids[A] or (want is not None and body != want):
+                    continue
+                at = len(body) if pos == END else pos
+                if not 0 <= at <= len(body):
+                    raise ValueError(f"posição {pos} fora da produção {g.fmt_prod(p)}")
+                add(p, at, fn)
+                found = True
+            if not found:
+                raise ValueError(f"produção não encontrada: {A} → {' '.join(rhs or ())}")
+
+        rprods = list(g.rprods)
+        for p in {p for p, _ in slots}:
+            body = g.prods[p][1]
+            seq: List[int] = []
+            for i in range(len(body) + 1):
+                seq.extend(slots.get((p, i), ()))
+                if i < len(body):
+                    seq.append(body[i])
+            rprods[p] = tuple(reversed(seq))
+
+        table = array('h' if len(g.prods) < 2 ** 15 and len(actions) < 2 ** 15 - 3 else 'i', g.table)
+        for a in range(len(actions)):
+            table.extend([ACTION - a] * T)
+        self.table = table
+        self.rprods = rprods
+        self.actions = actions
+        self.grammar = g
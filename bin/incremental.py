@@ -0,0 +1,262 @@
+from itertools import chain
+from typing import List, Optional, Tuple
+
+from .compiled import CompiledGrammar
+from .lexer import MASTER_RE, _GROUP_KID, LexerError, invalid_char_error
+from .parser import syntax_error
+from .tokens import Token, TERM_IDS
+
+# Re-análise incremental para editores: a cada edição (offset, tamanho
+# removido, texto inserido) só o trecho afetado é re-lexado e o parser retoma
+# de uma pilha salva, em vez de recomeçar do offset 0.
+#
+#   inc = IncrementalParse(grammar, texto)
+#   ok, erro = inc.edit(120, 3, "while")
+#
+# Os tokens ficam num gap buffer: `_before` guarda, em ordem, os tokens antes
+# do gap com offsets absolutos; `_after` guarda os tokens depois do gap em
+# ordem inversa (o próximo é _after[-1]) com offsets medidos a partir do FIM do
+# texto, então uma edição antes deles não muda nada neles. Linha/coluna são
+# calculadas só quando alguém pede (mensagem de erro, tokens()).
+#
+# Re-lex: recomeça no fim do último token que termina a LOOKAHEAD caracteres
+# antes da edição e para quando, já depois do texto inserido, um token novo
+# começa exatamente onde começava um antigo; dali em diante o texto é o mesmo,
+# então os tokens também são.
+#
+# Re-parse: a cada CHECKPOINT_EVERY tokens o parser guarda no token a pilha
+# (antes de consumi-lo). Ele retoma do último checkpoint antes da edição e,
+# passado o trecho re-lexado, para assim que a pilha coincide com a de um
+# checkpoint antigo: o resto do parse seria idêntico ao anterior.
+#
+# O custo de uma edição fica proporcional ao tamanho da edição (mais
+# CHECKPOINT_EVERY tokens e a profundidade da pilha), não ao do arquivo. A
+# exceção é montar a nova string, que é uma cópia em C do texto inteiro.
+
+CHECKPOINT_EVERY = 32
+
+# Quantos caracteres depois do fim de um token o MASTER_RE pode ter olhado
+# para decidir esse token ("12.x": INT_LIT olhou '.' e 'x')
+LOOKAHEAD = 2
+
+_BEFORE, _AFTER, _DEAD = 0, 1, 2
+
+_OP_DIV = TERM_IDS['OP_DIV']
+_OP_MULTI = TERM_IDS['OP_MULTI']
+
+
+class _Entry:
+    __slots__ = ('kid', 'start', 'end', 'side', 'ckpt')
+
+    def __init__(self, kid: int, start: int, end: int, side: int = _BEFORE):
+        self.kid = kid
+        self.start = start
+        self.end = end
+        self.side = side
+        self.ckpt: Optional[Tuple[int, ...]] = None
+
+
+def _line_col(text: str, pos: int) -> Tuple[int, int]:
+    line = text.count('\n', 0, pos) + 1
+    return line, pos - (text.rfind('\n', 0, pos) + 1) + 1
+
+
+class IncrementalParse:
+    def __init__(self, grammar: CompiledGrammar, text: str):
+        self.grammar = grammar
+        self.text = text
+        # quanto a última edição re-lexou / re-parseou (em tokens)
+        self.relexed = 0
+        self.reparsed = 0
+        self._rebuild()
+
+    # ----- estado -----
+
+    def _rebuild(self) -> None:
+        eof = _Entry(self.grammar.eof, 0, 0, _AFTER)
+        self._before: List[_Entry] = []
+        self._after: List[_Entry] = [eof]
+        # "/" seguido de "*" colados: um "*/" inserido depois pode transformar
+        # tudo num comentário, então o re-lex precisa recomeçar antes deles
+        self._dangling = set()
+        self._lex_error: Optional[LexerError] = None
+        self._error: Optional[Tuple[_Entry, int]] = None
+        self._frontier: Optional[_Entry] = None
+        try:
+            self.relexed = self._lex(0, len(self.text) + 1)
+        except LexerError as e:
+            self._lex_error = e
+            return
+        self.reparsed = self._parse(0, [self.grammar.eof, self.grammar.start])
+
+    def _abs(self, e: _Entry, pos: int) -> int:
+        return len(self.text) - pos if e.side == _AFTER else pos
+
+    def _drop(self, e: _Entry) -> None:
+        e.side = _DEAD
+        self._dangling.discard(e)
+
+    def _to_after(self, n: int) -> None:
+        e = self._before.pop()
+        e.start, e.end, e.side = n - e.start, n - e.end, _AFTER
+        self._after.append(e)
+
+    def _to_before(self, n: int) -> None:
+        e = self._after.pop()
+        e.start, e.end, e.side = n - e.start, n - e.end, _BEFORE
+        self._before.append(e)
+
+    # ----- API -----
+
+    def edit(self, offset: int, removed: int, inserted: str) -> Tuple[bool, Optional[Exception]]:
+        old = self.text
+        n = len(old)
+        if offset < 0 or removed < 0 or offset + removed > n:
+            raise ValueError(f"edição fora do texto: offset={offset}, removido={removed}, tamanho={n}")
+        self.text = old[:offset] + inserted + old[offset + removed:]
+
+        if self._lex_error is not None:
+            # sem tokens confiáveis: recomeça do zero
+            self._rebuild()
+            return self.result()
+
+        before, after = self._before, self._after
+
+        # 1) gap no ponto de reinício do lexer
+        target = offset - LOOKAHEAD
+        for d in self._dangling:
+            s = d.start if d.side == _BEFORE else n - d.start
+            if s < offset and s < target:
+                target = s
+        while before and before[-1].end > target:
+            self._to_after(n)
+        while len(after) > 1 and n - after[-1].end <= target:
+            self._to_before(n)
+
+        # 2) tokens que encostam no trecho editado não valem mais
+        cut = offset + removed
+        while len(after) > 1 and n - after[-1].start < cut:
+            self._drop(after.pop())
+
+        # 3) re-lex até ressincronizar
+        restart = before[-1].end if before else 0
+        first_new = len(before)
+        try:
+            self.relexed = self._lex(restart, offset + len(inserted))
+        except LexerError as e:
+            self._lex_error = e
+            self.reparsed = 0
+            return self.result()
+
+        # 4) re-parse
+        F = self._frontier
+        if F is not None and F.side == _BEFORE and F.start < restart:
+            # o erro anterior está antes de tudo que mudou: continua igual
+            self.reparsed = 0
+            return self.result()
+        i = first_new - 1
+        while i >= 0 and before[i].ckpt is None:
+            i -= 1
+        if i < 0:
+            self.reparsed = self._parse(0, [self.grammar.eof, self.grammar.start])
+        else:
+            self.reparsed = self._parse(i, list(before[i].ckpt))
+        return self.result()
+
+    def result(self) -> Tuple[bool, Optional[Exception]]:
+        if self._lex_error is not None:
+            return False, self._lex_error
+        if self._error is None:
+            return True, None
+        look, X = self._error
+        return False, syntax_error(self.grammar, X, self._token(look))
+
+    def tokens(self) -> List[Token]:
+        if self._lex_error is not None:
+            raise self._lex_error
+        text = self.text
+        names = self.grammar.names
+        out: List[Token] = []
+        line, pos = 1, 0
+        for e in chain(self._before, reversed(self._after)):
+            s, t = self._abs(e, e.start), self._abs(e, e.end)
+            line += text.count('\n', pos, s)
+            out.append(Token(names[e.kid], text[s:t], line, s - text.rfind('\n', 0, s), e.kid))
+            pos = s
+        return out
+
+    def _token(self, e: _Entry) -> Token:
+        s, t = self._abs(e, e.start), self._abs(e, e.end)
+        line, col = _line_col(self.text, s)
+        return Token(self.grammar.names[e.kid], self.text[s:t], line, col, e.kid)
+
+    # ----- lexer -----
+
+    def _lex(self, pos: int, sync_from: int) -> int:
+        text = self.text
+        n = len(text)
+        match = MASTER_RE.match
+        kids = _GROUP_KID
+        before, after = self._before, self._after
+        count = 0
+        while pos < n:
+            m = match(text, pos)
+            if not m:
+                raise invalid_char_error(text, pos, *_line_col(text, pos))
+            kid = kids[m.lastindex]
+            s = pos
+            pos = m.end()
+            if kid < 0:
+                continue
+            # tokens antigos que o texto novo já passou
+            while len(after) > 1 and n - after[-1].start < s:
+                self._drop(after.pop())
+            if s >= sync_from and len(after) > 1 and n - after[-1].start == s:
+                return count
+            if kid == _OP_MULTI and before and before[-1].kid == _OP_DIV and before[-1].end == s:
+                self._dangling.add(before[-1])
+            before.append(_Entry(kid, s, pos))
+            count += 1
+        while len(after) > 1:
+            self._drop(after.pop())
+        return count
+
+    # ----- parser -----
+
+    def _parse(self, i: int, stack: List[int]) -> int:
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table = g.table
+        rprods = g.rprods
+        every = CHECKPOINT_EVERY
+
+        # checkpoints antigos só valem até onde o parse anterior chegou
+        F = self._frontier
+        limit = F.start if F is not None and F.side == _AFTER else None
+
+        n = 0
+        for look in chain(self._before[i:], reversed(self._after)):
+            if limit is not None and look.side == _AFTER and look.start >= limit:
+                old = look.ckpt
+                if old is not None and len(old) == len(stack) and tuple(stack) == old:
+                    return n
+            look.ckpt = tuple(stack) if n % every == 0 else None
+            n += 1
+            k = look.kid
+            while True:
+                X = stack.pop()
+                if X < T:
+                    if X != k:
+                        self._error, self._frontier = (look, X), look
+                        return n
+                    if X == eof:
+                        self._error, self._frontier = None, look
+                        return n
+                    break
+                p = table[(X - T) * T + k]
+                if p < 0:
+                    self._error, self._frontier = (look, X), look
+                    return n
+                stack.extend(rprods[p])
+        return n
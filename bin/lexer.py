@@ -1,5 +1,5 @@
 import re
-from .tokens import Token  # Token(kind, lexeme, line, col)
+from .tokens import Token, TERM_IDS  # Token(kind, lexeme, line, col, kid)
 
 # A ordem é importante!
 TOKEN_SPECS = [
@@ -63,6 +63,23 @@ TOKEN_SPECS = [
 # DOTALL permite que o comentário de bloco atravesse linhas
 MASTER_RE = re.compile('|'.join(f'(?P<{n}>{p})' for n, p in TOKEN_SPECS), re.DOTALL)
 
+# índice do grupo (m.lastindex) -> id do terminal; espaços/comentários ficam com -1
+_GROUP_KID = [-1] * (MASTER_RE.groups + 1)
+for _name, _idx in MASTER_RE.groupindex.items():
+    _GROUP_KID[_idx] = TERM_IDS.get(_name, -1)
+
+class LexerError(SyntaxError):
+    def __init__(self, message: str, line: int, col: int):
+        super().__init__(message)
+        self.line = line
+        self.col = col
+
+
+def invalid_char_error(text: str, pos: int, line: int, col: int) -> LexerError:
+    snippet = text[pos:pos+20].replace('\n', '\\n')
+    return LexerError(f"Caractere inválido em {line}:{col} perto de '{snippet}'", line, col)
+
+
 class Lexer:
     def __init__(self, text: str):
         self.text = text
@@ -76,10 +93,9 @@ class Lexer:
         while pos < len(text):
             m = MASTER_RE.match(text, pos)
             if not m:
-                snippet = text[pos:pos+20].replace('\n', '\\n')
-                raise SyntaxError(f"Caractere inválido em {line}:{col} perto de '{snippet}'")
+                raise invalid_char_error(text, pos, line, col)
 
-            kind = m.lastgroup
+            kid = _GROUP_KID[m.lastindex]
             lexeme = m.group()
             start_line, start_col = line, col
 
@@ -94,9 +110,9 @@ class Lexer:
             pos = m.end()
 
             # ignora espaços/comentários
-            if kind in ('WS', 'COMENTARIO', 'BLOQCOMENTARIO'):
+            if kid < 0:
                 continue
 
-            yield Token(kind, lexeme, start_line, start_col)
+            yield Token(m.lastgroup, lexeme, start_line, start_col, kid)
 
-        yield Token('EOF', '', line, col)
+        yield Token('EOF', '', line, col, TERM_IDS['EOF'])
@@ -1,12 +1,12 @@
 import argparse
-import shutil
+import os
+import sys
+from contextlib import ExitStack, nullcontext
+from itertools import chain, islice
 
 from .lexer import Lexer
-from .tokens import TERMS
-from .grammar import G, NONTERMS, START_SYMBOL
-from .first_follow import compute_first_follow
-from .table import build_ll1_table
-from .parser import LL1Parser, ParserError
+from .artifact import load_artifact, artifact_path, grammar_fingerprint
+from .parser import LL1Parser, ParserError, TraceRecorder, TRACE_MODES
 
 
 EXAMPLE_OK = """
@@ -25,98 +25,20 @@ int x;
 if (x >) x = 1; // erro: expressão incompleta
 """
 
-TERMS_NO_EOF = [t for t in TERMS if t != "EOF"]
-
-
-def is_terminal(sym: str) -> bool:
-    return sym == "EOF" or sym in TERMS_NO_EOF
-
-
-def is_nonterminal(sym: str) -> bool:
-    return sym in NONTERMS
+# Saída em blocos: um write por bloco de linhas em vez de um print por linha
+def write_lines(lines, chunk=4096):
+    write = sys.stdout.write
+    it = iter(lines)
+    while True:
+        block = list(islice(it, chunk))
+        if not block:
+            return
+        block.append("")
+        write("\n".join(block))
 
 
 def print_tokens(toks):
-    print("TOKENS:")
-    for t in toks:
-        print(f"  Token({t.kind}, '{t.lexeme}', {t.line}:{t.col})")
-
-
-def print_first_follow(FIRST, FOLLOW):
-    print("\nFIRST sets:")
-    for A in NONTERMS:
-        items = ", ".join(sorted(FIRST[A]))
-        print(f"  FIRST({A}) = {{ {items} }}")
-
-    print("\nFOLLOW sets:")
-    for A in NONTERMS:
-        items = ", ".join(sorted(FOLLOW[A]))
-        print(f"  FOLLOW({A}) = {{ {items} }}")
-
-
-def print_conflicts(conflicts):
-    if not conflicts:
-        print("\n✅ Sem conflitos: gramática OK para LL(1) (pelos terminais considerados).")
-        return
-    print("\n❌ *** CONFLITOS ENCONTRADOS (gramática NÃO é LL(1)): ***")
-    for (A, a, p1, p2) in conflicts:
-        rhs1 = " ".join(p1)
-        rhs2 = " ".join(p2)
-        print(f"  M[{A}, {a}]: {A} → {rhs1}   vs   {A} → {rhs2}")
-
-
-def print_table_list(TABLE):
-    print("\nTABELA LL(1) (lista):")
-    for A in NONTERMS:
-        row = TABLE.get(A, {})
-        if not row:
-            continue
-        print(f"\n{A}:")
-        for a in sorted(row.keys()):
-            rhs = " ".join(row[a])
-            print(f"  M[{A}, {a}] = {A} → {rhs}")
-
-
-def print_table_matrix(TABLE, *, max_cols=6, cell_w=34):
-    base_terms = list(TERMS_NO_EOF)
-
-    used_terms = set()
-    for A in NONTERMS:
-        used_terms.update(TABLE.get(A, {}).keys())
-
-    cols = [t for t in base_terms if t in used_terms]
-    if "EOF" in used_terms and "EOF" not in cols:
-        cols.append("EOF")
-
-    if not cols:
-        print("\nTABELA LL(1) (matriz):\n  (vazia) — nenhuma entrada foi gerada.")
-        return
-
-    def short_prod(A, prod):
-        rhs = " ".join(prod)
-        s = f"{A}→{rhs}"
-        if len(s) > cell_w - 1:
-            s = s[: cell_w - 2] + "…"
-        return s
-
-    print("\nTABELA LL(1) (matriz):")
-    for start in range(0, len(cols), max_cols):
-        chunk = cols[start : start + max_cols]
-        header = " " * 16 + "".join(f"{c:>{cell_w}s}" for c in chunk)
-        print("\n" + header)
-        print(" " * 16 + "-" * (cell_w * len(chunk)))
-
-        for A in NONTERMS:
-            row = TABLE.get(A, {})
-            if not row:
-                continue
-            if not any(c in row for c in chunk):
-                continue
-
-            line = f"{A:<16s}"
-            for c in chunk:
-                line += f"{short_prod(A, row[c]):>{cell_w}s}" if c in row else f"{'':>{cell_w}s}"
-            print(line)
+    write_lines(chain(("TOKENS:",), (f"  Token({t.kind}, '{t.lexeme}', {t.line}:{t.col})" for t in toks)))
 
 
 def _clip(s: str, w: int) -> str:
@@ -145,7 +67,8 @@ def _fmt_stack(ev: dict, max_items: int = 12) -> str:
     return "[" + ", ".join(head) + ", …]"
 
 
-def print_trace(trace, limit=200):
+def print_trace(trace, limit=None):
+    import shutil
     term_w = shutil.get_terminal_size((140, 20)).columns
 
     stack_w = min(64, max(34, term_w // 3))
@@ -153,16 +76,41 @@ def print_trace(trace, limit=200):
     la_w = 16
     action_w = max(24, term_w - (stack_w + x_w + la_w + 12))
 
-    print("\nPARSE TRACE (pilha topo→fundo / X / lookahead / AÇÃO):")
-    for ev in trace[:limit]:
+    def fmt(ev):
         stack_s = _fmt_stack(ev, max_items=12)
-        line = (
+        return (
             f"{_clip(stack_s, stack_w)}  "
             f"X={_clip(ev.get('X',''), x_w)}  "
             f"LA={_clip(ev.get('lookahead',''), la_w)}  "
             f"AÇÃO={_clip(ev.get('action',''), action_w)}"
         )
-        print(line)
+
+    write_lines(chain(("\nPARSE TRACE (pilha topo→fundo / X / lookahead / AÇÃO):",),
+                      map(fmt, trace if limit is None else trace[:limit])))
+
+
+def print_cached(args, grammar, fingerprint: str) -> None:
+    from .batch import _init_worker, check_text
+    from .lexer import LexerError
+    from .result_cache import ResultCache
+    from .tokens import Token
+
+    _init_worker(grammar, fingerprint, args.engine)
+    run = lambda code: check_text(code, tokens=args.tokens)
+    cache = ResultCache(fingerprint=fingerprint)
+    if args.source:
+        rec = cache.check(run, path=args.source, tokens=args.tokens)
+    else:
+        rec = cache.check(run, data=(EXAMPLE_ERR if args.err else EXAMPLE_OK).encode("utf-8"), tokens=args.tokens)
+
+    if rec["status"] == "lex_error":
+        raise LexerError(rec["message"], rec["line"], rec["col"])
+    if args.tokens:
+        print_tokens(Token(*t) for t in rec["token_list"])
+    if rec["status"] == "syntax_error":
+        print(f"\n❌ Erro sintático: {rec['message']}")
+    else:
+        print("\n✅ Cadeia aceita (parse concluído sem erros)." if rec["status"] == "ok" else "\n❌ Cadeia NÃO aceita.")
 
 
 def main():
@@ -170,6 +118,7 @@ def main():
     ap.add_argument("source", nargs="?", help="arquivo .lbx para analisar")
     ap.add_argument("--err", action="store_true", help="usar exemplo com erro")
 
+    ap.add_argument("--build-table", action="store_true", help="reconstrói e salva o artefato da tabela LL(1) e sai")
     ap.add_argument("--dump-first-follow", action="store_true", help="imprime FIRST e FOLLOW")
     ap.add_argument("--dump-table", action="store_true", help="imprime tabela LL(1) em formato de lista (recomendado)")
     ap.add_argument("--dump-table-matrix", action="store_true", help="imprime tabela LL(1) em formato de matriz (debug)")
@@ -177,27 +126,177 @@ def main():
     ap.add_argument("--matrix-cols", type=int, default=6, help="colunas por página na matriz")
     ap.add_argument("--matrix-cellw", type=int, default=34, help="largura da célula na matriz")
 
+    ap.add_argument("--engine", choices=("table", "generated"), default="table",
+                    help="table = LL1Parser dirigido pela tabela; generated = parser descendente recursivo gerado da tabela")
+    ap.add_argument("--optimize", action="store_true",
+                    help="usa a gramática otimizada (cadeias unitárias inlinadas, sequências de ε juntadas); "
+                         "erros, trace e árvore continuam nos símbolos originais")
+    ap.add_argument("--pratt", action="store_true",
+                    help="expressões pelo parser de precedência (bin/pratt.py) em vez da cadeia Expr → OrExpr → … da tabela")
+    ap.add_argument("--table", choices=("flat", "comb"), default="flat",
+                    help="formato da tabela LL(1) no parse: matriz plana ou comprimida (bin/comb.py)")
+    ap.add_argument("--lexer", choices=("regex", "mmap", "columnar", "dfa"), default="regex",
+                    help="regex = Lexer sobre str; mmap = lexer sobre os bytes do arquivo mapeado em memória (arquivos enormes); "
+                         "columnar = tokens em arrays (kind/início/fim), sem um objeto por token; "
+                         "dfa = TOKEN_SPECS compilado num DFA com maior casamento (bin/dfa.py)")
+    ap.add_argument("--tokens", action="store_true", help="imprime a lista de tokens")
+    ap.add_argument("--tree", nargs="?", const="ast", choices=("ast", "full"),
+                    help="imprime a árvore sintática: ast = simplificada (padrão), full = árvore de derivação completa")
+    ap.add_argument("--all-errors", action="store_true",
+                    help="continua depois de um erro sintático (recuperação por FOLLOW) e lista todos os erros")
+    ap.add_argument("--max-errors", type=int, default=100, help="máximo de erros listados com --all-errors ou --check")
+    ap.add_argument("--check", action="store_true",
+                    help="no mesmo parse, confere declarações: identificador não declarado e declaração repetida no escopo")
+    ap.add_argument("--stats", action="store_true",
+                    help="mede o tempo de cada fase e conta tokens, expansões e altura da pilha do parser")
+    ap.add_argument("--cache", action="store_true",
+                    help="guarda/reaproveita o resultado (e os tokens, com --tokens) num cache em disco "
+                         "endereçado pelo conteúdo do fonte; um acerto não roda léxico nem parser")
+    ap.add_argument("--parallel", action="store_true",
+                    help="arquivo enorme: corta nos comandos de topo e analisa os trechos em paralelo (--workers processos)")
+    ap.add_argument("--serve", action="store_true",
+                    help="modo servidor: carrega a tabela uma vez e atende pedidos em JSON Lines "
+                         "(stdin/stdout, ou --socket); cliente: python -m bin.client")
+    ap.add_argument("--socket", help="socket Unix do servidor (com --serve)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="processos do servidor para os parses maiores (0 = tudo no processo principal)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="prazo padrão de cada pedido ao servidor, em segundos")
     ap.add_argument("--trace", action="store_true", help="mostra passo a passo do parser")
-    ap.add_argument("--trace-limit", type=int, default=200, help="limite de passos do trace")
+    ap.add_argument("--trace-out", metavar="ARQUIVO",
+                    help="grava todos os passos do parser em ARQUIVO durante o parse (deltas da pilha, sem "
+                         "guardar nada em memória); leitura: python -m bin.trace_file ARQUIVO --from N --to M")
+    ap.add_argument("--trace-format", choices=("bin", "jsonl"), default="bin", help="formato de --trace-out")
+    ap.add_argument("--trace-limit", type=int,
+                    help="limite de passos do trace (padrão: 200 com --trace, sem limite com --trace-out; 0 = sem limite)")
+    ap.add_argument("--trace-mode", choices=TRACE_MODES, default="head",
+                    help="head = primeiros passos, tail = últimos passos, error = últimos passos antes de um erro")
 
     args = ap.parse_args()
 
-    if args.source:
-        with open(args.source, "r", encoding="utf-8") as f:
-            code = f.read()
-    else:
-        code = EXAMPLE_ERR if args.err else EXAMPLE_OK
+    if args.trace and args.engine != "table":
+        ap.error("--trace só está disponível com --engine table")
+    if args.trace_out and (args.trace or args.tree or args.all_errors or args.stats or args.engine != "table"):
+        ap.error("--trace-out não pode ser combinado com --trace, --tree, --all-errors, --stats nem com --engine generated")
+    if args.trace_out and args.trace_mode != "head":
+        # o arquivo é gravado desde o começo: --trace-limit corta nos primeiros passos
+        ap.error("--trace-out só grava os primeiros passos (--trace-mode head)")
+    if args.tree and (args.trace or args.all_errors or args.engine != "table"):
+        ap.error("--tree não pode ser combinado com --trace, --all-errors nem com --engine generated")
+    if args.all_errors and (args.trace or args.engine != "table"):
+        ap.error("--all-errors não pode ser combinado com --trace nem com --engine generated")
+
+    if args.optimize and args.engine != "table":
+        ap.error("--optimize só está disponível com --engine table")
+    if args.pratt and (args.optimize or args.engine != "table"):
+        ap.error("--pratt não pode ser combinado com --optimize nem com --engine generated")
+    if args.pratt and (args.trace or args.trace_out or args.stats or args.tree or args.all_errors
+                       or args.check or args.cache or args.parallel):
+        ap.error("--pratt não pode ser combinado com --trace, --trace-out, --stats, --tree, --all-errors, "
+                 "--check, --cache nem --parallel")
+    if args.table == "comb" and args.engine != "table":
+        ap.error("--table comb só está disponível com --engine table")
+    if args.table == "comb" and (args.trace or args.trace_out or args.stats or args.tree or args.all_errors
+                                 or args.check or args.cache or args.parallel):
+        ap.error("--table comb não pode ser combinado com --trace, --trace-out, --stats, --tree, --all-errors, "
+                 "--check, --cache nem --parallel")
+    if args.stats and (args.trace or args.tree or args.all_errors or args.engine != "table"):
+        ap.error("--stats não pode ser combinado com --trace, --tree, --all-errors nem com --engine generated")
+
+    if args.cache and (args.trace or args.tree or args.all_errors or args.stats):
+        ap.error("--cache não pode ser combinado com --trace, --tree, --all-errors nem --stats")
+
+    if args.parallel and (args.trace or args.tree or args.all_errors or args.stats or args.tokens
+                          or args.cache or args.engine != "table"):
+        ap.error("--parallel não pode ser combinado com --trace, --tree, --all-errors, --stats, --tokens, "
+                 "--cache nem com --engine generated")
+    if args.check and (args.trace or args.trace_out or args.tree or args.all_errors or args.stats
+                       or args.cache or args.parallel or args.engine != "table"):
+        ap.error("--check não pode ser combinado com --trace, --trace-out, --tree, --all-errors, --stats, "
+                 "--cache, --parallel nem com --engine generated")
+    if args.lexer != "regex" and (args.cache or args.parallel):
+        # o cache (Lexer) e os trechos paralelos (BytesLexer) escolhem o lexer por conta própria
+        ap.error(f"--lexer {args.lexer} não pode ser combinado com --cache nem --parallel")
+    if args.serve and (args.source or args.lexer != "regex" or args.optimize or args.pratt or args.table != "flat"):
+        # os pedidos trazem o texto ou o caminho; o servidor usa o Lexer e a tabela plana
+        ap.error("--serve não pode ser combinado com um arquivo, --lexer, --optimize, --pratt nem --table")
+    if args.parallel and not args.source:
+        ap.error("--parallel precisa de um arquivo")
+
+    # arquivos abertos durante a análise são fechados aqui, em qualquer saída
+    with ExitStack() as resources:
+        run(args, resources)
+
+
+def run(args, resources: ExitStack) -> None:
+    if args.serve:
+        from .server import serve
+        serve(args.socket, workers=args.workers, engine=args.engine, timeout=args.timeout)
+        return
 
-    toks = list(Lexer(code).tokens())
+    if args.build_table:
+        load_artifact(rebuild=True)
+        print(f"artefato LL(1) salvo em {artifact_path(grammar_fingerprint())}")
+        return
 
-    FIRST, FOLLOW, first_of_sequence = compute_first_follow(G, NONTERMS, TERMS_NO_EOF, START_SYMBOL)
-    TABLE, conflicts = build_ll1_table(G, NONTERMS, TERMS_NO_EOF, FIRST, FOLLOW, first_of_sequence)
+    stats = None
+    phase = lambda name: nullcontext()
+    if args.stats:
+        from .stats import ParseStats
+        stats = ParseStats()
+        phase = stats.phase
+
+    if args.cache or args.parallel:
+        toks = None  # o fonte é lido por print_cached / parse_parallel
+    elif args.lexer == "mmap":
+        from .bytes_lexer import BytesLexer, SourceBuffer
+        with phase("leitura"):
+            if args.source:
+                src = resources.enter_context(SourceBuffer.open(args.source))
+            else:
+                src = SourceBuffer((EXAMPLE_ERR if args.err else EXAMPLE_OK).encode("utf-8"))
+        toks = BytesLexer(src).tokens()
+    else:
+        with phase("leitura"):
+            if args.source:
+                with open(args.source, "r", encoding="utf-8") as f:
+                    code = f.read()
+            else:
+                code = EXAMPLE_ERR if args.err else EXAMPLE_OK
+
+        if args.lexer == "columnar":
+            from .token_buffer import TokenBuffer
+            with phase("léxico"):
+                toks = TokenBuffer(code)
+        elif args.lexer == "dfa":
+            from .dfa import DFALexer
+            toks = DFALexer(code).tokens()
+        else:
+            # o Lexer é um gerador: lexer e parser rodam juntos, um token por vez
+            toks = Lexer(code).tokens()
+
+    # FIRST/FOLLOW e tabela vêm do artefato em cache (reconstruído se a gramática mudou)
+    art = load_artifact(stats=stats)
+    grammar = art["grammar"]
+    if args.optimize:
+        if art["optimized"] is None:
+            print("aviso: gramática otimizada indisponível, usando a original", file=sys.stderr)
+        else:
+            grammar = art["optimized"]
+
+    if stats is not None and args.lexer != "columnar":
+        # com --stats léxico e parser rodam separados, para medir cada um
+        with phase("léxico"):
+            toks = list(toks)
+
+    if args.dump_first_follow or args.dump_table or args.dump_table_matrix:
+        from .dump import print_first_follow, print_conflicts, print_table_list, print_table_matrix
 
     if args.dump_first_follow:
-        print_first_follow(FIRST, FOLLOW)
+        print_first_follow(art["FIRST"], art["FOLLOW"])
 
     if args.dump_table or args.dump_table_matrix:
-        print_conflicts(conflicts)
+        print_conflicts(art["conflicts"])
+        TABLE = grammar.table_dict()
 
     if args.dump_table:
         print_table_list(TABLE)
@@ -205,19 +304,112 @@ def main():
     if args.dump_table_matrix:
         print_table_matrix(TABLE, max_cols=args.matrix_cols, cell_w=args.matrix_cellw)
 
-    print_tokens(toks)
+    if args.cache:
+        print_cached(args, grammar, art["fingerprint"])
+        return
 
-    parser = LL1Parser(TABLE, START_SYMBOL, is_terminal, is_nonterminal)
+    if args.parallel:
+        from .parallel import parse_parallel
+        try:
+            accepted, _ = parse_parallel(args.source, grammar, max(1, args.workers))
+        except ParserError as e:
+            print(f"\n❌ Erro sintático: {e}")
+            return
+        print("\n✅ Cadeia aceita (parse concluído sem erros)." if accepted else "\n❌ Cadeia NÃO aceita.")
+        return
 
-    try:
-        accepted, trace = parser.parse(toks)
+    if args.tokens:
+        toks = list(toks)
+        print_tokens(toks)
+
+    if args.all_errors:
+        errors = LL1Parser(grammar).parse_recovering(toks, max_errors=args.max_errors)
+        for e in errors:
+            print(f"\n❌ Erro sintático: {e}")
+        if errors:
+            print(f"\n❌ Cadeia NÃO aceita ({len(errors)} erro(s) sintático(s)).")
+        else:
+            print("\n✅ Cadeia aceita (parse concluído sem erros).")
+        return
+
+    if args.check:
+        from .semantic import SymbolTable
+        table = SymbolTable(max_errors=args.max_errors)
+        try:
+            accepted, _ = LL1Parser(grammar).parse(toks, hooks=table.hooks())
+        except ParserError as e:
+            # o que foi visto antes do erro sintático continua valendo
+            for err in table.errors:
+                print(f"\n❌ Erro semântico: {err}")
+            print(f"\n❌ Erro sintático: {e}")
+            return
+        for err in table.errors:
+            print(f"\n❌ Erro semântico: {err}")
+        if not accepted:
+            print("\n❌ Cadeia NÃO aceita.")
+        elif table.errors:
+            print(f"\n❌ Cadeia NÃO aceita ({len(table.errors)} erro(s) semântico(s)).")
+        else:
+            print("\n✅ Cadeia aceita (parse e declarações sem erros).")
+        return
 
-        if args.trace:
-            print_trace(trace, limit=args.trace_limit)
+    if args.tree:
+        from .tree import ParseTree
+        tree = ParseTree(grammar)
+        try:
+            LL1Parser(grammar).parse(toks, tree=tree)
+        except ParserError as e:
+            print(f"\n❌ Erro sintático: {e}")
+            return
+        if args.tree == "ast":
+            tree = tree.simplify()
+        print("\nÁRVORE SINTÁTICA:")
+        for line in tree.lines():
+            print("  " + line)
+        print("\n✅ Cadeia aceita (parse concluído sem erros).")
+        return
+
+    recorder = None
+    if args.trace:
+        recorder = TraceRecorder(200 if args.trace_limit is None else args.trace_limit, args.trace_mode)
+    sink = None
+    if args.trace_out:
+        from .trace_file import open_sink
+        sink = open_sink(args.trace_out, args.trace_format, args.trace_limit)
+
+    comb = args.table == "comb"
+    parser = LL1Parser(grammar, comb=comb)
+    if args.pratt:
+        try:
+            parser = LL1Parser(grammar, pratt=True, comb=comb)
+        except ValueError as e:
+            print(f"aviso: {e}, usando só a tabela", file=sys.stderr)
+
+    try:
+        if args.engine == "generated":
+            from .codegen import load_generated_parser
+            accepted, trace = load_generated_parser(grammar, art["fingerprint"]).parse(toks), []
+        elif stats is not None:
+            try:
+                with phase("parse"):
+                    accepted, trace = parser.parse(toks, stats=stats)
+            finally:
+                print("\n" + "\n".join(stats.report()))
+        else:
+            accepted, trace = parser.parse(toks, trace=recorder if recorder is not None else sink)
+
+        if recorder is not None:
+            print_trace(trace)
 
         print("\n✅ Cadeia aceita (parse concluído sem erros)." if accepted else "\n❌ Cadeia NÃO aceita.")
     except ParserError as e:
+        if recorder is not None:
+            print_trace(recorder.events())
         print(f"\n❌ Erro sintático: {e}")
+    finally:
+        if sink is not None:
+            sink.close()
+            print(f"trace: {sink.steps} passo(s) gravado(s) em {args.trace_out}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .compiled import CompiledGrammar
+from .grammar import EPS
+from .parser import ParserError, syntax_error
+
+# Otimização gramática → gramática, antes de montar a tabela LL(1):
+#
+#   1. inline: um não-terminal com uma única produção (Expr → OrExpr,
+#      Block → { StmtList }, ...) é trocado pelo lado direito onde aparece;
+#      as cadeias Expr → OrExpr → AndExpr → … → MulExpr viram um único push;
+#   2. produções unitárias A → B (Statement → IfStmt, UnaryExpr → Primary)
+#      viram as produções de B;
+#   3. sequências de não-terminais anuláveis (MulTail AddTail … OrTail)
+#      viram um não-terminal só, cujas produções são as de cada um deles:
+#      no caso comum (tudo ε) é um pop em vez de seis.
+#
+# A linguagem é a mesma e a gramática resultante é conferida como LL(1).
+# Cada não-terminal novo guarda a sequência de símbolos originais que
+# representa (`origin`), e um erro no parser otimizado é refeito na
+# gramática original a partir da pilha traduzida, então a mensagem é
+# idêntica. Trace e árvore usam a gramática original.
+#
+# O inline de B só é feito se, para todo lookahead, o parser original
+# começando em B e começando no lado direito de B dá o mesmo resultado (casa
+# ou falha com o mesmo conjunto esperado); senão B fica como está.
+
+SEP = "·"
+
+
+def optimize_grammar(G, NONTERMS: List[str], START_SYMBOL: str, TERMS: List[str], TABLE):
+    nonterms = set(NONTERMS)
+
+    def rhs_of(prod) -> List[str]:
+        return [s for s in prod if s != EPS]
+
+    def expected(X: str) -> FrozenSet[str]:
+        return frozenset(TABLE[X]) if X in nonterms else frozenset((X,))
+
+    # resultado do parser original com `syms` no topo e lookahead `a`
+    def outcome(syms: List[str], a: str):
+        stack = list(reversed(syms))
+        while stack:
+            X = stack.pop()
+            if X not in nonterms:
+                return True if X == a else expected(X)
+            prod = TABLE[X].get(a)
+            if prod is None:
+                return expected(X)
+            stack.extend(reversed(rhs_of(prod)))
+        return None
+
+    nullable = {A for A in NONTERMS if any(not rhs_of(p) for p in G[A])}
+    changed = True
+    while changed:
+        changed = False
+        for A in NONTERMS:
+            if A not in nullable and any(all(s in nullable for s in rhs_of(p)) for p in G[A]):
+                nullable.add(A)
+                changed = True
+
+    # 1) quem pode ser inlinado: produção única, não anulável, sem recursão
+    #    e com o mesmo comportamento de erro
+    inline: Dict[str, List[str]] = {}
+    for B in NONTERMS:
+        if B == START_SYMBOL or len(G[B]) != 1 or B in nullable:
+            continue
+        beta = rhs_of(G[B][0])
+        if all(outcome([B], a) == outcome(beta, a) for a in TERMS):
+            inline[B] = beta
+
+    def expand(syms: List[str], seen: Tuple[str, ...] = ()) -> List[str]:
+        out: List[str] = []
+        for s in syms:
+            if s in inline and s not in seen:
+                out.extend(expand(inline[s], seen + (s,)))
+            else:
+                out.append(s)
+        return out
+
+    # 3) sequências anuláveis → não-terminal novo (criado sob demanda)
+    G2: Dict[str, List[List[str]]] = {}
+    origin: Dict[str, Tuple[str, ...]] = {}
+    pending: List[str] = []
+
+    def seq_nonterm(run: Tuple[str, ...]) -> str:
+        name = SEP.join(run)
+        if name not in origin:
+            origin[name] = run
+            pending.append(name)
+        return name
+
+    def rewrite(syms: List[str]) -> List[str]:
+        syms = expand(syms)
+        out: List[str] = []
+        i = 0
+        while i < len(syms):
+            j = i
+            while j < len(syms) and syms[j] in nullable:
+                j += 1
+            if j - i >= 2:
+                out.append(seq_nonterm(tuple(syms[i:j])))
+                i = j
+            else:
+                out.append(syms[i])
+                i += 1
+        return out
+
+    def productions(run: Tuple[str, ...]) -> List[List[str]]:
+        if len(run) == 1:
+            return [rewrite(rhs_of(p)) for p in G[run[0]]]
+        # X1 X2 … Xn: cada produção não vazia de X1 seguida do resto; a vazia
+        # de X1 dá lugar às produções de X2 … Xn
+        X1, rest = run[0], run[1:]
+        return [rewrite(rhs_of(p) + list(rest)) for p in G[X1] if rhs_of(p)] + productions(rest)
+
+    for A in NONTERMS:
+        if A not in inline:
+            origin[A] = (A,)
+    pending.append(START_SYMBOL)
+    while pending:
+        A = pending.pop()
+        if A in G2:
+            continue
+        prods = productions(origin[A])
+        # 2) A → B (B não-terminal, B ≠ A) vira as produções de B
+        done = False
+        while not done:
+            done = True
+            for n, rhs in enumerate(prods):
+                if len(rhs) == 1 and rhs[0] in origin and rhs[0] != A:
+                    prods[n:n + 1] = productions(origin[rhs[0]])
+                    done = False
+                    break
+        G2[A] = [rhs or [EPS] for rhs in prods]
+        for rhs in prods:
+            for s in rhs:
+                if s in origin and s not in G2:
+                    pending.append(s)
+
+    # ordem estável: os originais na ordem de NONTERMS, depois os novos
+    nonterms2 = [A for A in NONTERMS if A in G2] + sorted(A for A in G2 if A not in nonterms)
+    return G2, nonterms2, {A: origin[A] for A in nonterms2}
+
+
+# Monta a gramática otimizada já compilada, ligada à original. Devolve None
+# se a gramática otimizada tiver conflito (não deveria acontecer).
+def build_optimized(G, NONTERMS: List[str], TERMS: List[str], START_SYMBOL: str, TABLE,
+                    original: CompiledGrammar) -> Optional[CompiledGrammar]:
+    from .first_follow import compute_first_follow
+    from .table import build_ll1_table
+    from .compiled import compile_grammar
+
+    terms_no_eof = [t for t in TERMS if t != "EOF"]
+    G2, nonterms2, origin = optimize_grammar(G, NONTERMS, START_SYMBOL, TERMS, TABLE)
+    FIRST2, FOLLOW2, first_of_sequence = compute_first_follow(G2, nonterms2, terms_no_eof, START_SYMBOL)
+    TABLE2, conflicts = build_ll1_table(G2, nonterms2, terms_no_eof, FIRST2, FOLLOW2, first_of_sequence)
+    if conflicts:
+        return None
+    g = compile_grammar(G2, nonterms2, TERMS, START_SYMBOL, TABLE2, FOLLOW2)
+    g.original = original
+    g.origin = [tuple(original.ids[s] for s in origin[A]) for A in nonterms2]
+    return g
+
+
+# Erro do parser otimizado (topo X, resto da pilha `stack`) refeito na
+# gramática original: traduz a pilha e roda o parser original até falhar.
+def original_error(g: CompiledGrammar, stack: List[int], X: int, look) -> ParserError:
+    orig = g.original
+    T = g.nterms
+    st: List[int] = []
+    for s in stack + [X]:
+        if s < T:
+            st.append(s)
+        else:
+            st.extend(reversed(g.origin[s - T]))
+    k = look.kid
+    while st:
+        Y = st.pop()
+        if Y < T:
+            if Y != k:
+                return syntax_error(orig, Y, look)
+            break
+        p = orig.lookup(Y, k)
+        if p < 0:
+            return syntax_error(orig, Y, look)
+        st.extend(orig.rprods[p])
+    # não acontece se as duas gramáticas aceitam a mesma linguagem
+    return syntax_error(g, X, look)
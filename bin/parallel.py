@@ -0,0 +1,190 @@
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, islice
+from typing import List, Optional, Tuple
+
+from .bytes_lexer import _BYTES_RE, _EOF, _GROUP_KID, BytesLexer, SourceBuffer
+from .compiled import CompiledGrammar
+from .parser import LL1Parser, ParserError
+from .tokens import TERMS, TERM_IDS
+
+# Parse de um arquivo enorme em paralelo (python -m bin.main grande.lbx --parallel).
+# O programa é uma sequência de comandos de topo: os workers lexam pedaços do
+# mmap, o arquivo é cortado nos comandos de topo e cada trecho é analisado como
+# um programa inteiro. Se um trecho falha, o parse sequencial refaz a partir do
+# trecho anterior, para dar o mesmo erro e a mesma mensagem.
+
+_PIECE_MIN = 1 << 20
+_SYNC = 64        # fronteiras anotadas no começo de cada pedaço
+_CKPT = 4096      # a cada tantos tokens, o offset do token (para retomar o lexer)
+
+_DEPTH = [0] * len(TERMS)
+for _t, _d in (("DELIM_ABREP", 1), ("DELIM_ABRECHAVE", 1), ("DELIM_ABRECOL", 1),
+               ("DELIM_FECHAP", -1), ("DELIM_FECHACHAVE", -1), ("DELIM_FECHACOL", -1)):
+    _DEPTH[TERM_IDS[_t]] = _d
+_ENDS = (TERM_IDS["DELIM_PONTOVIR"], TERM_IDS["DELIM_FECHACHAVE"])
+# um comando que termina em ; ou } ainda continua com else (if) ou while (do)
+_CONTINUES = (TERM_IDS["SENAO"], TERM_IDS["ENQUANTO"])
+
+
+class _Kind:
+    # token só com o tipo: os trechos só precisam de aceito/rejeitado
+    __slots__ = ("kid",)
+    lexeme = ""
+    line = col = None
+
+    def __init__(self, kid: int):
+        self.kid = kid
+
+    @property
+    def kind(self) -> str:
+        return TERMS[self.kid]
+
+
+_parser: Optional[LL1Parser] = None
+
+
+def _init_worker(grammar: CompiledGrammar) -> None:
+    global _parser
+    _parser = LL1Parser(grammar)
+
+
+# O pedaço pode começar no meio de uma string ou comentário: as primeiras
+# fronteiras de token (sync) são comparadas com onde o pedaço anterior cruzou o
+# corte, e os tokens antes da fronteira comum são descartados.
+def _lex_piece(path: str, start: int, end: int, last: bool):
+    with SourceBuffer.open(path) as src:
+        data = src.data
+        match = _BYTES_RE.match
+        kids = _GROUP_KID
+        kinds = array('H')
+        add = kinds.append
+        sync = {start: 0}
+        ckpt = array('Q')
+        pos = start
+        n = 0
+        while last or pos < end:
+            m = match(data, pos)
+            if m is None:
+                return None
+            g = m.lastindex
+            kid = kids[g]
+            if kid == _EOF:
+                break
+            if not n % _CKPT:
+                ckpt.append(m.start(g))
+            add(kid)
+            n += 1
+            pos = m.end()
+            if n < _SYNC:
+                sync[pos] = n
+    # pos: primeira fronteira depois do corte (onde o próximo pedaço tem de sincronizar)
+    return kinds, sync, pos, sum(map(_DEPTH.__getitem__, kinds)), ckpt
+
+
+def _parse_chunk(kinds: array) -> bool:
+    try:
+        return _parser.parse(chain(map(_Kind, kinds), (_Kind(_EOF),)))[0]
+    except ParserError:
+        return False
+
+
+def check_shape(g: CompiledGrammar) -> bool:
+    ids = g.ids
+    if "StmtList" not in ids or "Statement" not in ids:
+        return False
+    sl, st = ids["StmtList"], ids["Statement"]
+    prods = lambda A: sorted(rhs for lhs, rhs in g.prods if lhs == A)
+    return prods(g.start) == [(sl, g.eof)] and prods(sl) == [(), (st, sl)]
+
+
+def _cuts(data, pieces: int) -> List[int]:
+    n = len(data)
+    cuts = [0]
+    for k in range(1, pieces):
+        i = data.find(b"\n", max(n * k // pieces, cuts[-1]))
+        if i < 0:
+            break
+        if i + 1 > cuts[-1] and i + 1 < n:
+            cuts.append(i + 1)
+    return cuts + [n]
+
+
+# Primeiro início de comando de topo em kinds[lo:hi], com profundidade `depth` em lo
+def _split_point(kinds: array, lo: int, hi: int, depth: int) -> Optional[int]:
+    ends, cont = _ENDS, _CONTINUES
+    n = len(kinds)
+    for i, d in enumerate(accumulate(map(_DEPTH.__getitem__, islice(kinds, lo, hi)), initial=depth), lo - 1):
+        if d == 0 and i >= lo and kinds[i] in ends and i + 1 < n and kinds[i + 1] not in cont:
+            return i + 1
+    return None
+
+
+# Aceita/rejeita `path` como LL1Parser(grammar).parse faria (mesmos erros).
+# Devolve (aceito, nº de trechos analisados em paralelo; 0 = caiu no sequencial).
+def parse_parallel(path: str, grammar: CompiledGrammar, workers: int,
+                   pieces: Optional[int] = None) -> Tuple[bool, int]:
+    with SourceBuffer.open(path) as src:
+        size = len(src)
+        if pieces is None:
+            pieces = workers * 4
+        pieces = max(1, min(pieces, size // _PIECE_MIN))
+        if pieces < 2 or not check_shape(grammar.original or grammar):
+            return _sequential(src, grammar, 0, []), 0
+        cuts = _cuts(src.data, pieces)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(grammar,)) as ex:
+            lexed = list(ex.map(_lex_piece, [path] * (len(cuts) - 1), cuts[:-1], cuts[1:],
+                                [k == len(cuts) - 2 for k in range(len(cuts) - 1)]))
+            if any(r is None for r in lexed):
+                return _sequential(src, grammar, 0, []), 0
+
+            # junta os pedaços, descartando o começo de cada um até a fronteira comum
+            kinds = array('H')
+            ckpts: List[Tuple[int, int]] = []
+            starts = [0]
+            depth = 0
+            prev_end = None
+            for pk, sync, end, net, ck in lexed:
+                drop = 0
+                if prev_end is not None:
+                    drop = sync.get(prev_end)
+                    if drop is None:
+                        return _sequential(src, grammar, 0, []), 0
+                    net -= sum(map(_DEPTH.__getitem__, pk[:drop]))
+                    at = _split_point(pk, drop, len(pk), depth)
+                    if at is not None:
+                        starts.append(len(kinds) + at - drop)
+                base = len(kinds) - drop
+                ckpts += [(base + i * _CKPT, off) for i, off in enumerate(ck) if i * _CKPT >= drop]
+                kinds.extend(pk[drop:] if drop else pk)
+                depth += net
+                prev_end = end
+            del lexed
+            bounds = starts + [len(kinds)]
+            futures = [ex.submit(_parse_chunk, kinds[a:b]) for a, b in zip(bounds, bounds[1:])]
+            failed = None
+            for i, f in enumerate(futures):
+                if not f.result():
+                    # só o primeiro trecho com erro importa: o resto nem roda
+                    for rest in futures[i + 1:]:
+                        rest.cancel()
+                    failed = i
+                    break
+
+        if failed is None:
+            return True, len(futures)
+        return _sequential(src, grammar, bounds[max(failed - 1, 0)], ckpts), len(futures)
+
+
+# Parse normal a partir do token de índice `first` (em estado [EOF, StmtList])
+def _sequential(src: SourceBuffer, grammar: CompiledGrammar, first: int,
+                ckpts: List[Tuple[int, int]]) -> bool:
+    if first:
+        j = bisect_right(ckpts, (first, float("inf"))) - 1
+        idx, off = ckpts[j]
+        toks = islice(BytesLexer(src).tokens(off), first - idx, None)
+    else:
+        toks = BytesLexer(src).tokens()
+    return LL1Parser(grammar).parse(toks)[0]
@@ -1,87 +1,540 @@
-from typing import List, Tuple, Dict, Any
+from array import array
+from collections import deque
+from itertools import islice
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Callable
 from .tokens import Token
-from .grammar import EPS
+from .compiled import CompiledGrammar
+from .hooks import ACTION
 
 class ParserError(Exception):
-    pass
+    def __init__(self, message: str, line: Optional[int] = None, col: Optional[int] = None):
+        super().__init__(message)
+        self.line = line
+        self.col = col
 
 def _fmt_expected_single(sym: str) -> str:
     return "{ " + sym + " }"
 
-def _fmt_expected_row(row: dict) -> str:
+def _fmt_expected_row(row) -> str:
     if not row:
         return "{ }"
-    terms = sorted(row.keys())
+    terms = sorted(row)
     return "{ " + ", ".join(terms) + " }"
 
 def _stack_topdown(stack_internal: List[str]) -> List[str]:
     return list(reversed(stack_internal))
 
+
+# Erro quando o topo da pilha é X e o lookahead é `look`
+def syntax_error(g: CompiledGrammar, X: int, look: Token) -> ParserError:
+    if X == g.eof:
+        return ParserError(
+            f"{look.line}:{look.col}: esperado EOF, mas veio {look.kind} '{look.lexeme}'",
+            look.line, look.col,
+        )
+    if g.is_terminal(X):
+        expected = _fmt_expected_single(g.names[X])
+    else:
+        expected = _fmt_expected_row(g.names[a] for a in g.expected(X))
+    return ParserError(
+        f"{look.line}:{look.col}: O parser esperava {expected}, "
+        f"mas veio {look.kind} '{look.lexeme}'",
+        look.line, look.col,
+    )
+
+
+TRACE_MODES = ("head", "tail", "error")
+
+# marcador de MATCH: o texto só é montado em TraceRecorder.events()
+_MATCH = "MATCH"
+
+
+class TraceRecorder:
+    # Guarda passos do parser de forma limitada:
+    #   head  -> só os primeiros `limit` passos (depois o parser volta ao caminho rápido)
+    #   tail  -> os últimos `limit` passos (buffer circular)
+    #   error -> como tail, mas só devolve os passos se o parse falhar
+    # limit=None grava tudo.
+    #
+    # tail/error passam por todos os passos do parse: em vez de copiar a pilha
+    # a cada um, guardam só o delta (X desempilhado e a ação, como o
+    # bin/trace_file) e uma cópia da pilha a cada `limit` passos. O buffer tem
+    # 2 x limit passos, o bastante para ir da cópia mais recente anterior à
+    # janela até o fim; events() refaz as pilhas dos últimos `limit` a partir dela.
+    def __init__(self, limit: Optional[int] = None, mode: str = "head"):
+        if mode not in TRACE_MODES:
+            raise ValueError(f"modo de trace inválido: {mode!r}")
+        if limit is not None and limit <= 0:
+            limit = None
+        self.limit = limit
+        self.mode = mode
+        self.failed = False
+        self.grammar: Optional[CompiledGrammar] = None
+        # head cheio: o parser pode parar de chamar record()
+        self.done = False
+        if mode == "head":
+            self._steps = []
+        else:
+            self._steps = deque(maxlen=2 * limit) if limit is not None else []
+            # (índice do passo, pilha com X no topo), das duas cópias mais recentes
+            self._snaps = deque(maxlen=2)
+            self._n = 0
+            self._next_snap = 0
+            self.record = self._record_delta
+
+    def bind(self, grammar: CompiledGrammar):
+        self.grammar = grammar
+
+    def record(self, i: int, stack: List[int], X: int, look: Token, action):
+        # `stack` é a pilha interna já sem X; a cópia só acontece aqui,
+        # e a formatação da ação fica para events().
+        self._steps.append((i, tuple(stack), X, look.kind, look.lexeme, action))
+        if self.limit is not None and len(self._steps) >= self.limit:
+            self.done = True
+
+    def _record_delta(self, i: int, stack: List[int], X: int, look: Token, action):
+        n = self._n
+        if n == self._next_snap:
+            self._snaps.append((n, tuple(stack) + (X,)))
+            self._next_snap = n + self.limit if self.limit is not None else -1
+        self._steps.append((i, X, look.kind, look.lexeme, action))
+        self._n = n + 1
+
+    def _event(self, i: int, stack, X: int, kind: str, lexeme: str, action) -> Dict[str, Any]:
+        names = self.grammar.names
+        if action is _MATCH:
+            action = f"MATCH '{lexeme}'"
+        elif not isinstance(action, str):
+            action = self.grammar.fmt_prod(action)
+        return {
+            "i": i,
+            "stack": [names[X]] + _stack_topdown([names[s] for s in stack]),
+            "X": names[X],
+            "lookahead": kind,
+            "look_lexeme": lexeme,
+            "action": action,
+        }
+
+    def events(self) -> List[Dict[str, Any]]:
+        if not self._steps or (self.mode == "error" and not self.failed):
+            return []
+        if self.mode == "head":
+            return [self._event(*step) for step in self._steps]
+
+        # passos first..n-1 no buffer; a janela devolvida começa em n - keep
+        n = self._n
+        first = n - len(self._steps)
+        keep = min(n, self.limit) if self.limit is not None else n
+        s, snap = next((s, snap) for s, snap in reversed(self._snaps) if s <= n - keep)
+        rprods = self.grammar.rprods
+        stack = list(snap)
+        out = []
+        for j, (i, X, kind, lexeme, action) in enumerate(islice(self._steps, s - first, None), s):
+            stack.pop()
+            if j >= n - keep:
+                out.append(self._event(i, stack, X, kind, lexeme, action))
+            if action.__class__ is int:
+                stack.extend(rprods[action])
+        return out
+
+
 class LL1Parser:
-    def __init__(self, table, start, is_terminal, is_nonterminal):
-        self.table = table
-        self.start = start
-        self.is_terminal = is_terminal
-        self.is_nonterminal = is_nonterminal
+    # pratt=True: no caminho rápido, as expansões de Expr vão para o parser de
+    # expressões de bin/pratt.py (trace, árvore, stats e recuperação continuam
+    # só pela tabela)
+    # comb=True: o caminho rápido consulta a tabela comprimida de bin/comb.py
+    # em vez da matriz plana
+    def __init__(self, grammar: CompiledGrammar, pratt: bool = False, comb: bool = False):
+        self.grammar = grammar
+        self.table = grammar.table
+        self._pratt = None
+        self._comb = None
+        if pratt:
+            from .pratt import ExprParser, PRATT
+            self._pratt = ExprParser(grammar)
+            # cópia da tabela com a linha de Expr apontando para o sub-parser
+            T = grammar.nterms
+            base = (self._pratt.expr - T) * T
+            self.table = array(grammar.table.typecode, grammar.table)
+            for a in range(T):
+                if self.table[base + a] >= 0:
+                    self.table[base + a] = PRATT
+        if comb:
+            from .comb import CombTable
+            self._comb = CombTable(self.table, grammar.nterms)
+
+    # `tokens` pode ser qualquer iterável (lista ou o gerador do Lexer): o parser
+    # puxa um token por vez e só guarda o lookahead atual.
+    # Com `tree` (um ParseTree vazio), a árvore é montada durante o parse.
+    # Com `stats` (um ParseStats), o parse conta tokens, expansões e pilha.
+    # Com `hooks` (um Hooks, bin/hooks.py), as ações registradas rodam durante o parse.
+    def parse(self, tokens: Iterable[Token], trace: Optional[TraceRecorder] = None,
+              tree=None, stats=None, hooks=None) -> Tuple[bool, List[Dict[str, Any]]]:
+        g = self.grammar
+        stack = [g.eof, g.start]
+        if sum(x is not None for x in (trace, tree, stats, hooks)) > 1:
+            raise ValueError("trace, tree, stats e hooks não podem ser usados juntos")
+        if g.original is not None and (trace is not None or tree is not None or hooks is not None):
+            # gramática otimizada: trace, árvore e ações são sempre nos símbolos originais
+            if tree is not None:
+                tree.grammar = g.original
+            return LL1Parser(g.original).parse(tokens, trace=trace, tree=tree, hooks=hooks)
+        nxt = iter(tokens).__next__
+        try:
+            look = nxt()
+            if tree is not None:
+                return self._run_tree(stack, nxt, look, tree), []
+            if hooks is not None:
+                hooks.bind(g)
+                return self._run_hooks(stack, nxt, look, hooks), []
+            if stats is not None:
+                stats.bind(g)
+                return self._run_stats(stack, nxt, look, stats), []
+            if trace is None:
+                return self._run(stack, nxt, look), []
+
+            trace.bind(g)
+            try:
+                accepted, look, i = self._run_traced(stack, nxt, look, 0, trace)
+                if accepted is None:
+                    accepted = self._run(stack, nxt, look)
+            except ParserError:
+                trace.failed = True
+                raise
+        except StopIteration:
+            raise ParserError("fim inesperado da entrada (sem token EOF)") from None
+        trace.failed = not accepted
+        return accepted, trace.events()
+
+    # `stack` (o resto da pilha) só é usado com gramática otimizada, para
+    # refazer o erro na gramática original
+    def _error(self, X: int, look: Token, stack: Optional[List[int]] = None) -> ParserError:
+        g = self.grammar
+        if g.original is not None and stack is not None:
+            from .optimize import original_error
+            return original_error(g, stack, X, look)
+        return syntax_error(g, X, look)
+
+    # Caminho rápido: só indexação de inteiros; nada é alocado por passo.
+    def _run(self, stack: List[int], nxt: Callable[[], Token], look: Token) -> bool:
+        if self._comb is not None:
+            return self._run_comb(stack, nxt, look)
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table = self.table
+        rprods = g.rprods
+        pop = stack.pop
+        extend = stack.extend
+        k = look.kid
+
+        while stack:
+            X = pop()
+
+            if X < T:
+                if X != k:
+                    raise self._error(X, look, stack)
+                if X == eof:
+                    return True
+                look = nxt()
+                k = look.kid
+                continue
+
+            p = table[(X - T) * T + k]
+            if p < 0:
+                if self._pratt is None or p != -2:
+                    raise self._error(X, look, stack)
+                # Expr: o sub-parser consome a expressão; se ele parar antes,
+                # devolve a pilha equivalente e a tabela continua dali
+                look, rest = self._pratt.parse(look, nxt)
+                k = look.kid
+                if rest:
+                    extend(rest)
+                continue
+            extend(rprods[p])
+
+        return False
+
+    # Mesmo laço, pela tabela comprimida (bin/comb.py)
+    def _run_comb(self, stack: List[int], nxt: Callable[[], Token], look: Token) -> bool:
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        c = self._comb
+        base, check, value = c.base, c.check, c.value
+        rprods = g.rprods
+        pop = stack.pop
+        extend = stack.extend
+        k = look.kid
+
+        while stack:
+            X = pop()
+
+            if X < T:
+                if X != k:
+                    raise self._error(X, look, stack)
+                if X == eof:
+                    return True
+                look = nxt()
+                k = look.kid
+                continue
 
-    def parse(self, tokens: List[Token]) -> Tuple[bool, List[Dict[str, Any]]]:
-        stack = ['EOF', self.start]
-        i = 0
-        trace: List[Dict[str, Any]] = []
+            b = base[X - T]
+            i = b + k
+            if check[i] != b:
+                raise self._error(X, look, stack)
+            p = value[i]
+            if p < 0:
+                look, rest = self._pratt.parse(look, nxt)
+                k = look.kid
+                if rest:
+                    extend(rest)
+                continue
+            extend(rprods[p])
+
+        return False
+
+    # Mesmo laço, gravando cada passo em `rec`. Devolve (aceito, look, i); aceito
+    # é None quando o gravador enche e o restante deve seguir pelo caminho rápido.
+    def _run_traced(self, stack: List[int], nxt: Callable[[], Token], look: Token, i: int, rec: TraceRecorder):
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table = g.table
+        rprods = g.rprods
+        record = rec.record
 
         while stack:
-            stack_before_internal = list(stack)
+            if rec.done:
+                return None, look, i
             X = stack.pop()
-            look = tokens[i]
-
-            def emit(action: str):
-                trace.append({
-                    "i": i,
-                    "stack": _stack_topdown(stack_before_internal),
-                    "X": X,
-                    "lookahead": look.kind,
-                    "look_lexeme": look.lexeme,
-                    "action": action,
-                })
-
-            if X == 'EOF':
-                if look.kind == 'EOF':
-                    emit("ACCEPT")
-                    return True, trace
-                raise ParserError(
-                    f"{look.line}:{look.col}: esperado EOF, mas veio {look.kind} '{look.lexeme}'"
-                )
-
-            if self.is_terminal(X):
-                if X == look.kind:
-                    emit(f"MATCH '{look.lexeme}'")
-                    i += 1
-                else:
-                    expected = _fmt_expected_single(X)
-                    raise ParserError(
-                        f"{look.line}:{look.col}: O parser esperava {expected}, "
-                        f"mas veio {look.kind} '{look.lexeme}'"
-                    )
+            k = look.kid
+
+            if X < T:
+                if X != k:
+                    record(i, stack, X, look, "ERRO")
+                    raise self._error(X, look, stack)
+                if X == eof:
+                    record(i, stack, X, look, "ACCEPT")
+                    return True, look, i
+                record(i, stack, X, look, _MATCH)
+                look = nxt()
+                i += 1
                 continue
 
-            if X == EPS:
-                emit("ε (pula)")
+            p = table[(X - T) * T + k]
+            if p < 0:
+                record(i, stack, X, look, "ERRO")
+                raise self._error(X, look, stack)
+
+            record(i, stack, X, look, p)
+            stack.extend(rprods[p])
+
+        return False, look, i
+
+    # Mesmo laço, montando a árvore: `nodes` anda junto com `stack` (nó de cada
+    # símbolo empilhado). Os filhos de uma expansão ocupam índices consecutivos.
+    def _run_tree(self, stack: List[int], nxt: Callable[[], Token], look: Token, tree) -> bool:
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table = g.table
+        prods = g.prods
+        rprods = g.rprods
+        sym, prod, first, sib, tok = tree.sym, tree.prod, tree.first, tree.next, tree.tok
+        tokens = tree.tokens
+        blank = [array('i', [-1]) * n for n in range(max(map(len, rprods), default=0) + 1)]
+        nodes = [-1, tree.add(g.start)]
+        k = look.kid
+
+        while stack:
+            X = stack.pop()
+            n = nodes.pop()
+
+            if X < T:
+                if X != k:
+                    raise self._error(X, look, stack)
+                tok[n] = len(tokens)
+                tokens.append(look)
+                if X == eof:
+                    return True
+                look = nxt()
+                k = look.kid
                 continue
 
-            row = self.table.get(X, {})
-            prod = row.get(look.kind)
+            p = table[(X - T) * T + k]
+            if p < 0:
+                raise self._error(X, look, stack)
+            prod[n] = p
+            rhs = prods[p][1]
+            m = len(rhs)
+            if m:
+                base = len(sym)
+                first[n] = base
+                sym.extend(rhs)
+                neg = blank[m]
+                prod.extend(neg)
+                first.extend(neg)
+                tok.extend(neg)
+                sib.extend(range(base + 1, base + m + 1))
+                sib[-1] = -1
+                stack.extend(rprods[p])
+                nodes.extend(range(base + m - 1, base - 1, -1))
+
+        return False
+
+    # Mesmo laço, com as ações de `hooks`: elas são símbolos na pilha, cuja
+    # linha na tabela de `hooks` é ACTION - a; o único custo a mais por passo é
+    # guardar o token casado (`prev`) para a callback
+    def _run_hooks(self, stack: List[int], nxt: Callable[[], Token], look: Token, hooks) -> bool:
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table = hooks.table
+        rprods = hooks.rprods
+        actions = hooks.actions
+        first = len(g.names)
+        pop = stack.pop
+        extend = stack.extend
+        prev = None
+        k = look.kid
+
+        while stack:
+            X = pop()
+
+            if X < T:
+                if X != k:
+                    raise self._error(X, look, stack)
+                prev = look
+                if X == eof:
+                    # ações que ainda esperavam depois do EOF (fim de Program)
+                    for Y in reversed(stack):
+                        if Y >= first:
+                            actions[Y - first](prev)
+                    return True
+                look = nxt()
+                k = look.kid
+                continue
+
+            p = table[(X - T) * T + k]
+            if p < 0:
+                if p == -1:
+                    raise self._error(X, look, stack)
+                actions[ACTION - p](prev)
+                continue
+            extend(rprods[p])
+
+        return False
+
+    # Mesmo laço, com contadores: tokens casados por tipo, expansões por
+    # produção e a maior altura da pilha.
+    def _run_stats(self, stack: List[int], nxt: Callable[[], Token], look: Token, stats) -> bool:
+        g = self.grammar
+        T = g.nterms
+        eof = g.eof
+        table = g.table
+        rprods = g.rprods
+        ntok = stats.token_counts
+        nprod = stats.prod_counts
+        depth = max(stats.max_stack, len(stack))
+        k = look.kid
+
+        try:
+            while stack:
+                X = stack.pop()
+
+                if X < T:
+                    if X != k:
+                        raise self._error(X, look, stack)
+                    ntok[X] += 1
+                    if X == eof:
+                        return True
+                    look = nxt()
+                    k = look.kid
+                    continue
+
+                p = table[(X - T) * T + k]
+                if p < 0:
+                    raise self._error(X, look, stack)
+                nprod[p] += 1
+                rhs = rprods[p]
+                if rhs:
+                    stack.extend(rhs)
+                    if len(stack) > depth:
+                        depth = len(stack)
+        finally:
+            stats.max_stack = depth
 
-            if not prod:
-                expected = _fmt_expected_row(row)
-                raise ParserError(
-                    f"{look.line}:{look.col}: O parser esperava {expected}, "
-                    f"mas veio {look.kind} '{look.lexeme}'"
-                )
+        return False
 
-            for sym in reversed(prod):
-                if sym != EPS:
-                    stack.append(sym)
+    # Modo com recuperação (panic mode): em vez de parar no primeiro erro,
+    # anota o diagnóstico e continua, usando FOLLOW como conjunto de sincronização:
+    #   - não-terminal A sem produção para o lookahead: desempilha A se o
+    #     lookahead está em FOLLOW(A) (ou é EOF); senão descarta o token;
+    #   - terminal esperado diferente do lookahead: finge que ele foi inserido;
+    #   - EOF esperado e ainda há tokens: descarta o token e volta ao nível de
+    #     comando (StmtList), para os erros do resto do arquivo aparecerem.
+    # Todo passo de recuperação consome um token ou desempilha um símbolo, então
+    # o custo continua linear. Depois de um erro, os seguintes só são relatados
+    # quando algum terminal volta a casar (evita cascata), e o parse para em
+    # `max_errors` diagnósticos.
+    def parse_recovering(self, tokens: Iterable[Token], max_errors: int = 100) -> List[ParserError]:
+        g = self.grammar
+        if g.original is not None:
+            return LL1Parser(g.original).parse_recovering(tokens, max_errors)
+        T = g.nterms
+        eof = g.eof
+        table = g.table
+        rprods = g.rprods
+        follow = g.follow
+        stack = [eof, g.start]
+        # EOF esperado e sobrou entrada (um `}` a mais no topo): o token é
+        # descartado e o parse volta ao nível de comando (o que vem antes do EOF
+        # em Program → StmtList EOF), em vez de engolir o resto do arquivo
+        resume = next((tuple(s for s in rhs if s != eof) for A, rhs in g.prods
+                       if A == g.start and rhs and rhs[-1] == eof), ())[::-1]
+        errors: List[ParserError] = []
+        quiet = False
+        nxt = iter(tokens).__next__
+        try:
+            look = nxt()
+            k = look.kid
+            while stack:
+                X = stack.pop()
 
-            emit(f"{X} → {' '.join(prod)}")
+                if X < T:
+                    if X == k:
+                        if X == eof:
+                            break
+                        look = nxt()
+                        k = look.kid
+                        quiet = False
+                        continue
+                    if not quiet:
+                        errors.append(self._error(X, look))
+                        if len(errors) >= max_errors:
+                            break
+                        quiet = True
+                    if X == eof:
+                        stack.append(X)
+                        stack.extend(resume)
+                        look = nxt()
+                        k = look.kid
+                    continue
 
-        return False, trace
+                p = table[(X - T) * T + k]
+                if p >= 0:
+                    stack.extend(rprods[p])
+                    continue
+                if not quiet:
+                    errors.append(self._error(X, look))
+                    if len(errors) >= max_errors:
+                        break
+                    quiet = True
+                if k != eof and k not in follow[X - T]:
+                    stack.append(X)
+                    look = nxt()
+                    k = look.kid
+        except StopIteration:
+            errors.append(ParserError("fim inesperado da entrada (sem token EOF)"))
+        return errors
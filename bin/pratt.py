@@ -0,0 +1,241 @@
+from array import array
+from typing import Callable, List, Optional, Tuple
+
+from .compiled import CompiledGrammar
+from .tokens import Token
+
+# Sub-parser de expressões por precedência de operadores, usado pelo
+# LL1Parser(grammar, pratt=True) quando ele expande Expr.
+#
+# Os níveis e operadores saem da própria gramática, seguindo a cadeia
+#   Expr → OrExpr,  OrExpr → AndExpr OrTail,  OrTail → OP_OU AndExpr OrTail | ε, …
+# até UnaryExpr (operadores prefixos) e Primary. Como o parser só reconhece
+# (não monta árvore), todos os níveis aceitam a mesma forma plana
+# `Unário (op Unário)*`, e o laço não precisa recursão nenhuma: parênteses e
+# chamadas abrem um contexto numa pilha explícita.
+#
+# O que o parser de tabela teria na pilha em cada ponto é conhecido (o nível
+# do último operador, os *Tail pendentes, o contexto aberto). Quando aparece
+# algo que o caminho rápido não trata (erro, ou um token que encerra a
+# expressão num lugar que não é o esperado), o sub-parser devolve essa pilha
+# e o LL1Parser continua dali pela tabela: aceitação e mensagens de erro são
+# exatamente as do parser de tabela.
+
+# contexto aberto: ( Expr ) ou ID ( args )
+_PAREN, _CALL = 1, 2
+# classe do token no começo de um operando (0 = não começa operando)
+_PREFIX, _ATOM, _IDENT, _OPEN = 1, 2, 3, 4
+
+# valor na tabela do LL1Parser que manda a expansão de Expr para cá
+PRATT = -2
+
+
+class ExprParser:
+    def __init__(self, g: CompiledGrammar):
+        self.grammar = g
+        T = g.nterms
+        ids = g.ids
+
+        def prods_of(A: int) -> List[Tuple[int, ...]]:
+            return [rhs for lhs, rhs in g.prods if lhs == A]
+
+        def need(cond: bool) -> None:
+            if not cond:
+                raise ValueError("a gramática não tem a forma esperada pelo parser de expressões")
+
+        need("Expr" in ids)
+        self.expr = ids["Expr"]
+
+        # cadeia de níveis: A → B Tail, Tail → op B Tail | ε
+        A = self.expr
+        levels = []  # (operando B, Tail, ops), do nível mais externo para o mais interno
+        while True:
+            ps = prods_of(A)
+            if len(ps) == 1 and len(ps[0]) == 1 and ps[0][0] >= T:
+                A = ps[0][0]
+                continue
+            if len(ps) == 1 and len(ps[0]) == 2 and ps[0][1] >= T:
+                B, tail = ps[0]
+                ops = []
+                for rhs in prods_of(tail):
+                    if rhs:
+                        need(len(rhs) == 3 and rhs[0] < T and rhs[1] == B and rhs[2] == tail)
+                        ops.append(rhs[0])
+                need(() in prods_of(tail))
+                levels.append((B, tail, ops))
+                A = B
+                continue
+            break
+        need(bool(levels))
+        self.unary = A
+        # *Tail pendentes depois de um operando, do mais interno para o mais externo
+        self.tails = tuple(tail for _, tail, _ in reversed(levels))
+        # pilha pendente (da esquerda para a direita) depois de um operador
+        # binário do nível n: o operando do nível e os *Tail de n para fora
+        self.after_op = [(B,) + self.tails[len(levels) - 1 - n:] for n, (B, _, _) in enumerate(levels)]
+
+        # Unário: op Unário (prefixo) ou Primary
+        prefix = []
+        primary = None
+        for rhs in prods_of(A):
+            if len(rhs) == 2 and rhs[0] < T and rhs[1] == A:
+                prefix.append(rhs[0])
+            else:
+                need(len(rhs) == 1 and rhs[0] >= T and primary is None)
+                primary = rhs[0]
+        need(primary is not None)
+        self.after_prefix = (A,) + self.tails
+
+        # Primary: literais, ( Expr ), ID PrimaryTail
+        atoms = []
+        self.open = self.close = self.ident = self.ptail = -1
+        for rhs in prods_of(primary):
+            if len(rhs) == 1 and rhs[0] < T:
+                atoms.append(rhs[0])
+            elif len(rhs) == 3 and rhs[1] == self.expr:
+                self.open, self.close = rhs[0], rhs[2]
+            else:
+                need(len(rhs) == 2 and rhs[0] < T and rhs[1] >= T)
+                self.ident, self.ptail = rhs
+        need(self.open >= 0 and self.ident >= 0)
+
+        # PrimaryTail → ( ArgListOpt ) | ε;  ArgListOpt → ArgList | ε
+        # ArgList → Expr ArgListTail;  ArgListTail → , Expr ArgListTail | ε
+        call = [rhs for rhs in prods_of(self.ptail) if rhs]
+        need(len(call) == 1 and len(call[0]) == 3 and call[0][0] == self.open and call[0][2] == self.close)
+        self.args_opt = call[0][1]
+        arg_list = [rhs for rhs in prods_of(self.args_opt) if rhs]
+        need(len(arg_list) == 1 and len(arg_list[0]) == 1)
+        al = prods_of(arg_list[0][0])
+        need(len(al) == 1 and len(al[0]) == 2 and al[0][0] == self.expr)
+        self.args_tail = al[0][1]
+        more = [rhs for rhs in prods_of(self.args_tail) if rhs]
+        need(len(more) == 1 and len(more[0]) == 3 and more[0][1] == self.expr)
+        self.comma = more[0][0]
+
+        # classe de cada terminal no começo de um operando / depois de um operando
+        self.kind = array('b', [0]) * T
+        self.level = array('b', [-1]) * T
+        for k in prefix:
+            self.kind[k] = _PREFIX
+        for k in atoms:
+            self.kind[k] = _ATOM
+        self.kind[self.ident] = _IDENT
+        self.kind[self.open] = _OPEN
+        # nível (índice em `levels`) de cada operador binário
+        for n, (_, _, ops) in enumerate(levels):
+            for k in ops:
+                self.level[k] = n
+
+        # ends[k]: depois de um operando, todos os *Tail vão para ε com k
+        # (a expressão acaba); ends_id[k]: o mesmo depois de um ID sem chamada
+        def eps(A: int, k: int) -> bool:
+            p = g.lookup(A, k)
+            return p >= 0 and not g.prods[p][1]
+
+        self.ends = bytearray(T)
+        self.ends_id = bytearray(T)
+        for k in range(T):
+            if all(eps(t, k) for t in self.tails):
+                self.ends[k] = 1
+                self.ends_id[k] = eps(self.ptail, k)
+        # um operador do nível n passa pelos *Tail mais internos (todos em ε)
+        for n, (_, _, ops) in enumerate(levels):
+            inner = self.tails[:len(levels) - 1 - n]
+            for k in ops:
+                need(all(eps(t, k) for t in inner) and eps(self.ptail, k))
+
+    # Pilha equivalente (ordem de empilhar: fundo → topo) do parser de tabela
+    # para o que ainda falta derivar: `pending` + o sufixo dos contextos.
+    def _stack(self, pending: List[int], ctx: List[int]) -> List[int]:
+        out: List[int] = []
+        for c in ctx:
+            if c == _PAREN:
+                out.extend(reversed(self.tails))
+                out.append(self.close)
+            elif c == _CALL:
+                out.extend(reversed(self.tails))
+                out.append(self.close)
+                out.append(self.args_tail)
+        out.extend(reversed(pending))
+        return out
+
+    # Reconhece uma expressão começando em `look` (que já está em FIRST(Expr)).
+    # Devolve (lookahead, None) quando a expressão acabou e a pilha do
+    # LL1Parser segue normalmente, ou (lookahead, pilha) para o LL1Parser
+    # empilhar e continuar pela tabela.
+    def parse(self, look: Token, nxt: Callable[[], Token]) -> Tuple[Token, Optional[List[int]]]:
+        kind, level, after_op = self.kind, self.level, self.after_op
+        ends, ends_id = self.ends, self.ends_id
+        tails = self.tails
+        open_, close, comma = self.open, self.close, self.comma
+        start, after_prefix = (self.expr,), self.after_prefix
+        ctx: List[int] = []
+        # o que a tabela teria na pilha enquanto espera um operando
+        want = start
+        k = look.kid
+
+        while True:
+            # operando: prefixos, depois literal / ID / ( Expr ) / ID ( args )
+            c = kind[k]
+            while c == _PREFIX:
+                want = after_prefix
+                look = nxt()
+                k = look.kid
+                c = kind[k]
+            if c == _ATOM:
+                look = nxt()
+                k = look.kid
+                end = ends
+            elif c == _IDENT:
+                look = nxt()
+                k = look.kid
+                if k != open_:
+                    end = ends_id
+                else:
+                    look = nxt()
+                    k = look.kid
+                    if kind[k] > 0:
+                        ctx.append(_CALL)
+                        want = start
+                        continue
+                    if k != close:
+                        return look, self._stack((self.args_opt, close) + tails, ctx)
+                    look = nxt()
+                    k = look.kid
+                    end = ends
+            elif c == _OPEN:
+                ctx.append(_PAREN)
+                want = start
+                look = nxt()
+                k = look.kid
+                continue
+            else:
+                return look, self._stack(want, ctx)
+
+            # depois do operando: operador binário, ou fim da expressão no contexto
+            while True:
+                n = level[k]
+                if n >= 0:
+                    want = after_op[n]
+                    look = nxt()
+                    k = look.kid
+                    break
+                if not end[k]:
+                    return look, self._stack(((self.ptail,) if end is ends_id else ()) + tails, ctx)
+                if not ctx:
+                    return look, None
+                c = ctx[-1]
+                if c == _CALL and k == comma:
+                    want = start
+                    look = nxt()
+                    k = look.kid
+                    break
+                if k != close:
+                    ctx.pop()
+                    pending = (self.args_tail, close) if c == _CALL else (close,)
+                    return look, self._stack(pending + tails, ctx)
+                ctx.pop()
+                look = nxt()
+                k = look.kid
+                end = ends
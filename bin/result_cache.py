@@ -0,0 +1,188 @@
+import hashlib
+import os
+import pickle
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .artifact import cache_dir, grammar_fingerprint
+
+# Cache em disco do resultado de parses, endereçado pelo conteúdo:
+#
+#   chave = sha256(fingerprint da gramática/léxico + bytes do fonte)
+#   results/ab/<chave>.r    status, linha, coluna, mensagem, nº de tokens e,
+#                           se pedido, a lista de tokens (pickle)
+#   results/cd/<stat>.s     índice por stat: caminho + tamanho + mtime + inode
+#                           → chave, para um arquivo inalterado nem ser lido
+#
+# Um acerto pelo índice custa um stat e duas leituras pequenas; lexer e parser
+# não rodam. Um arquivo modificado há menos de RACY_S segundos não entra no
+# índice (uma escrita no mesmo tick do mtime passaria despercebida), só pelo
+# conteúdo.
+#
+# Vários processos podem usar o mesmo diretório: toda escrita é num temporário
+# renomeado por cima (os.replace), e uma entrada que some entre o stat e a
+# leitura é só um erro de cache. Cada acerto atualiza o mtime da entrada, e
+# quando o diretório passa de `max_bytes` as entradas usadas há mais tempo são
+# apagadas (LRU aproximado, pelo mtime).
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+RACY_S = 2.0
+# estados que dependem só do conteúdo (io_error, timeout etc. não vão para o cache)
+CACHEABLE = ("ok", "rejected", "lex_error", "syntax_error")
+_FIELDS = ("status", "line", "col", "message", "tokens", "token_list")
+
+
+def result_cache_dir() -> str:
+    return os.path.join(cache_dir(), "results")
+
+
+class ResultCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 fingerprint: Optional[str] = None):
+        self.dir = directory or result_cache_dir()
+        self.max_bytes = max_bytes
+        self.fp = (fingerprint or grammar_fingerprint()).encode("ascii")
+        self.hits = 0
+        self.misses = 0
+        self._written = 0
+
+    def key(self, data: bytes) -> str:
+        h = hashlib.sha256(self.fp)
+        h.update(b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    def _stat_key(self, path: str, st: os.stat_result) -> str:
+        h = hashlib.sha256(self.fp)
+        h.update(repr((os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.dir, key[:2], key + ext)
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _write(self, path: str, data: bytes) -> None:
+        import tempfile
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self._written += len(data)
+        if self._written > self.max_bytes // 16:
+            self._written = 0
+            self.prune()
+
+    # resultado guardado para a chave; None se não há (ou não tem os tokens pedidos)
+    def get(self, key: str, tokens: bool = False) -> Optional[Dict[str, Any]]:
+        data = self._read(self._path(key, ".r"))
+        rec = None
+        if data is not None:
+            try:
+                rec = pickle.loads(data)
+            except Exception:
+                rec = None
+        if rec is None or (tokens and rec["status"] != "lex_error" and rec.get("token_list") is None):
+            return None
+        return rec
+
+    def put(self, key: str, rec: Dict[str, Any]) -> None:
+        if rec["status"] in CACHEABLE:
+            rec = {k: rec.get(k) for k in _FIELDS}
+            self._write(self._path(key, ".r"), pickle.dumps(rec, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # chave do conteúdo de `path` pelo índice de stat, sem ler o arquivo
+    def lookup_stat(self, path: str, st: os.stat_result) -> Optional[str]:
+        data = self._read(self._path(self._stat_key(path, st), ".s"))
+        return data.decode("ascii") if data else None
+
+    # acerto só pelo índice de stat (sem ler o fonte); None se não há
+    def lookup(self, path: str, tokens: bool = False) -> Optional[Dict[str, Any]]:
+        try:
+            key = self.lookup_stat(path, os.stat(path))
+        except OSError:
+            return None
+        rec = self.get(key, tokens) if key is not None else None
+        if rec is not None:
+            self.hits += 1
+        return rec
+
+    def index_stat(self, path: str, st: os.stat_result, key: str) -> None:
+        if time.time() - st.st_mtime > RACY_S:
+            self._write(self._path(self._stat_key(path, st), ".s"), key.encode("ascii"))
+
+    def prune(self) -> None:
+        entries = []
+        total = 0
+        try:
+            subdirs = list(os.scandir(self.dir))
+        except OSError:
+            return
+        for sub in subdirs:
+            if not sub.is_dir():
+                continue
+            try:
+                for e in os.scandir(sub.path):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+            except OSError:
+                continue
+        if total <= self.max_bytes:
+            return
+        # apaga as menos usadas até sobrar 90% do limite
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+    # Resultado de `run(texto)` para o fonte em `path` (ou os bytes `data`),
+    # passando pelo cache. Exceções de leitura/decodificação sobem para quem chamou.
+    def check(self, run: Callable[[str], Dict[str, Any]], path: Optional[str] = None,
+              data: Optional[bytes] = None, tokens: bool = False) -> Dict[str, Any]:
+        st = None
+        if path is not None:
+            rec = self.lookup(path, tokens)
+            if rec is not None:
+                return rec
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+        key = self.key(data)
+        rec = self.get(key, tokens)
+        if rec is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            rec = run(data.decode("utf-8"))
+            self.put(key, rec)
+        if st is not None:
+            self.index_stat(path, st, key)
+        return rec
@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional
+
+from .hooks import Hooks
+
+# Tabela de símbolos com escopos, preenchida durante o parse (sem segunda
+# passada pelos tokens):
+#
+#   table = SymbolTable()
+#   LL1Parser(grammar).parse(tokens, hooks=table.hooks())
+#   for e in table.errors: print(e)
+#
+# Escopos: o global, um por Block, um para os parâmetros de cada função (do
+# `(` ao fim do corpo) e um para o cabeçalho de cada for. Declarações: o ID
+# depois do tipo em DeclOrFunc, FunctionDeclVoid, ParamList/ParamListTail e
+# ForInit; o nome passa a valer logo ali (uma função pode chamar a si mesma e
+# `int x = x;` enxerga o próprio x, como em C). Os demais IDs são usos.
+#
+# Erros (SemanticError, com linha e coluna do ID):
+#   identificador usado sem declaração visível;
+#   nome declarado duas vezes no mesmo escopo (declarar de novo num escopo
+#   interno é sombreamento, permitido).
+
+
+class SemanticError(Exception):
+    def __init__(self, message: str, line: Optional[int] = None, col: Optional[int] = None):
+        super().__init__(message)
+        self.line = line
+        self.col = col
+
+
+class SymbolTable:
+    def __init__(self, max_errors: Optional[int] = None):
+        # nome -> token da declaração, do escopo global ao mais interno
+        self.scopes: List[Dict[str, object]] = [{}]
+        self.errors: List[SemanticError] = []
+        self.max_errors = max_errors
+        self.declarations = 0
+        self.uses = 0
+
+    def enter(self, tok=None) -> None:
+        self.scopes.append({})
+
+    def leave(self, tok=None) -> None:
+        if len(self.scopes) > 1:
+            self.scopes.pop()
+
+    def declare(self, tok) -> None:
+        self.declarations += 1
+        scope = self.scopes[-1]
+        name = tok.lexeme
+        prev = scope.get(name)
+        if prev is not None:
+            self._report(tok, f"'{name}' já declarado neste escopo (em {prev.line}:{prev.col})")
+            return
+        scope[name] = tok
+
+    def use(self, tok) -> None:
+        self.uses += 1
+        name = tok.lexeme
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return
+        self._report(tok, f"identificador '{name}' não declarado")
+
+    def _report(self, tok, message: str) -> None:
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append(SemanticError(f"{tok.line}:{tok.col}: {message}", tok.line, tok.col))
+
+    def lookup(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def hooks(self, hooks: Optional[Hooks] = None) -> Hooks:
+        h = hooks if hooks is not None else Hooks()
+        h.on_enter("Block", self.enter).on_exit("Block", self.leave)
+
+        # declarações: o ID logo depois do tipo
+        h.at("DeclOrFunc", 2, self.declare)
+        h.at("FunctionDeclVoid", 2, self.declare)
+        h.at("ParamList", 2, self.declare)
+        h.at("ParamListTail", 3, self.declare, rhs=("DELIM_VIRG", "Data_Type", "ID", "ParamListTail"))
+        h.at("ForInit", 2, self.declare, rhs=("Data_Type", "ID", "OP_ATRIB", "Expr"))
+
+        # escopo dos parâmetros: do `(` ao fim do corpo
+        func = ("DELIM_ABREP", "ParamListOpt", "DELIM_FECHAP", "Block")
+        h.at("DeclOrFuncTail", 1, self.enter, rhs=func).on_exit("DeclOrFuncTail", self.leave, rhs=func)
+        h.at("FunctionDeclVoid", 3, self.enter).on_exit("FunctionDeclVoid", self.leave)
+        # escopo do cabeçalho do for
+        h.at("ForStmt", 2, self.enter).on_exit("ForStmt", self.leave)
+
+        # usos
+        h.at("IdStmt", 1, self.use)
+        h.at("ForInit", 1, self.use, rhs=("ID", "OP_ATRIB", "Expr"))
+        h.at("ForAssign", 1, self.use)
+        h.at("Primary", 1, self.use, rhs=("ID", "PrimaryTail"))
+        return h
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import batch
+from .lexer import Lexer, LexerError
+from .parser import ParserError
+
+# Servidor de parse (python -m bin.main --serve): carrega a tabela uma vez e
+# atende pedidos em JSON Lines por um socket Unix (--socket) ou stdin/stdout:
+#   {"id": 1, "op": "parse" | "lex", "text": "..." | "path": "...", "timeout": 2.0}
+#   {"id": 2, "op": "cancel", "target": 1}   {"op": "ping"}   {"op": "shutdown"}
+# As respostas ({"id", "status", "line", "col", "message", "tokens", "time_ms"})
+# saem na ordem em que terminam; textos grandes vão para um pool de processos.
+
+DEFAULT_TIMEOUT = 30.0
+INLINE_MAX = 4096
+_BLOCK = 4096
+
+
+class _Timeout(Exception):
+    pass
+
+
+# um pedido já rodando num worker não pode ser interrompido de fora: ele mesmo
+# confere o prazo a cada bloco de tokens
+def _blocks(it: Iterator, deadline: float) -> Iterator[List]:
+    while True:
+        if time.perf_counter() > deadline:
+            raise _Timeout()
+        block = list(islice(it, _BLOCK))
+        if not block:
+            return
+        yield block
+
+
+# Roda no worker (ou no laço, para textos pequenos); _parse vem de batch._init_worker
+def run_request(op: str, text: Optional[str], path: Optional[str], timeout: float) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {"status": "ok", "line": None, "col": None, "message": None, "tokens": None}
+    t0 = time.perf_counter()
+    deadline = t0 + timeout
+    try:
+        if text is None:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        if op == "lex":
+            toks = [t for block in _blocks(Lexer(text).tokens(), deadline) for t in block]
+            rec["tokens"] = len(toks)
+            rec["token_list"] = [[t.kind, t.lexeme, t.line, t.col] for t in toks]
+        else:
+            toks, counter = batch._counting(Lexer(text).tokens())
+            if not batch._parse(chain.from_iterable(_blocks(toks, deadline))):
+                rec["status"] = "rejected"
+            rec["tokens"] = next(counter)
+    except LexerError as e:
+        rec.update(status="lex_error", line=e.line, col=e.col, message=str(e))
+    except ParserError as e:
+        rec.update(status="syntax_error", line=e.line, col=e.col, message=str(e), tokens=next(counter))
+    except (OSError, UnicodeDecodeError) as e:
+        rec.update(status="io_error", message=str(e))
+    except _Timeout:
+        rec.update(status="timeout", message=f"tempo esgotado ({timeout:g}s)")
+    rec["time_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    return rec
+
+
+class ParseServer:
+    def __init__(self, workers: int = 1, engine: str = "table", timeout: float = DEFAULT_TIMEOUT,
+                 inline_max: int = INLINE_MAX, art: Optional[Dict[str, Any]] = None):
+        if art is None:
+            from .artifact import load_artifact
+            art = load_artifact()
+        self.art = art
+        self.timeout = timeout
+        self.inline_max = inline_max
+        init = (art["grammar"], art["fingerprint"], engine)
+        batch._init_worker(*init)
+        self.pool = None
+        if workers > 0:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=batch._init_worker, initargs=init)
+            # sobe os workers já (com fork, todos no primeiro submit): ficam quentes
+            # e nascem antes da thread que lê stdin, cuja trava o filho herdaria
+            self.pool.submit(int).result()
+        self.stopped = asyncio.Event()
+        # tasks dos pedidos em andamento, de todas as conexões
+        self.inflight = set()
+
+    async def drain(self) -> None:
+        while self.inflight:
+            await asyncio.gather(*self.inflight, return_exceptions=True)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            # depois do drain, o que ainda roda num worker já foi respondido
+            procs = list((self.pool._processes or {}).values())
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            for proc in procs:
+                proc.terminate()
+            for proc in procs:
+                proc.join()
+            self.pool = None
+
+    def bad(self, rid: Any, message: str) -> Dict[str, Any]:
+        return {"id": rid, "status": "bad_request", "message": message}
+
+    async def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        rid = req.get("id")
+        op = req.get("op", "parse")
+        text, path = req.get("text"), req.get("path")
+        if op not in ("parse", "lex"):
+            return self.bad(rid, f"operação desconhecida: {op!r}")
+        if (text is None) == (path is None):
+            return self.bad(rid, "o pedido precisa de exatamente um de 'text' ou 'path'")
+        if not isinstance(text if path is None else path, str):
+            return self.bad(rid, "'text' e 'path' precisam ser strings")
+        timeout = req.get("timeout", self.timeout)
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            return self.bad(rid, "'timeout' precisa ser um número positivo")
+
+        if self.pool is None or (text is not None and len(text) <= self.inline_max):
+            rec = run_request(op, text, path, timeout)
+        else:
+            fut = asyncio.get_running_loop().run_in_executor(self.pool, run_request, op, text, path, timeout)
+            try:
+                # aqui o prazo conta desde a chegada (fila incluída); no worker, desde o início
+                rec = await asyncio.wait_for(fut, timeout)
+            except asyncio.TimeoutError:
+                rec = {"status": "timeout", "message": f"tempo esgotado ({timeout:g}s)"}
+        return {"id": rid, **rec}
+
+    async def serve_stream(self, reader: asyncio.StreamReader, send) -> None:
+        tasks: Dict[Any, asyncio.Task] = {}
+
+        async def run(key: Any, req: Dict[str, Any]) -> None:
+            try:
+                resp = await self.handle(req)
+            except asyncio.CancelledError:
+                resp = {"id": req.get("id"), "status": "cancelled"}
+            finally:
+                tasks.pop(key, None)
+            await send(resp)
+
+        while not self.stopped.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("o pedido precisa ser um objeto JSON")
+            except ValueError as e:
+                await send(self.bad(None, f"JSON inválido: {e}"))
+                continue
+            rid, op = req.get("id"), req.get("op", "parse")
+            if not isinstance(rid, (str, int, type(None))):
+                await send(self.bad(None, "'id' precisa ser string ou inteiro"))
+            elif op == "ping":
+                await send({"id": rid, "status": "ok", "fingerprint": self.art["fingerprint"][:16]})
+            elif op == "shutdown":
+                await send({"id": rid, "status": "ok"})
+                self.stopped.set()
+            elif op == "cancel":
+                task = tasks.get(req.get("target"))
+                if task is not None:
+                    task.cancel()
+                await send({"id": rid, "status": "ok" if task is not None else "not_found"})
+            elif rid is not None and rid in tasks:
+                await send(self.bad(rid, f"id {rid!r} já está em andamento"))
+            else:
+                key = rid if rid is not None else object()
+                tasks[key] = task = asyncio.create_task(run(key, req))
+                self.inflight.add(task)
+                task.add_done_callback(self.inflight.discard)
+
+        # conexão fechada ou shutdown: espera o que ainda está em andamento
+        if tasks:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+
+def _writer_send(writer: asyncio.StreamWriter):
+    async def send(obj: Dict[str, Any]) -> None:
+        writer.write(json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+    return send
+
+
+async def _serve_unix(server: ParseServer, path: str) -> None:
+    if os.path.exists(path):
+        os.unlink(path)
+
+    async def conn(reader, writer):
+        try:
+            await server.serve_stream(reader, _writer_send(writer))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    srv = await asyncio.start_unix_server(conn, path, limit=2 ** 31 - 1)
+    print(f"servidor ouvindo em {path}", file=sys.stderr)
+    try:
+        async with srv:
+            await server.stopped.wait()
+            srv.close()
+            await server.drain()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+async def _serve_stdio(server: ParseServer) -> None:
+    loop = asyncio.get_running_loop()
+    # stdin pode ser arquivo, pipe ou tty: lido numa thread e repassado ao laço
+    reader = asyncio.StreamReader(limit=2 ** 31 - 1)
+
+    def pump():
+        try:
+            for line in sys.stdin.buffer:
+                loop.call_soon_threadsafe(reader.feed_data, line)
+            loop.call_soon_threadsafe(reader.feed_eof)
+        except RuntimeError:
+            pass  # o laço já terminou (shutdown antes do fim do stdin)
+
+    threading.Thread(target=pump, daemon=True).start()
+    out = sys.stdout.buffer
+
+    async def send(obj: Dict[str, Any]) -> None:
+        out.write(json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n")
+        out.flush()
+
+    await server.serve_stream(reader, send)
+
+
+def serve(socket_path: Optional[str] = None, workers: int = 1, engine: str = "table",
+          timeout: float = DEFAULT_TIMEOUT) -> None:
+    server = ParseServer(workers=workers, engine=engine, timeout=timeout)
+    try:
+        asyncio.run(_serve_unix(server, socket_path) if socket_path else _serve_stdio(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
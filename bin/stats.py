@@ -0,0 +1,104 @@
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .compiled import CompiledGrammar
+
+# Contadores de perfil do parse (--stats). Só existem quando alguém pede:
+# LL1Parser.parse(tokens, stats=ParseStats()) roda um laço separado que conta,
+# e o caminho normal continua igual, sem nenhum teste a mais por passo.
+#
+#   stats = ParseStats()
+#   with stats.phase("léxico"):
+#       toks = list(Lexer(code).tokens())
+#   with stats.phase("parse"):
+#       LL1Parser(grammar).parse(toks, stats=stats)
+#   print("\n".join(stats.report()))
+
+
+class ParseStats:
+    def __init__(self):
+        self.grammar: Optional[CompiledGrammar] = None
+        # segundos por fase, na ordem em que foram medidas
+        self.times: Dict[str, float] = {}
+        # indexados por id de terminal / de produção (preenchidos em bind)
+        self.token_counts = array('q')
+        self.prod_counts = array('q')
+        self.max_stack = 0
+
+    def bind(self, grammar: CompiledGrammar) -> None:
+        if self.grammar is grammar:
+            return
+        self.grammar = grammar
+        self.token_counts = array('q', [0]) * grammar.nterms
+        self.prod_counts = array('q', [0]) * len(grammar.prods)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - t0
+
+    @property
+    def tokens(self) -> int:
+        return sum(self.token_counts)
+
+    @property
+    def expansions(self) -> int:
+        return sum(self.prod_counts)
+
+    # desempilhar um não-terminal por uma produção ε
+    @property
+    def epsilon_pops(self) -> int:
+        prods = self.grammar.prods
+        return sum(c for p, c in enumerate(self.prod_counts) if not prods[p][1])
+
+    def nonterm_counts(self) -> Dict[str, int]:
+        g = self.grammar
+        out: Dict[str, int] = {}
+        for p, c in enumerate(self.prod_counts):
+            if c:
+                A = g.names[g.prods[p][0]]
+                out[A] = out.get(A, 0) + c
+        return out
+
+    def tokens_per_sec(self) -> Optional[float]:
+        t = sum(self.times.get(k, 0.0) for k in ("léxico", "parse"))
+        return self.tokens / t if t > 0 else None
+
+    def report(self, top: int = 15) -> List[str]:
+        g = self.grammar
+        out = ["ESTATÍSTICAS:", "  tempo por fase:"]
+        for name, t in self.times.items():
+            out.append(f"    {name:<22} {t * 1e3:>10.3f} ms")
+        if g is None:
+            return out
+
+        ntok = self.tokens
+        nexp = self.expansions
+        out.append(f"  tokens casados:        {ntok}")
+        out.append(f"  expansões:             {nexp} ({self.epsilon_pops} por ε)")
+        if ntok:
+            out.append(f"  passos por token:      {(nexp + ntok) / ntok:.2f}")
+        out.append(f"  pilha máxima:          {self.max_stack}")
+        rate = self.tokens_per_sec()
+        if rate is not None:
+            out.append(f"  tokens/s (léxico+parse): {rate:,.0f}")
+
+        out.append("  tokens por tipo:")
+        for k in sorted(range(g.nterms), key=lambda k: -self.token_counts[k]):
+            if self.token_counts[k]:
+                out.append(f"    {g.names[k]:<22} {self.token_counts[k]:>10}")
+
+        out.append(f"  expansões por não-terminal (top {top}):")
+        for A, c in sorted(self.nonterm_counts().items(), key=lambda kv: -kv[1])[:top]:
+            out.append(f"    {A:<22} {c:>10}")
+
+        out.append(f"  expansões por produção (top {top}):")
+        for p in sorted(range(len(g.prods)), key=lambda p: -self.prod_counts[p])[:top]:
+            if self.prod_counts[p]:
+                out.append(f"    {self.prod_counts[p]:>10}  {g.fmt_prod(p)}")
+        return out
@@ -0,0 +1,125 @@
+from array import array
+from bisect import bisect_right
+from itertools import chain, repeat
+from typing import Iterator, Optional
+
+from .lexer import MASTER_RE, _GROUP_KID, LexerError, invalid_char_error
+from .tokens import TERMS, TERM_IDS
+
+# Tokens em colunas, em vez de um objeto Token por token:
+#   kind[i]   id do terminal (array 'H')
+#   start[i]  offset do início do lexema no texto (array 'I')
+#   end[i]    offset do fim
+# Linha e coluna saem de um índice com o início de cada linha, montado na
+# primeira consulta; o lexema é fatiado do texto só quando alguém lê.
+# São 10 bytes por token contra ~200 de um Token (objeto + 2 strings).
+#
+# Iterar o buffer devolve TokenView, que tem a mesma interface de Token
+# (kind, lexeme, line, col, kid), então LL1Parser, print_tokens e as
+# mensagens de erro funcionam sem mudança:
+#
+#   buf = TokenBuffer(code)
+#   LL1Parser(grammar).parse(buf)
+
+_EOF = TERM_IDS['EOF']
+
+
+class TokenView:
+    # kid fica copiado na view: é o único campo que o parser lê a cada passo
+    __slots__ = ("buf", "i", "kid")
+
+    def __init__(self, buf: "TokenBuffer", i: int, kid: int):
+        self.buf = buf
+        self.i = i
+        self.kid = kid
+
+    @property
+    def kind(self) -> str:
+        return TERMS[self.kid]
+
+    @property
+    def lexeme(self) -> str:
+        b = self.buf
+        return b.text[b.start[self.i]:b.end[self.i]]
+
+    @property
+    def line(self) -> int:
+        return self.buf.line_col(self.buf.start[self.i])[0]
+
+    @property
+    def col(self) -> int:
+        return self.buf.line_col(self.buf.start[self.i])[1]
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, '{self.lexeme}', {self.line}:{self.col})"
+
+
+class TokenBuffer:
+    def __init__(self, text: str):
+        self.text = text
+        code = 'I' if len(text) < 2 ** 32 else 'Q'
+        self.kind = array('H')
+        self.start = array(code)
+        self.end = array(code)
+        self._lines: Optional[array] = None
+        # erro léxico encontrado: só é levantado quando a iteração chega nele,
+        # como no Lexer (um erro sintático antes dele continua sendo o relatado)
+        self.error: Optional[LexerError] = None
+        self._lex()
+
+    def _lex(self) -> None:
+        text = self.text
+        n = len(text)
+        match = MASTER_RE.match
+        kids = _GROUP_KID
+        add_kind, add_start, add_end = self.kind.append, self.start.append, self.end.append
+        pos = 0
+        while pos < n:
+            m = match(text, pos)
+            if not m:
+                line, col = self.line_col(pos)
+                self.error = invalid_char_error(text, pos, line, col)
+                return
+            end = m.end()
+            kid = kids[m.lastindex]
+            if kid >= 0:
+                add_kind(kid)
+                add_start(pos)
+                add_end(end)
+            pos = end
+        add_kind(_EOF)
+        add_start(n)
+        add_end(n)
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def __getitem__(self, i: int) -> TokenView:
+        if i < 0:
+            i += len(self.kind)
+        if not 0 <= i < len(self.kind):
+            raise IndexError(i)
+        return TokenView(self, i, self.kind[i])
+
+    def __iter__(self) -> Iterator[TokenView]:
+        views = map(TokenView, repeat(self), range(len(self.kind)), self.kind)
+        return views if self.error is None else chain(views, self._raise())
+
+    def _raise(self) -> Iterator[TokenView]:
+        raise self.error
+        yield
+
+    def nbytes(self) -> int:
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self.kind, self.start, self.end))
+
+    def line_col(self, pos: int):
+        if self._lines is None:
+            text = self.text
+            starts = array('I' if len(text) < 2 ** 32 else 'Q', [0])
+            i = text.find('\n')
+            while i >= 0:
+                starts.append(i + 1)
+                i = text.find('\n', i + 1)
+            self._lines = starts
+        line = bisect_right(self._lines, pos)
+        return line, pos - self._lines[line - 1] + 1
@@ -1,12 +1,34 @@
-from dataclasses import dataclass
+from typing import Optional
 
 
-@dataclass
 class Token:
-    kind: str
-    lexeme: str
-    line: int
-    col: int
+    # Classe simples em vez de @dataclass: importar dataclasses (e inspect)
+    # pesava na partida do CLI. __slots__ também deixa cada token menor.
+    __slots__ = ("kind", "lexeme", "line", "col", "kid")
+
+    def __init__(self, kind: str, lexeme: str, line: int, col: int, kid: Optional[int] = None):
+        self.kind = kind
+        self.lexeme = lexeme
+        self.line = line
+        self.col = col
+        # id do terminal (posição em TERMS); o Lexer já passa, senão sai do kind
+        if kid is None:
+            if kind not in TERM_IDS:
+                raise ValueError(f"tipo de token desconhecido: {kind!r}")
+            kid = TERM_IDS[kind]
+        self.kid = kid
+
+    def __repr__(self) -> str:
+        return (f"Token(kind={self.kind!r}, lexeme={self.lexeme!r}, line={self.line!r}, "
+                f"col={self.col!r}, kid={self.kid!r})")
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.kind, self.lexeme, self.line, self.col, self.kid) == \
+            (other.kind, other.lexeme, other.line, other.col, other.kid)
+
+    __hash__ = None
 
 
 # Terminologias mapeadas para SEUS nomes de token
@@ -26,4 +48,7 @@ TERMS = [
     'SE','SENAO','ENQUANTO','PARA','FACA','RETORNA','ESCREVA',
     # Identificador + EOF
     'ID','EOF'
-]
\ No newline at end of file
+]
+
+# id inteiro de cada terminal (usado pela gramática compilada)
+TERM_IDS = {t: i for i, t in enumerate(TERMS)}
@@ -0,0 +1,294 @@
+import argparse
+import json
+import mmap
+import struct
+import sys
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .compiled import CompiledGrammar
+
+# Trace do parser gravado em arquivo enquanto o parse roda, em vez de uma lista
+# de dicts em memória. Um sink tem a mesma interface do TraceRecorder, então
+# basta passá-lo ao parser:
+#
+#   with open_sink("trace.bin") as sink:
+#       LL1Parser(grammar).parse(tokens, trace=sink)
+#
+# Cada passo grava só o delta da pilha: o símbolo desempilhado e, numa
+# expansão, o número da produção empilhada. O cabeçalho traz os nomes dos
+# símbolos e as produções, então o arquivo se lê sem a gramática; a pilha
+# completa de qualquer passo é refeita repetindo os deltas desde o começo:
+#
+#   python -m bin.trace_file trace.bin --from 1000 --to 1050
+#
+# Formatos:
+#   jsonl  cabeçalho numa linha, depois um objeto por passo:
+#          {"pop": "Statement", "act": "EXPAND", "prod": 12, "la": "ID", "lex": "x"}
+#   bin    MAGIC, versão, cabeçalho JSON e registros de 3 ou 5 bytes; o
+#          lookahead (tipo + lexema) é gravado só quando muda.
+
+MAGIC = b"LBXT"
+VERSION = 1
+FORMATS = ("jsonl", "bin")
+
+_LOOK, _EXPAND, _MATCH, _ERROR, _ACCEPT = range(5)
+_ACTIONS = {"ERRO": _ERROR, "ACCEPT": _ACCEPT}
+_NAMES = {_EXPAND: "EXPAND", _MATCH: "MATCH", _ERROR: "ERRO", _ACCEPT: "ACCEPT"}
+_REC = struct.Struct("<BHH")
+_REC_POP = struct.Struct("<BH")
+_LEN32 = struct.Struct("<I")
+
+
+def _header(g: CompiledGrammar) -> Dict[str, Any]:
+    return {
+        "trace": "lockbixo",
+        "version": VERSION,
+        "names": list(g.names),
+        "start": g.start,
+        "eof": g.eof,
+        "prods": [[A, list(rhs)] for A, rhs in g.prods],
+        "prod_text": [g.fmt_prod(p) for p in range(len(g.prods))],
+    }
+
+
+class TraceSink(ABC):
+    # limit: para de gravar depois de tantos passos (o parser segue pelo caminho rápido)
+    def __init__(self, f: BinaryIO, limit: Optional[int] = None):
+        self.f = f
+        self.limit = limit if limit and limit > 0 else None
+        self.steps = 0
+        self.failed = False
+        self.done = False
+        self.grammar: Optional[CompiledGrammar] = None
+
+    def bind(self, grammar: CompiledGrammar) -> None:
+        if self.grammar is None:
+            self.grammar = grammar
+            self._start(grammar)
+
+    # grava o cabeçalho; só no primeiro bind, quando a gramática é conhecida
+    @abstractmethod
+    def _start(self, g: CompiledGrammar) -> None:
+        ...
+
+    @abstractmethod
+    def record(self, i: int, stack: List[int], X: int, look, action) -> None:
+        ...
+
+    # o sink não guarda nada em memória: o parser devolve uma lista vazia
+    def events(self) -> List[Dict[str, Any]]:
+        return []
+
+    def close(self) -> None:
+        self.f.close()
+
+    def __enter__(self) -> "TraceSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _count(self) -> None:
+        self.steps += 1
+        if self.limit is not None and self.steps >= self.limit:
+            self.done = True
+
+
+class JsonlTraceSink(TraceSink):
+    def _start(self, g: CompiledGrammar) -> None:
+        self._names = [json.dumps(n, ensure_ascii=False) for n in g.names]
+        self._i = -1
+        self._la = ""
+        self.f.write(json.dumps(_header(g), ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def record(self, i: int, stack: List[int], X: int, look, action) -> None:
+        if i != self._i:
+            # o mesmo lookahead vale para vários passos: escapa uma vez só
+            self._i = i
+            self._la = (f'"la": {self._names[look.kid]}, "lex": '
+                        f'{json.dumps(look.lexeme, ensure_ascii=False)}}}\n')
+        if isinstance(action, int):
+            line = f'{{"pop": {self._names[X]}, "act": "EXPAND", "prod": {action}, {self._la}'
+        else:
+            act = "MATCH" if action not in _ACTIONS else action
+            line = f'{{"pop": {self._names[X]}, "act": "{act}", {self._la}'
+        self.f.write(line.encode("utf-8"))
+        self._count()
+
+
+class BinaryTraceSink(TraceSink):
+    def _start(self, g: CompiledGrammar) -> None:
+        self._i = -1
+        self._buf = bytearray()
+        head = json.dumps(_header(g), ensure_ascii=False).encode("utf-8")
+        self.f.write(MAGIC + bytes((VERSION,)) + _LEN32.pack(len(head)) + head)
+
+    def record(self, i: int, stack: List[int], X: int, look, action) -> None:
+        buf = self._buf
+        if i != self._i:
+            self._i = i
+            lex = look.lexeme.encode("utf-8")
+            buf += _REC.pack(_LOOK, look.kid, min(len(lex), 0xFFFF))
+            if len(lex) >= 0xFFFF:
+                buf += _LEN32.pack(len(lex))
+            buf += lex
+        if isinstance(action, int):
+            buf += _REC.pack(_EXPAND, X, action)
+        else:
+            buf += _REC_POP.pack(_ACTIONS.get(action, _MATCH), X)
+        if len(buf) >= 1 << 16:
+            self.f.write(buf)
+            buf.clear()
+        self._count()
+
+    def close(self) -> None:
+        if self.grammar is not None:
+            self.f.write(self._buf)
+        self.f.close()
+
+
+def open_sink(path: str, fmt: str = "bin", limit: Optional[int] = None) -> TraceSink:
+    if fmt not in FORMATS:
+        raise ValueError(f"formato de trace inválido: {fmt!r}")
+    cls = BinaryTraceSink if fmt == "bin" else JsonlTraceSink
+    return cls(open(path, "wb"), limit)
+
+
+# ---------------------------------------------------------------- leitura
+
+# Passo bruto: (ação, símbolo desempilhado, produção ou -1, tipo do lookahead, lexema)
+Step = Tuple[int, int, int, str, str]
+
+
+def _read_jsonl(path: str, offset: int, header: Dict[str, Any]) -> Iterator[Step]:
+    ids = {n: i for i, n in enumerate(header["names"])}
+    codes = {v: k for k, v in _NAMES.items()}
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            ev = json.loads(line)
+            yield codes[ev["act"]], ids[ev["pop"]], ev.get("prod", -1), ev["la"], ev["lex"]
+
+
+def _read_bin(path: str, offset: int, header: Dict[str, Any]) -> Iterator[Step]:
+    names = header["names"]
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return
+    with data:
+        pos = offset
+        n = len(data)
+        kind, lex = "", ""
+        while pos < n:
+            code = data[pos]
+            if code == _LOOK or code == _EXPAND:
+                _, a, b = _REC.unpack_from(data, pos)
+                pos += _REC.size
+                if code == _EXPAND:
+                    yield _EXPAND, a, b, kind, lex
+                    continue
+                if b == 0xFFFF:
+                    (b,) = _LEN32.unpack_from(data, pos)
+                    pos += _LEN32.size
+                kind, lex = names[a], data[pos:pos + b].decode("utf-8")
+                pos += b
+            else:
+                _, X = _REC_POP.unpack_from(data, pos)
+                pos += _REC_POP.size
+                yield code, X, -1, kind, lex
+
+
+# Lê o cabeçalho e devolve os passos num iterador preguiçoso: o arquivo só é
+# aberto (e é fechado) quando os passos são percorridos.
+def read_trace(path: str) -> Tuple[Dict[str, Any], Iterator[Step]]:
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if not magic:
+            # sink fechado antes do parse começar (ex.: erro léxico no primeiro token)
+            raise ValueError(f"{path}: trace vazio, nenhum passo foi gravado")
+        try:
+            if magic == MAGIC:
+                version = f.read(1)
+                if version != bytes((VERSION,)):
+                    raise ValueError(f"{path}: versão de trace não suportada: "
+                                     f"{version[0] if version else '?'} (esperada {VERSION})")
+                (size,) = _LEN32.unpack(f.read(_LEN32.size))
+                header = json.loads(f.read(size))
+                read = _read_bin
+            else:
+                header = json.loads(magic + f.readline())
+                read = _read_jsonl
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError(f"{path}: não é um trace do parser") from None
+        offset = f.tell()
+    if not isinstance(header, dict) or header.get("trace") != "lockbixo":
+        raise ValueError(f"{path}: não é um trace do parser")
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path}: versão de trace não suportada: {header.get('version')} (esperada {VERSION})")
+    return header, read(path, offset, header)
+
+
+# Eventos (no formato de TraceRecorder.events) dos passos lo..hi-1: a pilha é
+# refeita aplicando os deltas desde o passo 0; só os passos pedidos viram dict.
+def replay(header: Dict[str, Any], steps: Iterator[Step], lo: int = 0,
+           hi: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    names = header["names"]
+    prod_text = header["prod_text"]
+    rprods = [tuple(reversed(rhs)) for _, rhs in header["prods"]]
+    stack = [header["eof"], header["start"]]
+    i = 0
+    for n, (code, X, p, kind, lex) in enumerate(islice(steps, hi)):
+        top = stack.pop() if stack else None
+        if top != X:
+            raise ValueError(f"trace inconsistente no passo {n}: topo {top!r}, evento {names[X]}")
+        if n >= lo:
+            if code == _EXPAND:
+                action = prod_text[p]
+            elif code == _MATCH:
+                action = f"MATCH '{lex}'"
+            else:
+                action = _NAMES[code]
+            yield {
+                "i": i,
+                "step": n,
+                "stack": [names[X]] + [names[s] for s in reversed(stack)],
+                "X": names[X],
+                "lookahead": kind,
+                "look_lexeme": lex,
+                "action": action,
+            }
+        if code == _EXPAND:
+            stack.extend(rprods[p])
+        elif code == _MATCH:
+            i += 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description="lê um trace gravado com --trace-out e mostra a pilha de cada passo")
+    ap.add_argument("path", help="arquivo de trace (.jsonl ou binário)")
+    ap.add_argument("--from", dest="lo", type=int, default=0, help="primeiro passo (0 = início)")
+    ap.add_argument("--to", dest="hi", type=int, help="passo final, exclusivo (padrão: --from + 200)")
+    ap.add_argument("--json", action="store_true", help="um evento JSON por linha em vez da tabela")
+    args = ap.parse_args()
+
+    hi = args.hi if args.hi is not None else args.lo + 200
+    try:
+        header, steps = read_trace(args.path)
+    except (OSError, ValueError) as e:
+        ap.error(str(e))
+    events = replay(header, steps, args.lo, hi)
+    if args.json:
+        out = sys.stdout
+        for ev in events:
+            out.write(json.dumps(ev, ensure_ascii=False) + "\n")
+    else:
+        from .main import print_trace
+        print_trace(list(events))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from array import array
+from typing import Iterator, List
+
+from .compiled import CompiledGrammar
+
+# Árvore sintática numa arena de arrays paralelos de int (um índice por nó),
+# preenchida pelo LL1Parser à medida que aplica produções:
+#   sym[n]   símbolo (id da gramática compilada)
+#   prod[n]  produção aplicada (não-terminal) ou -1
+#   first[n] primeiro filho ou -1
+#   next[n]  próximo irmão ou -1
+#   tok[n]   índice em `tokens` (terminal casado) ou -1
+# O nó 0 é a raiz. Cada nó custa 5 x 4 = 20 bytes de dados; medido com
+# tracemalloc (exemplos/04_mistura.lbx, 1x e 200x) dá 21-22 bytes/nó com a
+# folga de crescimento dos arrays. Um objeto com __slots__ para os mesmos 5
+# campos custa ~80 bytes e um dict ~190. A AST de simplify() fica com ~1/3
+# dos nós da árvore completa.
+#
+#   tree = ParseTree(grammar)
+#   LL1Parser(grammar).parse(tokens, tree=tree)
+#   ast = tree.simplify()
+
+
+class ParseTree:
+    def __init__(self, grammar: CompiledGrammar):
+        self.grammar = grammar
+        self.sym = array('i')
+        self.prod = array('i')
+        self.first = array('i')
+        self.next = array('i')
+        self.tok = array('i')
+        # tokens casados, na ordem da entrada
+        self.tokens: List = []
+
+    def __len__(self) -> int:
+        return len(self.sym)
+
+    def add(self, sym: int, prod: int = -1, tok: int = -1) -> int:
+        self.sym.append(sym)
+        self.prod.append(prod)
+        self.first.append(-1)
+        self.next.append(-1)
+        self.tok.append(tok)
+        return len(self.sym) - 1
+
+    def children(self, n: int) -> Iterator[int]:
+        c = self.first[n]
+        while c >= 0:
+            yield c
+            c = self.next[c]
+
+    def name(self, n: int) -> str:
+        return self.grammar.names[self.sym[n]]
+
+    def token(self, n: int):
+        t = self.tok[n]
+        return self.tokens[t] if t >= 0 else None
+
+    def nbytes(self) -> int:
+        return sum(a.buffer_info()[1] * a.itemsize
+                   for a in (self.sym, self.prod, self.first, self.next, self.tok))
+
+    # AST simplificada: some com não-terminais vazios (produções ε) e cada
+    # não-terminal com um único filho é trocado pelo filho, o que colapsa as
+    # cadeias Expr → OrExpr → AndExpr → … → Primary. Devolve outra arena.
+    def simplify(self) -> "ParseTree":
+        out = ParseTree(self.grammar)
+        out.tokens = self.tokens
+        if not len(self):
+            return out
+        T = self.grammar.nterms
+        sym, first, nxt = self.sym, self.first, self.next
+
+        # filhos vêm sempre depois do pai na arena: um passe de trás para
+        # frente marca quem tem algum terminal embaixo
+        alive = bytearray(len(self))
+        for n in range(len(self) - 1, -1, -1):
+            if sym[n] < T:
+                alive[n] = 1
+                continue
+            c = first[n]
+            while c >= 0:
+                if alive[c]:
+                    alive[n] = 1
+                    break
+                c = nxt[c]
+
+        def keep(n: int) -> int:
+            # desce pelos nós de filho único
+            while sym[n] >= T:
+                kids = [c for c in self.children(n) if alive[c]]
+                if len(kids) != 1:
+                    return n
+                n = kids[0]
+            return n
+
+        root = keep(0)
+        out.add(sym[root], self.prod[root], self.tok[root])
+        work = [(root, 0)]
+        while work:
+            n, m = work.pop()
+            if sym[n] < T:
+                continue
+            prev = -1
+            for c in self.children(n):
+                if not alive[c]:
+                    continue
+                c = keep(c)
+                k = out.add(sym[c], self.prod[c], self.tok[c])
+                if prev < 0:
+                    out.first[m] = k
+                else:
+                    out.next[prev] = k
+                prev = k
+                work.append((c, k))
+        return out
+
+    def lines(self, n: int = 0) -> List[str]:
+        out: List[str] = []
+        if not len(self):
+            return out
+        work = [(n, 0)]
+        while work:
+            n, depth = work.pop()
+            t = self.token(n)
+            if t is not None:
+                out.append(f"{'  ' * depth}{self.name(n)} '{t.lexeme}' ({t.line}:{t.col})")
+            else:
+                out.append(f"{'  ' * depth}{self.name(n)}")
+            work.extend((c, depth + 1) for c in reversed(list(self.children(n))))
+        return out
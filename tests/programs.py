@@ -0,0 +1,119 @@
+import glob
+import os
+import random
+import re
+from typing import Iterator, List, Optional
+
+from bin.artifact import load_artifact
+from bin.generator import SHAPES, ProgramGenerator
+from bin.lexer import Lexer, LexerError
+from bin.parser import LL1Parser, ParserError
+from bin.tokens import TERMS, Token
+
+# Entradas comuns aos testes: os exemplos, programas do gerador e versões
+# deles com erros inseridos.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXEMPLOS = sorted(glob.glob(os.path.join(ROOT, "exemplos", "*.lbx")))
+
+_artifact = None
+
+
+def artifact():
+    global _artifact
+    if _artifact is None:
+        _artifact = load_artifact()
+    return _artifact
+
+
+def read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# `n` programas aleatórios, passando por todos os shapes do gerador
+def generated(n: int, seed: int = 0, min_tokens: int = 5, max_tokens: int = 300) -> Iterator[str]:
+    g = artifact()["grammar"]
+    rng = random.Random(seed)
+    shapes = sorted(SHAPES)
+    for i in range(n):
+        gen = ProgramGenerator(g, seed * 1000 + i, shapes[i % len(shapes)])
+        yield "".join(gen.generate(tokens=rng.randint(min_tokens, max_tokens)))
+
+
+# Cópias de `toks` com um token apagado, trocado ou inserido
+def token_mutations(toks: List[Token], rng: random.Random, n: int) -> Iterator[List[Token]]:
+    for _ in range(n):
+        t = list(toks)
+        i = rng.randrange(len(t) - 1)
+        kind = TERMS[rng.randrange(len(TERMS) - 1)]  # qualquer terminal menos EOF
+        tok = Token(kind, "x", t[i].line, t[i].col)
+        op = rng.random()
+        if op < 0.3:
+            del t[i]
+        elif op < 0.6:
+            t[i] = tok
+        else:
+            t.insert(i, tok)
+        yield t
+
+
+_cases: Optional[List[List[Token]]] = None
+
+
+# Listas de tokens para comparar parsers: exemplos, programas gerados e mutações
+def parse_cases() -> List[List[Token]]:
+    global _cases
+    if _cases is None:
+        rng = random.Random(5)
+        _cases = [toks for toks in map(lex, map(read, EXEMPLOS)) if toks is not None]
+        for text in generated(80):
+            toks = list(Lexer(text).tokens())
+            _cases.append(toks)
+            _cases.extend(token_mutations(toks, rng, 8))
+    return _cases
+
+
+def table_parse():
+    parser = LL1Parser(artifact()["grammar"])
+    return lambda toks: parser.parse(toks)[0]
+
+
+# (aceito, mensagem de erro ou None)
+def outcome(parse, toks) -> tuple:
+    try:
+        return parse(iter(toks)), None
+    except ParserError as e:
+        return False, str(e)
+
+
+def lex(text: str) -> Optional[List[Token]]:
+    try:
+        return list(Lexer(text).tokens())
+    except LexerError:
+        return None
+
+
+def show(toks: List[Token], limit: int = 400) -> str:
+    return " ".join(t.lexeme or t.kind for t in toks)[:limit]
+
+
+_PIECES = [";", "(", ")", "{", "}", "x", "1", "+", "==", "int", "if", "else", "while", "do", ",", "!",
+           '"s"', "void", "=", "for", "return", "write", "1.5", "'c'", "true", "&&", "||", "<=", "%",
+           "/*", "*/", "//", '"', "~"]
+
+
+# Cópias de `text` com 1 a 3 edições de texto (inclusive erros léxicos)
+def text_mutations(text: str, rng: random.Random, n: int) -> Iterator[str]:
+    for _ in range(n):
+        parts = re.findall(r"\S+|\s+", text)
+        for _ in range(rng.randint(1, 3)):
+            k = rng.randrange(len(parts))
+            op = rng.random()
+            if op < 0.4:
+                parts[k] = ""
+            elif op < 0.8:
+                parts.insert(k, " " + rng.choice(_PIECES) + " ")
+            else:
+                parts[k] = rng.choice(_PIECES)
+        yield "".join(parts)
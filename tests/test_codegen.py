@@ -0,0 +1,43 @@
+from bin.codegen import generate_parser_source, load_generated_parser
+from bin.lexer import Lexer
+
+from .programs import artifact, outcome, parse_cases, show, table_parse
+
+# O parser gerado aceita e rejeita as mesmas entradas que o LL1Parser, com a
+# mesma mensagem de erro, inclusive com aninhamento além do limite de recursão.
+
+
+def _generated():
+    art = artifact()
+    ns = {}
+    exec(compile(generate_parser_source(art["grammar"], art["fingerprint"]), "<gerado>", "exec"), ns)
+    return ns["parse"]
+
+
+def test_same_outcome_as_table():
+    generated, table = _generated(), table_parse()
+    for toks in parse_cases():
+        assert outcome(generated, toks) == outcome(table, toks), show(toks)
+
+
+def test_deep_nesting():
+    generated, table = _generated(), table_parse()
+    n = 3000
+    for text in ("int x = " + "(" * n + "1" + ")" * n + ";",
+                 "int x = " + "(" * n + "1" + ")" * (n - 1) + ";",
+                 "void f() { " + "{" * n + " x = (1; " + "}" * n + " }",
+                 "void f() { " + "while (1) " * n + "x = 1; }",
+                 "int x = " + "-" * n + "1;"):
+        toks = list(Lexer(text).tokens())
+        assert outcome(generated, toks) == outcome(table, toks), text[:80]
+
+
+def test_unusable_cache_dir(tmp_path, monkeypatch, capsys):
+    # um arquivo no caminho do cache: avisa e usa o módulo só em memória
+    blocker = tmp_path / "arquivo"
+    blocker.write_text("")
+    monkeypatch.setenv("LOCKBIXO_CACHE_DIR", str(blocker / "cache"))
+    art = artifact()
+    module = load_generated_parser(art["grammar"], art["fingerprint"])
+    assert "aviso:" in capsys.readouterr().err
+    assert module.parse(Lexer("int x = (1 + 2) * 3;").tokens())
@@ -0,0 +1,42 @@
+import random
+from array import array
+
+from bin.comb import CombTable
+from bin.parser import LL1Parser
+
+from .programs import artifact, outcome, parse_cases, show, table_parse
+
+# A tabela comb devolve as mesmas células que a matriz plana, e o parse por
+# ela (também com o Pratt) tem o mesmo resultado.
+
+
+def test_lookup_matches_flat_table():
+    g = artifact()["grammar"]
+    T = g.nterms
+    comb = CombTable(g.table, T)
+    for r in range(len(g.table) // T):
+        for k in range(T):
+            assert comb.lookup(r, k) == g.table[r * T + k]
+
+
+def test_lookup_random_tables():
+    rng = random.Random(0)
+    for _ in range(50):
+        T = rng.randint(1, 12)
+        N = rng.randint(1, 12)
+        rows = [[rng.choice([-1, -1, -1, rng.randrange(20)]) for _ in range(T)] for _ in range(N // 2 + 1)]
+        table = array("h", [c for _ in range(N) for c in rng.choice(rows)])
+        comb = CombTable(table, T)
+        for r in range(N):
+            for k in range(T):
+                assert comb.lookup(r, k) == table[r * T + k]
+
+
+def test_same_outcome_as_table():
+    g = artifact()["grammar"]
+    table = table_parse()
+    for pratt in (False, True):
+        parser = LL1Parser(g, pratt=pratt, comb=True)
+        comb = lambda toks: parser.parse(toks)[0]
+        for toks in parse_cases():
+            assert outcome(comb, toks) == outcome(table, toks), show(toks)
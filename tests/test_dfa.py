@@ -0,0 +1,39 @@
+import random
+
+from bin.dfa import DFALexer
+from bin.lexer import Lexer, LexerError
+
+from .programs import EXEMPLOS, generated, read, text_mutations
+
+# DFALexer contra o Lexer: mesmos tokens (tipo, lexema, linha, coluna, id) e
+# mesmos erros léxicos. A única diferença esperada é um ID que começa com uma
+# palavra-chave (`integer`, `int1`), que o Lexer corta em `int` + `eger`.
+
+
+def _lex(lexer, text):
+    try:
+        return [(t.kind, t.lexeme, t.line, t.col, t.kid) for t in lexer(text).tokens()]
+    except LexerError as e:
+        return str(e)
+
+
+def _keyword_prefix(toks) -> bool:
+    return any(a[0] != "ID" and a[1][-1:].isalpha() and (b[1][:1].isalnum() or b[1][:1] == "_")
+               and a[2] == b[2] and a[3] + len(a[1]) == b[3]
+               for a, b in zip(toks, toks[1:]))
+
+
+def test_same_tokens_as_lexer():
+    rng = random.Random(3)
+    texts = [read(p) for p in EXEMPLOS]
+    for text in texts[:5]:
+        texts.extend(text_mutations(text, rng, 60))
+    texts.extend(generated(40, seed=2))
+    checked = 0
+    for text in texts:
+        a = _lex(Lexer, text)
+        if isinstance(a, list) and _keyword_prefix(a):
+            continue
+        assert _lex(DFALexer, text) == a, text[:200]
+        checked += 1
+    assert checked > len(texts) // 2
@@ -0,0 +1,44 @@
+import random
+
+from bin.incremental import IncrementalParse
+from bin.lexer import Lexer, LexerError
+from bin.parser import LL1Parser, ParserError
+
+from .programs import EXEMPLOS, artifact, read, text_mutations
+
+# Edições aleatórias num IncrementalParse contra o parse do texto inteiro do
+# zero: mesmo resultado, mesma mensagem de erro e mesmos tokens.
+
+_SNIPPETS = ["{", "}", ";", "/*", "*/", "//", "\n", '"', "x", "int ", "12.5", ".", " ", "while(a<b){",
+             "}else{", "/", "*", "return 1;", "if", "a = b + c;"]
+
+
+def _fresh(parser, text):
+    try:
+        toks = list(Lexer(text).tokens())
+    except LexerError as e:
+        return None, (False, str(e))
+    try:
+        return toks, (parser.parse(toks)[0], None)
+    except ParserError as e:
+        return toks, (False, str(e))
+
+
+def test_edits_match_fresh_parse():
+    g = artifact()["grammar"]
+    parser = LL1Parser(g)
+    rng = random.Random(0)
+    texts = [read(p) for p in EXEMPLOS[:5]]
+    texts += [t for text in texts for t in text_mutations(text, rng, 3)]
+    for text in texts:
+        inc = IncrementalParse(g, text)
+        for _ in range(40):
+            n = len(inc.text)
+            offset = rng.randint(0, n)
+            removed = rng.randint(0, min(4, n - offset))
+            inserted = rng.choice(_SNIPPETS) if rng.random() < 0.7 else ""
+            ok, err = inc.edit(offset, removed, inserted)
+            toks, expected = _fresh(parser, inc.text)
+            assert (ok, None if err is None else str(err)) == expected, inc.text[:200]
+            if toks is not None:
+                assert inc.tokens() == toks, inc.text[:200]
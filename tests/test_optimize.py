@@ -0,0 +1,18 @@
+import pytest
+
+from bin.parser import LL1Parser
+
+from .programs import artifact, outcome, parse_cases, show, table_parse
+
+# A gramática otimizada aceita e rejeita as mesmas entradas que a original,
+# com a mesma mensagem de erro (nos símbolos originais).
+
+
+def test_same_outcome_as_table():
+    art = artifact()
+    if art["optimized"] is None:
+        pytest.skip("gramática otimizada indisponível")
+    parser = LL1Parser(art["optimized"])
+    optimized, table = (lambda toks: parser.parse(toks)[0]), table_parse()
+    for toks in parse_cases():
+        assert outcome(optimized, toks) == outcome(table, toks), show(toks)
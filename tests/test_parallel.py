@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import bin.parallel as parallel
+from bin.bytes_lexer import BytesLexer, SourceBuffer
+from bin.lexer import LexerError
+from bin.parser import LL1Parser, ParserError
+
+from .programs import artifact, generated
+
+# parse_parallel contra o parse sequencial do mesmo arquivo, válido e com um
+# trecho estragado (erro sintático ou léxico): mesmo resultado e mesma mensagem.
+
+
+def _sequential(g, path):
+    try:
+        with SourceBuffer.open(path) as src:
+            return True, LL1Parser(g).parse(BytesLexer(src).tokens())[0]
+    except (ParserError, LexerError) as e:
+        return type(e).__name__, str(e)
+
+
+def _parallel(g, path, pieces):
+    try:
+        accepted, chunks = parallel.parse_parallel(path, g, 1, pieces)
+        return (True, accepted), chunks
+    except (ParserError, LexerError) as e:
+        return (type(e).__name__, str(e)), 0
+
+
+def test_same_outcome_as_sequential(tmp_path, monkeypatch):
+    # arquivos pequenos, cortados em pedaços mesmo assim
+    monkeypatch.setattr(parallel, "_PIECE_MIN", 1)
+    g = artifact()["grammar"]
+    rng = random.Random(1)
+    path = str(tmp_path / "par.lbx")
+    used = 0
+    for text in generated(5, seed=4, min_tokens=3000, max_tokens=6000):
+        data = text.encode("utf-8")
+        variants = [data]
+        for bad in (b";", b"}", b" else ", b"~"):
+            i = rng.randrange(len(data))
+            variants.append(data[:i] + bad + data[i:])
+        for v in variants:
+            with open(path, "wb") as f:
+                f.write(v)
+            expected = _sequential(g, path)
+            for pieces in (2, 7):
+                got, chunks = _parallel(g, path, pieces)
+                assert got == expected, (pieces, v[:200])
+                used += chunks > 1
+    if not parallel.check_shape(g):
+        pytest.skip("gramática sem o formato Program → StmtList EOF: parse_parallel é sempre sequencial")
+    assert used
@@ -0,0 +1,24 @@
+from bin.lexer import Lexer
+from bin.parser import LL1Parser
+
+from .programs import artifact, outcome, parse_cases, show, table_parse
+
+# Com o parser de expressões (Pratt), o resultado e a mensagem de erro são os
+# do LL1Parser só com a tabela.
+
+
+def test_same_outcome_as_table():
+    parser = LL1Parser(artifact()["grammar"], pratt=True)
+    pratt, table = (lambda toks: parser.parse(toks)[0]), table_parse()
+    for toks in parse_cases():
+        assert outcome(pratt, toks) == outcome(table, toks), show(toks)
+
+
+def test_deep_parentheses():
+    # o laço do Pratt não recursa por parênteses
+    n = 5000
+    parser = LL1Parser(artifact()["grammar"], pratt=True)
+    pratt, table = (lambda toks: parser.parse(toks)[0]), table_parse()
+    for text in ("int x = " + "(" * n + "1" + ")" * n + ";", "int x = " + "(" * n + "1" + ")" * (n - 1) + ";"):
+        toks = list(Lexer(text).tokens())
+        assert outcome(pratt, toks) == outcome(table, toks)
@@ -0,0 +1,44 @@
+from bin.lexer import Lexer
+from bin.parser import LL1Parser, ParserError
+
+from .programs import artifact, parse_cases, show
+
+# Recuperação em modo pânico (--all-errors): o primeiro erro é o do parse
+# normal, e os erros de comandos independentes aparecem todos.
+
+
+def _errors(text, max_errors=100):
+    return LL1Parser(artifact()["grammar"]).parse_recovering(Lexer(text).tokens(), max_errors)
+
+
+def test_first_error_is_the_parse_error():
+    parser = LL1Parser(artifact()["grammar"])
+    for toks in parse_cases():
+        try:
+            parser.parse(iter(toks))
+            expected = None
+        except ParserError as e:
+            expected = str(e)
+        errors = parser.parse_recovering(iter(toks))
+        assert (str(errors[0]) if errors else None) == expected, show(toks)
+
+
+def test_reports_each_broken_statement():
+    text = "int x;\nx = (1 + ;\ny = 2;\nif (x >) { y = 1; }\nwhile (x) { x = x - ; }\nz = 3;\n"
+    assert [e.line for e in _errors(text)] == [2, 4, 5]
+
+
+def test_stray_brace_at_top_level():
+    # `}` a mais no nível de fora: descartado, e o resto do arquivo continua sendo analisado
+    text = "int x;\n}\nx = ;\n}\ny = (;\n"
+    assert [e.line for e in _errors(text)] == [2, 3, 4, 5]
+
+
+def test_max_errors():
+    text = "x = ;\n" * 50
+    assert len(_errors(text)) == 50
+    assert len(_errors(text, max_errors=7)) == 7
+
+
+def test_valid_program_has_no_errors():
+    assert _errors("int x; x = 1; void f() { return; }") == []
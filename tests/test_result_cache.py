@@ -0,0 +1,134 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bin.result_cache import RACY_S, ResultCache
+
+# Cache de resultados: acerto pelo conteúdo e pelo índice de stat, a janela
+# "racy" do mtime, o LRU por mtime e vários processos no mesmo diretório.
+
+
+class _Runs:
+    def __init__(self, status="ok"):
+        self.calls = []
+        self.status = status
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return {"status": self.status, "line": None, "col": None, "message": None, "tokens": len(text.split())}
+
+
+def _old(path):
+    # mtime fora da janela racy
+    t = time.time() - RACY_S - 10
+    os.utime(path, (t, t))
+
+
+def test_hit_by_content_and_by_stat(tmp_path):
+    cache = ResultCache(str(tmp_path / "c"), fingerprint="f" * 64)
+    src = tmp_path / "a.lbx"
+    src.write_text("int x;")
+    _old(src)
+    run = _Runs()
+    assert cache.check(run, path=str(src))["tokens"] == 2
+    assert cache.check(run, path=str(src))["tokens"] == 2
+    assert len(run.calls) == 1
+    # acerto pelo índice: nem abre o arquivo
+    assert cache.lookup(str(src)) is not None
+    # o mesmo conteúdo em outro arquivo acerta pelo conteúdo
+    other = tmp_path / "b.lbx"
+    other.write_text("int x;")
+    cache.check(run, path=str(other))
+    assert len(run.calls) == 1
+    assert cache.check(run, data=b"int x;")["status"] == "ok" and len(run.calls) == 1
+
+
+def test_racy_mtime_is_not_indexed(tmp_path):
+    cache = ResultCache(str(tmp_path / "c"), fingerprint="f" * 64)
+    src = tmp_path / "a.lbx"
+    src.write_text("int x;")
+    run = _Runs()
+    cache.check(run, path=str(src))
+    assert cache.lookup(str(src)) is None
+    # mudança de mesmo tamanho com o mesmo mtime: o conteúdo é lido de novo
+    st = os.stat(src)
+    src.write_text("int y;")
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))
+    cache.check(run, path=str(src))
+    assert run.calls == ["int x;", "int y;"]
+
+
+def test_changed_file_misses(tmp_path):
+    cache = ResultCache(str(tmp_path / "c"), fingerprint="f" * 64)
+    src = tmp_path / "a.lbx"
+    src.write_text("int x;")
+    _old(src)
+    run = _Runs()
+    cache.check(run, path=str(src))
+    src.write_text("int x; int y;")
+    _old(src)
+    assert cache.check(run, path=str(src))["tokens"] == 4
+    assert len(run.calls) == 2
+
+
+def test_tokens_and_uncacheable_statuses(tmp_path):
+    cache = ResultCache(str(tmp_path / "c"), fingerprint="f" * 64)
+    run = _Runs()
+    cache.check(run, data=b"int x;")
+    # guardado sem a lista de tokens: quem pede tokens roda de novo
+    cache.check(run, data=b"int x;", tokens=True)
+    assert len(run.calls) == 2
+    timeout = _Runs("timeout")
+    cache.check(timeout, data=b"int z;")
+    cache.check(timeout, data=b"int z;")
+    assert len(timeout.calls) == 2
+    # outra gramática, outra chave
+    other = ResultCache(str(tmp_path / "c"), fingerprint="g" * 64)
+    other.check(run, data=b"int x;")
+    assert len(run.calls) == 3
+
+
+def test_prune_keeps_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "c"), max_bytes=1 << 30, fingerprint="f" * 64)
+    run = _Runs()
+    keys = []
+    for i in range(40):
+        data = f"int x{i};".encode() + b" " * 1000
+        cache.check(run, data=data)
+        keys.append(cache.key(data))
+        path = cache._path(keys[-1], ".r")
+        t = time.time() - 1000 + i
+        os.utime(path, (t, t))
+    # a mais antiga foi usada agora: vira a mais recente
+    assert cache.get(keys[0]) is not None
+    sizes = sum(os.path.getsize(cache._path(k, ".r")) for k in keys)
+    cache.max_bytes = sizes // 2
+    cache.prune()
+    alive = [k for k in keys if os.path.exists(cache._path(k, ".r"))]
+    total = sum(os.path.getsize(cache._path(k, ".r")) for k in alive)
+    assert total <= cache.max_bytes * 0.9
+    assert keys[0] in alive
+    assert keys[-1] in alive and keys[1] not in alive
+
+
+def _writer(args):
+    directory, n, seed = args
+    cache = ResultCache(directory, fingerprint="f" * 64)
+    run = _Runs()
+    for i in range(n):
+        # metade das chaves em comum entre os processos
+        data = f"int x{i if i % 2 else i + seed * 1000};".encode()
+        assert cache.check(run, data=data)["status"] == "ok"
+    return len(run.calls)
+
+
+def test_concurrent_writers(tmp_path):
+    directory = str(tmp_path / "c")
+    with ProcessPoolExecutor(max_workers=4) as ex:
+        list(ex.map(_writer, [(directory, 200, seed) for seed in range(4)]))
+    cache = ResultCache(directory, fingerprint="f" * 64)
+    names = [n for _, _, files in os.walk(directory) for n in files]
+    assert not [n for n in names if n.endswith(".tmp")]
+    assert len(names) == 100 + 4 * 100
+    for i in range(1, 200, 2):
+        assert cache.get(cache.key(f"int x{i};".encode()))["tokens"] == 2
@@ -0,0 +1,57 @@
+from bin.lexer import Lexer
+from bin.parser import LL1Parser
+from bin.semantic import SymbolTable
+
+from .programs import artifact
+
+# --check: declarações conferidas no mesmo parse, pelos hooks da SymbolTable.
+
+
+def _check(text, max_errors=None):
+    table = SymbolTable(max_errors=max_errors)
+    accepted, _ = LL1Parser(artifact()["grammar"]).parse(Lexer(text).tokens(), hooks=table.hooks())
+    assert accepted
+    return [(e.line, e.col, str(e).split(": ", 1)[1]) for e in table.errors]
+
+
+def test_valid_program_has_no_errors():
+    text = "int x; boolean b;\nx = 1; b = x > 0;\nif (b) { int y; y = x; }\nwhile (x > 0) { x = x - 1; }\n"
+    assert _check(text) == []
+
+
+def test_undeclared_identifier():
+    assert _check("int x;\nx = y + 1;\nz = x;\n") == [
+        (2, 5, "identificador 'y' não declarado"),
+        (3, 1, "identificador 'z' não declarado"),
+    ]
+
+
+def test_duplicate_in_same_scope():
+    assert _check("int x;\nboolean x;\n") == [(2, 9, "'x' já declarado neste escopo (em 1:5)")]
+    assert _check("int x;\nif (true) { int y; int y; }\n") == [(2, 24, "'y' já declarado neste escopo (em 2:17)")]
+
+
+def test_shadowing_is_allowed_and_scoped():
+    text = "int x;\nif (true) { boolean x; x = true; int y; }\ny = x;\n"
+    assert _check(text) == [(3, 1, "identificador 'y' não declarado")]
+
+
+def test_function_parameters_and_recursion():
+    text = ("int f(int a, int b) { int c; c = a + b; return f(c, a); }\n"
+            "void g(int v) { v = v + 1; }\n"
+            "a = 1;\n")
+    assert _check(text) == [(3, 1, "identificador 'a' não declarado")]
+    assert _check("int f(int a, int a) { return a; }\n") == [(1, 18, "'a' já declarado neste escopo (em 1:11)")]
+    # o corpo é um escopo interno aos parâmetros: redeclarar é sombreamento
+    assert _check("int f(int a) { int a; return a; }\n") == []
+
+
+def test_for_header_scope():
+    text = "for (int i = 0; i < 3; i = i + 1) { int j; j = i; }\ni = 2;\n"
+    assert _check(text) == [(2, 1, "identificador 'i' não declarado")]
+    assert _check("int k;\nfor (k = 0; k < 3; k = k + 1) { }\n") == []
+
+
+def test_max_errors():
+    text = "".join(f"v{n} = 1;\n" for n in range(10))
+    assert len(_check(text, max_errors=3)) == 3
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bin.client import Client
+from bin.server import ParseServer
+
+from .programs import EXEMPLOS, ROOT, artifact, generated
+
+# Servidor e cliente, só localmente: pedidos direto no ParseServer, o
+# protocolo JSON Lines por um StreamReader, e o cliente falando com um
+# servidor subprocesso por stdin/stdout e por socket Unix.
+
+
+def _handle(server, **req):
+    return asyncio.run(server.handle(req))
+
+
+def test_request_statuses(tmp_path):
+    server = ParseServer(workers=0, art=artifact())
+    assert _handle(server, id=1, text="int x; x = 1;")["status"] == "ok"
+    rec = _handle(server, id=2, text="int x;\nif (x >) { }")
+    assert (rec["status"], rec["line"], rec["col"]) == ("syntax_error", 2, 8)
+    assert _handle(server, id=3, text="int x = 1 ~ 2;")["status"] == "lex_error"
+    assert _handle(server, id=4, path=str(tmp_path / "nada.lbx"))["status"] == "io_error"
+    rec = _handle(server, id=5, op="lex", text="int x;")
+    assert rec["token_list"][:2] == [["Data_Type", "int", 1, 1], ["ID", "x", 1, 5]]
+    assert _handle(server, id=6, text="x", path="y")["status"] == "bad_request"
+    assert _handle(server, id=7, op="nada", text="x")["status"] == "bad_request"
+    assert _handle(server, id=8, text="x", timeout=0)["status"] == "bad_request"
+
+
+def test_stream_protocol():
+    server = ParseServer(workers=0, art=artifact())
+    lines = [{"id": 1, "op": "ping"}, "não é json", {"id": 2, "text": "int x;"},
+             {"id": 3, "op": "cancel", "target": 99}, {"id": 4, "op": "shutdown"},
+             {"id": 5, "text": "depois do shutdown"}]
+    out = []
+
+    async def send(obj):
+        out.append(obj)
+
+    async def run():
+        reader = asyncio.StreamReader()
+        for line in lines:
+            reader.feed_data((line if isinstance(line, str) else json.dumps(line)).encode("utf-8") + b"\n")
+        reader.feed_eof()
+        await server.serve_stream(reader, send)
+
+    asyncio.run(run())
+    by_id = {r["id"]: r["status"] for r in out}
+    assert by_id == {1: "ok", None: "bad_request", 2: "ok", 3: "not_found", 4: "ok"}
+
+
+def test_client_over_stdio():
+    big = "".join(generated(1, seed=9, min_tokens=20000, max_tokens=20000))
+    with Client(workers=1) as c:
+        assert c.request(op="ping")["status"] == "ok"
+        ids = [c.send(op="parse", path=p) for p in EXEMPLOS]
+        statuses = [c.wait(rid)["status"] for rid in ids]
+        assert statuses[:4] == ["ok"] * 4
+        assert statuses[4:] == ["syntax_error", "lex_error"]
+        assert c.request(op="parse", text=big * 20, timeout=0.001)["status"] == "timeout"
+        # shutdown com um pedido no pool ainda em andamento: ele é respondido antes
+        pending = c.send(op="parse", text=big)
+        c.send(op="shutdown", id="fim")
+        assert c.wait(pending)["status"] == "ok"
+        assert c.wait("fim")["status"] == "ok"
+        t0 = time.perf_counter()
+    assert time.perf_counter() - t0 < 10
+
+
+def test_cancel_then_shutdown_does_not_wait_for_the_worker():
+    big = "".join(generated(1, seed=9, min_tokens=20000, max_tokens=20000)) * 40
+    with Client(workers=1) as c:
+        rid = c.send(op="parse", text=big)
+        time.sleep(0.2)
+        c.cancel(rid)
+        assert c.wait(rid)["status"] == "cancelled"
+        c.request(op="shutdown")
+        t0 = time.perf_counter()
+    assert time.perf_counter() - t0 < 10
+
+
+def test_client_over_unix_socket(tmp_path):
+    path = str(tmp_path / "lbx.sock")
+    proc = subprocess.Popen([sys.executable, "-m", "bin.main", "--serve", "--socket", path, "--workers", "0"],
+                            cwd=ROOT, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.perf_counter() + 30
+        while not os.path.exists(path):
+            assert proc.poll() is None and time.perf_counter() < deadline
+            time.sleep(0.05)
+        with Client(path) as c:
+            assert c.request(op="parse", text="int x;")["status"] == "ok"
+            assert c.request(op="parse", text="int x")["status"] == "syntax_error"
+            c.request(op="shutdown")
+        assert proc.wait(timeout=30) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
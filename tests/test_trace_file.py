@@ -0,0 +1,66 @@
+import pytest
+
+from bin.parser import LL1Parser, ParserError, TraceRecorder
+from bin.trace_file import FORMATS, open_sink, read_trace, replay
+
+from .programs import artifact, parse_cases, show
+
+# Trace gravado em arquivo (--trace-out): refeito por replay, tem de dar os
+# mesmos eventos que o TraceRecorder em memória.
+
+
+def _run(parser, toks, trace):
+    try:
+        parser.parse(iter(toks), trace=trace)
+    except ParserError:
+        pass
+
+
+def _events(path, lo=0, hi=None):
+    header, steps = read_trace(path)
+    return [{k: v for k, v in ev.items() if k != "step"} for ev in replay(header, steps, lo, hi)]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip_matches_recorder(tmp_path, fmt):
+    parser = LL1Parser(artifact()["grammar"])
+    path = str(tmp_path / f"trace.{fmt}")
+    for toks in parse_cases()[:60]:
+        recorder = TraceRecorder(None)
+        _run(parser, toks, recorder)
+        with open_sink(path, fmt) as sink:
+            _run(parser, toks, sink)
+        expected = recorder.events()
+        assert sink.steps == len(expected), show(toks)
+        assert _events(path) == expected, show(toks)
+        assert _events(path, 3, 9) == expected[3:9], show(toks)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_limit_stops_recording(tmp_path, fmt):
+    parser = LL1Parser(artifact()["grammar"])
+    toks = max(parse_cases(), key=len)
+    path = str(tmp_path / f"trace.{fmt}")
+    recorder = TraceRecorder(25)
+    _run(parser, toks, recorder)
+    with open_sink(path, fmt, 25) as sink:
+        _run(parser, toks, sink)
+    assert sink.done and sink.steps == 25
+    assert _events(path) == recorder.events()
+
+
+def test_rejects_empty_and_foreign_files(tmp_path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    with pytest.raises(ValueError, match="vazio"):
+        read_trace(str(empty))
+
+    other = tmp_path / "other.jsonl"
+    other.write_text('{"a": 1}\n')
+    with pytest.raises(ValueError, match="não é um trace"):
+        read_trace(str(other))
+
+    old = tmp_path / "old.jsonl"
+    old.write_text('{"trace": "lockbixo", "version": 0}\n')
+    with pytest.raises(ValueError, match="versão"):
+        read_trace(str(old))